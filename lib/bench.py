@@ -0,0 +1,110 @@
+""" A headless macro-benchmark that drives each configured plugin for a fixed number of frames """
+import gc
+import resource
+import sys
+import time
+import tracemalloc
+
+from lib.profiler import FrameProfiler
+
+
+def get_peak_rss_kb():
+    # ru_maxrss is in kilobytes on Linux, but in bytes on macOS
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak_rss // 1024 if sys.platform == "darwin" else peak_rss
+
+
+class PluginBenchmark:
+    """ Builds plugins and calls their update() back to back, with the ticks the FrameScheduler would give them at their
+        frame rate. clock is a VirtualClock moved on by clock_step seconds (one frame by default) after each frame, so N
+        frames stand for the same stretch of time on a display no matter how long they really take. """
+    def __init__(self, helper, jobs, clock, frames, alloc_frames, default_fps, debug=False, fetch_timeout=30,
+                 clock_step=None):
+        self.helper = helper
+        self.jobs = jobs
+        self.clock = clock
+        self.clock_step = clock_step
+        self.frames = frames
+        self.alloc_frames = alloc_frames
+        self.default_fps = default_fps
+        self.debug = debug
+        self.fetch_timeout = fetch_timeout
+        self.results = {}
+
+    def run_frames(self, plugin, fps, frames, tick):
+        """ Runs frames updates starting at tick. Returns their times in ms and the tick to carry on from. """
+        frame_times = []
+        clock_step = self.clock_step if self.clock_step is not None else 1.0 / fps
+        for i in range(frames):
+            start_time = time.perf_counter()
+            plugin.update(tick, fps)
+            frame_times.append((time.perf_counter() - start_time) * 1000)
+            tick = 1 if tick == fps else tick + 1
+            self.clock.advance(clock_step)
+        return frame_times, tick
+
+    def measure(self, name, build_plugin):
+        """ Builds a plugin with build_plugin(), warms it up and runs it. Results are kept under name. A plugin that
+            fails is reported with its error rather than stopping the whole run. """
+        self.helper.log(self.debug, "Bench: running {}".format(name))
+        try:
+            self.results[name] = self.run_plugin(build_plugin)
+        except Exception as e:
+            self.helper.log(self.debug, "Bench: {} failed: {}".format(name, e))
+            self.results[name] = {"error": "{}: {}".format(type(e).__name__, e)}
+        return self.results[name]
+
+    def run_plugin(self, build_plugin):
+        gc.collect()
+        rss_before = get_peak_rss_kb()
+
+        start_time = time.perf_counter()
+        plugin = build_plugin()
+        build_time = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        if hasattr(plugin, "prewarm"):
+            plugin.prewarm()
+        prewarm_time = time.perf_counter() - start_time
+
+        fps = plugin.frames_per_second if plugin.frames_per_second else self.default_fps
+        # The first frame is the one shown straight after a switch, so it is reported on its own. Anything it fetched in
+        # the background is let finish so it doesn't muddy the frames after it.
+        first_frame, tick = self.run_frames(plugin, fps, 1, 0)
+        if not self.jobs.wait_idle(self.fetch_timeout):
+            self.helper.log(self.debug, "Bench: {} still has fetches running".format(type(plugin).__name__))
+
+        frame_times, tick = self.run_frames(plugin, fps, self.frames, tick)
+        frame_budget = 1000.0 / fps
+
+        # tracemalloc slows everything down a lot, so allocations are counted in a separate, shorter pass
+        alloc_peak = 0
+        alloc_retained = 0
+        if self.alloc_frames > 0:
+            gc.collect()
+            tracemalloc.start()
+            alloc_start, _ = tracemalloc.get_traced_memory()
+            self.run_frames(plugin, fps, self.alloc_frames, tick)
+            alloc_end, alloc_peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            alloc_retained = alloc_end - alloc_start
+            alloc_peak -= alloc_start
+
+        peak_rss = get_peak_rss_kb()
+        return {"class": type(plugin).__name__,
+                "fps": fps,
+                "frames": len(frame_times),
+                "simulated_seconds": len(frame_times) * (self.clock_step if self.clock_step is not None else 1.0 / fps),
+                "build_ms": build_time * 1000,
+                "prewarm_ms": prewarm_time * 1000,
+                "first_frame_ms": first_frame[0],
+                "frame_ms": {"p50": FrameProfiler.get_percentile(frame_times, 50),
+                             "p95": FrameProfiler.get_percentile(frame_times, 95),
+                             "p99": FrameProfiler.get_percentile(frame_times, 99),
+                             "max": max(frame_times) if len(frame_times) > 0 else 0.0,
+                             "mean": sum(frame_times) / len(frame_times) if len(frame_times) > 0 else 0.0},
+                "over_budget": len([i for i in frame_times if i > frame_budget]),
+                "peak_rss_kb": peak_rss,
+                "peak_rss_growth_kb": peak_rss - rss_before,
+                "alloc_peak_kb": alloc_peak / 1024,
+                "alloc_retained_kb": alloc_retained / 1024}
@@ -0,0 +1,43 @@
+""" The clock the main loop and plugins tell the time with, so benchmarks and tests can run time faster (or stop it) """
+import datetime
+import threading
+import time
+
+
+class Clock:
+    """ The real time """
+    def time(self):
+        """ Seconds since the epoch, like time.time() """
+        return time.time()
+
+    def now(self, tz=None):
+        """ The current local time (or the time in tz), like datetime.datetime.now() """
+        return datetime.datetime.now(tz)
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+
+class VirtualClock(Clock):
+    """ A clock that only moves when it's told to (or slept on), so a day of a plugin's life can be run through in
+        seconds and every run sees the same times """
+    def __init__(self, start=None):
+        self.current = start if start is not None else time.time()
+        self.lock = threading.Lock()
+
+    def time(self):
+        return self.current
+
+    def now(self, tz=None):
+        return datetime.datetime.fromtimestamp(self.current, tz)
+
+    def sleep(self, seconds):
+        self.advance(seconds)
+
+    def advance(self, seconds):
+        with self.lock:
+            self.current += seconds
+
+    def set(self, timestamp):
+        with self.lock:
+            self.current = timestamp
@@ -0,0 +1,94 @@
+""" Damage tracking for the display surface so only the regions that changed get pushed to the screen """
+import pygame
+
+
+class Compositor:
+    """ Collects the rectangles plugins report as changed and presents them with pygame.display.update(), or with
+        output (e.g. a FramebufferOutput) if there is one """
+    def __init__(self, helper, canvas, debug=False, full_flip_ratio=0.5, max_rects=32, output=None):
+        self.helper = helper
+        self.canvas = canvas
+        self.output = output
+        self.debug = debug
+        # If the damaged area covers more than this fraction of the screen, a full flip is cheaper than many updates
+        self.full_flip_ratio = full_flip_ratio
+        self.max_rects = max_rects
+
+        self.screen_rect = canvas.get_rect()
+        self.dirty_rects = []
+        self.full_redraw = True
+
+    def invalidate(self):
+        """ Forces the next present() to flip the whole display (e.g. after a plugin switch) """
+        self.full_redraw = True
+
+    def add_dirty_rect(self, rect, surface=None):
+        """ Marks a rectangle as changed. If surface is a subsurface of the display, rect is relative to it """
+        rect = pygame.Rect(rect)
+        if surface is not None:
+            rect.move_ip(surface.get_abs_offset())
+
+        rect = rect.clip(self.screen_rect)
+        if rect.width > 0 and rect.height > 0:
+            self.dirty_rects.append(rect)
+
+    def collect(self, plugin):
+        """ Picks up whatever the plugin reported as changed during its last update """
+        for rect in plugin.get_dirty_rects():
+            self.add_dirty_rect(rect, plugin.canvas)
+
+    def present(self):
+        """ Pushes the damaged regions to the screen. Returns True if anything was presented """
+        if self.full_redraw:
+            self.flip()
+            self.full_redraw = False
+            self.dirty_rects = []
+            return True
+
+        if len(self.dirty_rects) == 0:
+            return False
+
+        rects = self.merge_rects(self.dirty_rects)
+        self.dirty_rects = []
+
+        dirty_area = 0
+        for rect in rects:
+            dirty_area += rect.width * rect.height
+
+        if dirty_area >= self.screen_rect.width * self.screen_rect.height * self.full_flip_ratio:
+            self.flip()
+        else:
+            self.update(rects)
+        return True
+
+    def flip(self):
+        if self.output is not None:
+            self.output.flip(self.canvas)
+        else:
+            pygame.display.flip()
+
+    def update(self, rects):
+        if self.output is not None:
+            self.output.update(self.canvas, rects)
+        else:
+            pygame.display.update(rects)
+
+    def merge_rects(self, rects):
+        """ Folds overlapping rectangles together so the same pixels aren't pushed twice """
+        merged = []
+        for rect in rects:
+            rect = rect.copy()
+            i = 0
+            while i < len(merged):
+                if rect.colliderect(merged[i]):
+                    rect.union_ip(merged.pop(i))
+                    i = 0
+                else:
+                    i += 1
+            merged.append(rect)
+
+        if len(merged) > self.max_rects:
+            self.helper.log(self.debug, "Compositor: {} dirty rects, presenting their union".format(len(merged)))
+            merged = [merged[0].unionall(merged[1:])]
+
+        return merged
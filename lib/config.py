@@ -0,0 +1,176 @@
+""" Plugin settings, parsed and checked once (and cached on disk), with typed getters in place of eval() """
+import ast
+import configparser
+import os
+import pickle
+import threading
+
+CACHE_VERSION = 1
+
+
+class ConfigError(ValueError):
+    """ A setting that can't be used. The message says which section and key it came from. """
+    pass
+
+
+def is_literal(value):
+    """ Values that look like a Python tuple, list or dict (colors, lists of tickers...) """
+    return value.strip()[:1] in ("(", "[", "{")
+
+
+def parse_literal(section, key, value):
+    try:
+        return ast.literal_eval(value.strip())
+    except (ValueError, SyntaxError, TypeError, MemoryError, RecursionError) as e:
+        raise ConfigError("[{}] {} = {} isn't a valid value: {}".format(section, key, value, e))
+
+
+class PluginConfig:
+    """ A read-only section of settings that can be used like a configparser section (config["key"], "key" in config,
+        getint()...). Anything that looks like a tuple, list or dict is parsed up front, so a typo fails when the
+        config is loaded rather than later on. Typed values are only converted once. """
+    def __init__(self, name, values, literals=None):
+        self.name = name
+        self._values = dict(values)
+        self._literals = {}
+        for key in self._values:
+            if literals is not None and key in literals:
+                self._literals[key] = literals[key]
+            elif is_literal(self._values[key]):
+                self._literals[key] = parse_literal(name, key, self._values[key])
+        self._typed = {}
+
+    def __getitem__(self, key):
+        return self._values[key]
+
+    def __contains__(self, key):
+        return key in self._values
+
+    def __iter__(self):
+        return iter(self._values)
+
+    def __len__(self):
+        return len(self._values)
+
+    def get(self, key, fallback=None):
+        return self._values.get(key, fallback)
+
+    def get_typed(self, kind, key, fallback, convert):
+        if key not in self._values:
+            return fallback
+        if (kind, key) not in self._typed:
+            try:
+                self._typed[(kind, key)] = convert(key)
+            except ConfigError:
+                raise
+            except (ValueError, TypeError, LookupError) as e:
+                raise ConfigError("[{}] {} = {} isn't a valid {}: {}".format(self.name, key, self._values[key], kind, e))
+        return self._typed[(kind, key)]
+
+    def getint(self, key, fallback=None):
+        return self.get_typed("int", key, fallback, lambda k: int(self._values[k]))
+
+    def getfloat(self, key, fallback=None):
+        return self.get_typed("float", key, fallback, lambda k: float(self._values[k]))
+
+    def getboolean(self, key, fallback=None):
+        return self.get_typed("boolean", key, fallback,
+                              lambda k: configparser.RawConfigParser.BOOLEAN_STATES[self._values[k].lower()])
+
+    def getliteral(self, key, fallback=None):
+        """ A tuple, list or dict setting """
+        return self.get_typed("literal", key, fallback,
+                              lambda k: self._literals[k] if k in self._literals else parse_literal(self.name, k,
+                                                                                                    self._values[k]))
+
+    def getcolor(self, key, fallback=None):
+        """ An (r, g, b) or (r, g, b, a) setting, as a tuple """
+        def convert(k):
+            color = self.getliteral(k)
+            if not isinstance(color, (tuple, list)) or len(color) not in (3, 4) or \
+                    not all(isinstance(i, int) and 0 <= i <= 255 for i in color):
+                raise ValueError("expected (r, g, b) or (r, g, b, a) with values from 0 to 255")
+            return tuple(color)
+        return self.get_typed("color", key, fallback, convert)
+
+    def getlist(self, key, fallback=None):
+        """ A list (or tuple) setting, as a tuple """
+        def convert(k):
+            value = self.getliteral(k)
+            if not isinstance(value, (tuple, list)):
+                raise ValueError("expected a list")
+            return tuple(value)
+        return self.get_typed("list", key, fallback, convert)
+
+    def gettimezone(self, key, fallback=None):
+        """ A timezone name (e.g. America/Toronto), as a pytz timezone """
+        def convert(k):
+            import pytz
+            return pytz.timezone(self._values[k])
+        return self.get_typed("timezone", key, fallback, convert)
+
+
+class ConfigCache:
+    """ Parses plugin config.ini files and keeps the results, keyed by each file's mtime, in memory and in cache_file
+        so they're only parsed again when they change """
+    def __init__(self, helper, cache_file=None, debug=False):
+        self.helper = helper
+        self.cache_file = cache_file
+        self.debug = debug
+        self.files = None
+        self.lock = threading.Lock()
+
+    def load(self):
+        self.files = {}
+        if not self.cache_file:
+            return
+        try:
+            with open(self.cache_file, "rb") as f:
+                cache = pickle.load(f)
+            if cache.get("version") == CACHE_VERSION:
+                self.files = cache["files"]
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, KeyError, ValueError):
+            self.helper.log(self.debug, "No usable config cache at {}, building it".format(self.cache_file))
+
+    def save(self):
+        if not self.cache_file:
+            return
+        try:
+            with open(self.cache_file, "wb") as f:
+                pickle.dump({"version": CACHE_VERSION, "files": self.files}, f)
+        except OSError as e:
+            self.helper.log(self.debug, "Couldn't save the config cache to {}: {}".format(self.cache_file, e))
+
+    def get_file(self, filename):
+        """ Returns {section: (values, literals)} for a config file """
+        with self.lock:
+            if self.files is None:
+                self.load()
+
+            mtime = os.path.getmtime(filename) if os.path.exists(filename) else None
+            if filename in self.files and self.files[filename]["mtime"] == mtime:
+                return self.files[filename]["sections"]
+
+            self.helper.log(self.debug, "Compiling config {}".format(filename))
+            config = configparser.RawConfigParser()
+            config.read(filename)
+            sections = {}
+            for section in config.sections():
+                values = dict(config[section])
+                literals = {key: parse_literal(section, key, values[key]) for key in values if is_literal(values[key])}
+                sections[section] = (values, literals)
+
+            self.files[filename] = {"mtime": mtime, "sections": sections}
+            self.save()
+            return sections
+
+    def get_plugin_config(self, plugin_path, app_plugin_config, plugin_config_section):
+        """ Returns a plugin's settings: the ones in its own config.ini, overridden by its section in the app's """
+        sections = self.get_file(os.path.abspath(os.path.join(plugin_path, "config.ini")))
+        values, literals = sections.get(plugin_config_section, ({}, {}))
+        values = dict(values)
+        literals = dict(literals)
+        for key in list(app_plugin_config):
+            values[key] = app_plugin_config[key]
+            literals.pop(key, None)
+        return PluginConfig(plugin_config_section, values, literals)
@@ -0,0 +1,45 @@
+""" Notices when config files change so the settings can be reloaded without restarting the display """
+import os
+
+
+class ConfigWatcher:
+    """ Checks the mtimes of a set of files every interval seconds. That's a stat() per file, which costs next to nothing,
+        needs nothing beyond the standard library and works on any filesystem. """
+    def __init__(self, helper, clock, interval=2, debug=False):
+        self.helper = helper
+        self.clock = clock
+        self.interval = interval
+        self.debug = debug
+        self.files = {}
+        self.next_check = clock.time() + interval
+
+    @staticmethod
+    def get_mtime(filename):
+        try:
+            return os.path.getmtime(filename)
+        except OSError:
+            return None
+
+    def watch(self, files):
+        """ Watches files from now on (and stops watching any others). Files already watched keep their last mtime. """
+        self.files = {i: self.files[i] if i in self.files else self.get_mtime(i) for i in files}
+
+    def get_next_deadline(self):
+        return self.next_check
+
+    def check(self):
+        """ Returns the files that changed since the last check, if a check is due """
+        now = self.clock.time()
+        if now < self.next_check:
+            return []
+        self.next_check = now + self.interval
+
+        changed = []
+        for filename in self.files:
+            mtime = self.get_mtime(filename)
+            if mtime != self.files[filename]:
+                self.files[filename] = mtime
+                changed.append(filename)
+        if len(changed) > 0:
+            self.helper.log(self.debug, "Config changed: {}".format(", ".join(changed)))
+        return changed
@@ -0,0 +1,78 @@
+""" A shared registry of font objects, so each face/size is only looked up and loaded once """
+import collections
+import threading
+
+import pygame
+
+MAX_FONTS = 64
+
+_fonts = collections.OrderedDict()
+_fitted_sizes = {}
+_lock = threading.Lock()
+
+
+def is_font_file(face):
+    return face[-4:].lower() == ".ttf" or face[-4:].lower() == ".otf"
+
+
+def load_font(face, size, bold=False, module=pygame.font):
+    """ Builds a new font. face is either the path to a .ttf/.otf file or the name of a system font. module is
+        pygame.font or pygame.ftfont. """
+    if is_font_file(face):
+        return module.Font(face, size)
+    return module.SysFont(face, size, bold=bold)
+
+
+def get_font(face, size, bold=False, module=pygame.font):
+    """ Same as load_font(), but the font objects are shared and the least recently used ones are dropped once there
+        are more than MAX_FONTS of them. Don't change the style (set_bold etc.) of a shared font. """
+    key = (module.__name__, face, size, bold)
+    with _lock:
+        if key in _fonts:
+            _fonts.move_to_end(key)
+            return _fonts[key]
+
+    font = load_font(face, size, bold, module)
+    with _lock:
+        _fonts[key] = font
+        while len(_fonts) > MAX_FONTS:
+            _fonts.popitem(last=False)
+    return font
+
+
+def get_fitted_font_size(face, template, max_width=None, max_height=None, bold=False, module=pygame.font, min_size=1):
+    """ Returns the largest font size at which template is narrower than max_width and shorter than max_height (either
+        can be None), using a binary search. Falls back to min_size if even that doesn't fit. """
+    if max_width is None and max_height is None:
+        raise ValueError("get_fitted_font_size needs a max_width or a max_height")
+
+    key = (module.__name__, face, template, max_width, max_height, bold, min_size)
+    if key in _fitted_sizes:
+        return _fitted_sizes[key]
+
+    def fits(size):
+        width, height = load_font(face, size, bold, module).size(template)
+        return (max_width is None or width < max_width) and (max_height is None or height < max_height)
+
+    # Find a size that doesn't fit, then narrow down on the last one that does
+    low = min_size
+    high = max(min_size * 2, 16)
+    while fits(high):
+        low = high
+        high *= 2
+
+    while high - low > 1:
+        middle = (low + high) // 2
+        if fits(middle):
+            low = middle
+        else:
+            high = middle
+
+    _fitted_sizes[key] = low
+    return low
+
+
+def get_fitted_font(face, template, max_width=None, max_height=None, bold=False, module=pygame.font, min_size=1):
+    """ Returns the shared font at the largest size that fits template in the box (see get_fitted_font_size()) """
+    size = get_fitted_font_size(face, template, max_width, max_height, bold, module, min_size)
+    return get_font(face, size, bold, module)
@@ -0,0 +1,163 @@
+""" An HTTP server that shows what's on the display, as a snapshot or an MJPEG stream, for watching it remotely """
+import http.server
+import io
+import threading
+import urllib.parse
+
+import pygame
+from PIL import Image
+
+BOUNDARY = "pidisplayframe"
+CONTENT_TYPES = {"png": "image/png", "jpeg": "image/jpeg"}
+
+
+class FrameServer:
+    """ Serves /snapshot (?format=png or jpeg) and /stream (multipart MJPEG) on its own threads. The main loop only ever
+        hands over a copy of the frame (see offer()), and only while someone is watching, the display has changed
+        since the last copy and max_fps allows. Frames are encoded on the server's threads, once per frame and format
+        however many clients there are, so a screen that doesn't change is served from the last encoded frame. """
+    def __init__(self, helper, port, address="127.0.0.1", max_fps=2, quality=75, debug=False):
+        self.helper = helper
+        self.max_fps = max_fps
+        self.quality = quality
+        self.debug = debug
+
+        self.condition = threading.Condition()
+        # The last frame handed over, its number, and its encodings so far
+        self.frame = None
+        self.frame_id = 0
+        self.encoded = {}
+        self.encode_lock = threading.Lock()
+        self.changed = True
+        self.last_capture = 0
+        self.streams = 0
+        self.snapshot_wanted = False
+
+        server = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.handle_request(self)
+
+            def log_message(self, format, *args):
+                server.helper.log(server.debug, "Frame server: {} {}".format(self.address_string(), format % args))
+
+        self.httpd = http.server.ThreadingHTTPServer((address, port), Handler)
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name="frame-server")
+        self.thread.daemon = True
+        self.thread.start()
+        self.helper.log(self.debug, "Frame server: listening on {}:{}".format(address or "*", port))
+
+    def is_wanted(self):
+        return self.streams > 0 or self.snapshot_wanted
+
+    def offer(self, canvas, changed, now):
+        """ Called by the main loop after each present(). Copies the frame if anyone is waiting for a new one. """
+        self.changed = self.changed or changed
+        if not self.changed or not self.is_wanted() or now - self.last_capture < 1.0 / self.max_fps:
+            return
+        frame = canvas.copy()
+        with self.condition:
+            self.frame = frame
+            self.frame_id += 1
+            self.encoded = {}
+            self.changed = False
+            self.snapshot_wanted = False
+            self.last_capture = now
+            self.condition.notify_all()
+
+    def get_next_deadline(self):
+        """ When the main loop has to come back to hand over a frame that max_fps held back, or None """
+        if self.changed and self.is_wanted():
+            return self.last_capture + 1.0 / self.max_fps
+        return None
+
+    def wait_for_frame(self, after_id, timeout):
+        """ Asks the main loop for a frame newer than after_id and waits up to timeout seconds for it. Returns the
+            newest frame's number either way. """
+        with self.condition:
+            if self.frame_id <= after_id:
+                self.snapshot_wanted = True
+                # Wake the main loop up in case it's idling
+                try:
+                    pygame.event.post(pygame.event.Event(self.helper.EVENT_WAKE))
+                except pygame.error:
+                    pass
+                self.condition.wait_for(lambda: self.frame_id > after_id, timeout)
+            return self.frame_id
+
+    def get_encoded(self, image_format):
+        """ Returns (frame number, bytes) for the last frame in image_format, encoding it if that hasn't been done yet """
+        with self.encode_lock:
+            with self.condition:
+                frame, frame_id, encoded = self.frame, self.frame_id, self.encoded
+            if frame is None:
+                return frame_id, None
+            if image_format not in encoded:
+                image = Image.frombytes("RGB", frame.get_size(), pygame.image.tostring(frame, "RGB"))
+                data = io.BytesIO()
+                if image_format == "png":
+                    image.save(data, "PNG", compress_level=1)
+                else:
+                    image.save(data, "JPEG", quality=self.quality)
+                encoded[image_format] = data.getvalue()
+            return frame_id, encoded[image_format]
+
+    def handle_request(self, request):
+        url = urllib.parse.urlparse(request.path)
+        if url.path == "/snapshot":
+            image_format = urllib.parse.parse_qs(url.query).get("format", ["png"])[0]
+            if image_format not in CONTENT_TYPES:
+                request.send_error(400, "format must be png or jpeg")
+                return
+            if self.changed or self.frame is None:
+                # What was last copied is out of date
+                self.wait_for_frame(self.frame_id, 2)
+            frame_id, data = self.get_encoded(image_format)
+            if data is None:
+                request.send_error(503, "No frame yet")
+                return
+            request.send_response(200)
+            request.send_header("Content-Type", CONTENT_TYPES[image_format])
+            request.send_header("Content-Length", str(len(data)))
+            request.send_header("Cache-Control", "no-store")
+            request.end_headers()
+            request.wfile.write(data)
+        elif url.path == "/stream":
+            self.stream(request)
+        else:
+            request.send_error(404)
+
+    def stream(self, request):
+        request.send_response(200)
+        request.send_header("Content-Type", "multipart/x-mixed-replace; boundary={}".format(BOUNDARY))
+        request.send_header("Cache-Control", "no-store")
+        request.end_headers()
+        with self.condition:
+            self.streams += 1
+        sent_id = -1
+        try:
+            while True:
+                if sent_id >= 0 or self.frame is None:
+                    # Sends the same frame again now and then, so the connection doesn't look dead on a still screen.
+                    #    The first one goes out straight away if there is one, even if it's about to be replaced.
+                    self.wait_for_frame(max(sent_id, 0), 10)
+                sent_id, data = self.get_encoded("jpeg")
+                if data is None:
+                    continue
+                request.wfile.write("--{}\r\nContent-Type: image/jpeg\r\nContent-Length: {}\r\n\r\n".format(
+                    BOUNDARY, len(data)).encode("ascii"))
+                request.wfile.write(data)
+                request.wfile.write(b"\r\n")
+                request.wfile.flush()
+        except (OSError, ValueError):
+            # The client went away
+            pass
+        finally:
+            with self.condition:
+                self.streams -= 1
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,167 @@
+""" Writes the display straight into a Linux framebuffer device (e.g. /dev/fb0), skipping SDL's present path """
+import fcntl
+import mmap
+import os
+import stat
+import struct
+
+import pygame
+
+FBIOGET_VSCREENINFO = 0x4600
+FBIOGET_FSCREENINFO = 0x4602
+# struct fb_var_screeninfo up to the transp bitfield: xres, yres, xres_virtual, yres_virtual, xoffset, yoffset,
+#    bits_per_pixel, grayscale, then offset, length and msb_right for red, green, blue and transp
+VSCREENINFO = "8I12I"
+VSCREENINFO_SIZE = 160
+# struct fb_fix_screeninfo up to line_length: id, smem_start, smem_len, type, type_aux, visual, xpanstep, ypanstep,
+#    ywrapstep, line_length
+FSCREENINFO = "16sL4I3HI"
+FSCREENINFO_SIZE = 80
+
+# The usual layouts, for files (and devices that don't say): RGB565, and XRGB8888 with blue in the first byte
+DEFAULT_MASKS = {16: (0xF800, 0x07E0, 0x001F, 0),
+                 24: (0xFF0000, 0x00FF00, 0x0000FF, 0),
+                 32: (0xFF0000, 0x00FF00, 0x0000FF, 0)}
+
+
+class FramebufferOutput:
+    """ Presents the display by writing it into a memory mapped framebuffer. Changed regions are converted to the
+        framebuffer's pixel format (by pygame, in C) on a staging surface, which is then compared with what was last
+        written tile by tile, and only the tiles that really changed are written. Writes to SPI panels (and to the
+        copies fbcp makes of them) are what's slow, so this keeps them to a minimum. device can also be a plain file, in
+        which case size and bits_per_pixel say what it holds. """
+    def __init__(self, helper, device, size=None, bits_per_pixel=32, tile_size=32, debug=False):
+        self.helper = helper
+        self.device = device
+        self.tile_size = tile_size
+        self.debug = debug
+
+        self.fd = os.open(device, os.O_RDWR)
+        if stat.S_ISCHR(os.fstat(self.fd).st_mode):
+            self.size, self.bits_per_pixel, self.masks, self.stride = self.get_screen_info(self.fd)
+        else:
+            self.size = tuple(size)
+            self.bits_per_pixel = bits_per_pixel
+            self.masks = DEFAULT_MASKS[bits_per_pixel]
+            self.stride = self.size[0] * bits_per_pixel // 8
+            length = self.stride * self.size[1]
+            if os.fstat(self.fd).st_size < length:
+                os.ftruncate(self.fd, length)
+
+        self.bytes_per_pixel = self.bits_per_pixel // 8
+        self.map = mmap.mmap(self.fd, self.stride * self.size[1], mmap.MAP_SHARED, mmap.PROT_READ | mmap.PROT_WRITE)
+        self.staging = pygame.Surface(self.size, 0, self.bits_per_pixel, self.masks)
+        self.pitch = self.staging.get_pitch()
+        # What was last written, laid out like the staging surface so rows of both can be compared directly
+        self.shadow = None
+        self.screen_rect = self.staging.get_rect()
+        self.stats = {"frames": 0, "tiles": 0, "written": 0}
+
+        self.helper.log(self.debug, "Framebuffer: {} is {}x{} at {} bits per pixel".format(
+            device, self.size[0], self.size[1], self.bits_per_pixel))
+
+    @staticmethod
+    def get_screen_info(fd):
+        """ Asks the framebuffer driver for its resolution, pixel format and line length """
+        var = struct.unpack_from(VSCREENINFO, fcntl.ioctl(fd, FBIOGET_VSCREENINFO, bytes(VSCREENINFO_SIZE)))
+        fix = struct.unpack_from(FSCREENINFO, fcntl.ioctl(fd, FBIOGET_FSCREENINFO, bytes(FSCREENINFO_SIZE)))
+        bits_per_pixel = var[6]
+        if bits_per_pixel not in DEFAULT_MASKS:
+            raise ValueError("Framebuffers with {} bits per pixel aren't supported".format(bits_per_pixel))
+        # Each color's (offset, length) becomes a mask
+        masks = tuple(((1 << var[i + 1]) - 1) << var[i] for i in (8, 11, 14)) + (0,)
+        if not any(masks):
+            masks = DEFAULT_MASKS[bits_per_pixel]
+        return (var[0], var[1]), bits_per_pixel, masks, fix[-1]
+
+    def flip(self, canvas):
+        self.update(canvas, [canvas.get_rect()])
+
+    def update(self, canvas, rects):
+        """ Writes the tiles under rects that changed since they were last written """
+        bands = {}
+        for rect in rects:
+            rect = pygame.Rect(rect).clip(self.screen_rect).clip(canvas.get_rect())
+            if rect.width <= 0 or rect.height <= 0:
+                continue
+            self.staging.blit(canvas, rect, rect)
+            for tile_y in range(rect.top // self.tile_size, (rect.bottom - 1) // self.tile_size + 1):
+                bands.setdefault(tile_y, set()).update(range(rect.left // self.tile_size,
+                                                             (rect.right - 1) // self.tile_size + 1))
+        if len(bands) == 0:
+            return
+
+        first = self.shadow is None
+        view = self.staging.get_buffer()
+        try:
+            pixels = memoryview(view)
+            if first:
+                self.shadow = bytearray(len(pixels))
+            for tile_y in sorted(bands):
+                columns = sorted(bands[tile_y])
+                top = tile_y * self.tile_size
+                bottom = min(top + self.tile_size, self.size[1])
+                self.stats["tiles"] += len(columns)
+                # A row of tiles that didn't change is one comparison. Nothing has been written the first time, so
+                #    everything counts as changed.
+                if not first and self.is_unchanged(pixels, top * self.pitch, bottom * self.pitch):
+                    continue
+                changed = columns if first else self.get_changed_tiles(pixels, top, bottom, columns)
+                self.stats["written"] += len(changed)
+                self.write_tiles(pixels, top, bottom, changed)
+            pixels.release()
+        finally:
+            del view
+        self.stats["frames"] += 1
+
+    def get_column_bytes(self, first_column, last_column):
+        """ Returns where a run of tiles starts and ends within a row, in bytes """
+        return (first_column * self.tile_size * self.bytes_per_pixel,
+                min((last_column + 1) * self.tile_size, self.size[0]) * self.bytes_per_pixel)
+
+    def is_unchanged(self, pixels, start, end):
+        # Comparing to a bytearray is a memcmp(), where comparing two memoryviews goes byte by byte
+        return self.shadow[start:end] == pixels[start:end]
+
+    def get_changed_tiles(self, pixels, top, bottom, columns):
+        """ Returns the columns of the tiles between rows top and bottom that differ from what was last written. Rows
+            are compared whole first, so only rows that changed are looked at tile by tile. """
+        changed = set()
+        row_left, row_right = self.get_column_bytes(columns[0], columns[-1])
+        tiles = [(i, ) + self.get_column_bytes(i, i) for i in columns]
+        for y in range(top, bottom):
+            offset = y * self.pitch
+            if self.is_unchanged(pixels, offset + row_left, offset + row_right):
+                continue
+            for column, left, right in tiles:
+                if column not in changed and not self.is_unchanged(pixels, offset + left, offset + right):
+                    changed.add(column)
+            if len(changed) == len(columns):
+                break
+        return sorted(changed)
+
+    def write_tiles(self, pixels, top, bottom, columns):
+        """ Writes tiles between rows top and bottom, a run of neighbouring tiles at a time """
+        runs = []
+        for column in columns:
+            if len(runs) > 0 and runs[-1][1] == column - 1:
+                runs[-1][1] = column
+            else:
+                runs.append([column, column])
+        runs = [self.get_column_bytes(first_column, last_column) for first_column, last_column in runs]
+
+        for y in range(top, bottom):
+            offset = y * self.pitch
+            framebuffer_offset = y * self.stride
+            for left, right in runs:
+                row = pixels[offset + left:offset + right]
+                self.shadow[offset + left:offset + right] = row
+                self.map[framebuffer_offset + left:framebuffer_offset + right] = row
+
+    def get_stats(self):
+        return dict(self.stats)
+
+    def close(self):
+        self.helper.log(self.debug, "Framebuffer: {}".format(self.get_stats()))
+        self.map.close()
+        os.close(self.fd)
@@ -10,3 +10,23 @@ class FullScreenPlugin(Plugin):
 
     def handle_click(self, pos):
         pass
+
+    def prewarm(self):
+        """ Called on a background thread a little while before the plugin is switched to. Plugins can do their first
+            fetch or any expensive preparation here so their first frame is ready as soon as they appear. It's still
+            running if the plugin comes on screen before it's done, so fetch through the plugin's jobs (jobs.run()),
+            which keeps update() from fetching the same thing at the same time. """
+        pass
+
+    def get_memory_size(self):
+        """ Roughly how many bytes suspend() would free """
+        return 0
+
+    def suspend(self):
+        """ Called when the plugin is off screen and the app is over its memory budget. Plugins should let go of what
+            they can rebuild (backing surfaces, decoded images) and rebuild it in resume(). """
+        pass
+
+    def resume(self):
+        """ Called before a suspended plugin is pre-warmed or shown again """
+        pass
@@ -1,4 +1,5 @@
 """ Helper variables and functions for pidisplay """
+import collections
 import ipaddress
 import math
 import socket
@@ -22,6 +23,8 @@ CELSIUS = "celsius"
 PING = "ping"
 CONNECT = "connect"
 EVENT_MESSAGE = pygame.USEREVENT + 3
+# Posted by other threads to wake the main loop up when it might be idling
+EVENT_WAKE = pygame.USEREVENT + 4
 EVENT_DOUBLECLICK = pygame.USEREVENT + 2
 
 
@@ -50,6 +53,59 @@ def send_message(message):
     pygame.event.post(my_event)
 
 
+# Rendered text, shared by all plugins. The budget (in bytes of surface memory) can be changed before anything is
+#    rendered.
+text_cache_budget = 8 * 1024 * 1024
+text_cache = collections.OrderedDict()
+text_cache_stats = {"hits": 0, "misses": 0, "evictions": 0, "bytes": 0}
+text_cache_lock = threading.Lock()
+
+
+def render_text(font, text, antialias, color, background=None):
+    """ A drop-in for font.render() that reuses surfaces for text that has been rendered before. The surfaces are
+        shared, so blit them but don't draw on them. """
+    key = (font, text, antialias, tuple(color), tuple(background) if background is not None else None)
+    with text_cache_lock:
+        if key in text_cache:
+            text_cache.move_to_end(key)
+            text_cache_stats["hits"] += 1
+            return text_cache[key]
+        text_cache_stats["misses"] += 1
+
+    if background is None:
+        surf = font.render(text, antialias, color)
+    else:
+        surf = font.render(text, antialias, color, background)
+
+    size = get_surface_size(surf)
+    if size > text_cache_budget:
+        return surf
+
+    with text_cache_lock:
+        if key not in text_cache:
+            text_cache[key] = surf
+            text_cache_stats["bytes"] += size
+        while text_cache_stats["bytes"] > text_cache_budget:
+            old_key, old_surf = text_cache.popitem(last=False)
+            text_cache_stats["bytes"] -= get_surface_size(old_surf)
+            text_cache_stats["evictions"] += 1
+    return surf
+
+
+def get_surface_size(surface):
+    """ Roughly how many bytes of pixels a surface holds (None counts as nothing) """
+    if surface is None:
+        return 0
+    return surface.get_pitch() * surface.get_height()
+
+
+def get_text_cache_stats():
+    with text_cache_lock:
+        stats = dict(text_cache_stats)
+        stats["entries"] = len(text_cache)
+    return stats
+
+
 # From https://github.com/lordmauve/pgzero/blob/master/pgzero/ptext.py#L125
 def wrap(text, font, max_width, strip=True):
     texts = text.replace("\t", "    ").split("\n")
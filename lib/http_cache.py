@@ -0,0 +1,144 @@
+""" A persistent on-disk cache for HTTP responses, so restarts can show the last good data straight away and sources
+    with a quota aren't asked for the same thing twice """
+import hashlib
+import json
+import os
+import threading
+import time
+
+import requests
+
+
+class CachedResponse:
+    """ Just enough of requests.Response for the plugins to use a cached payload the same way as a live one """
+    def __init__(self, status_code, content, headers, encoding, from_cache):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers
+        self.encoding = encoding
+        self.from_cache = from_cache
+
+    def __bool__(self):
+        return self.status_code < 400
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding or "utf-8", errors="replace")
+
+    def json(self):
+        return json.loads(self.text)
+
+    def close(self):
+        pass
+
+
+class HttpCache:
+    """ Stores successful responses under cache_dir and serves them while they're younger than the caller's ttl. Once
+        they're older, they are revalidated with If-None-Match/If-Modified-Since, and if the source can't be reached the
+        last good payload is served instead. """
+    def __init__(self, helper, http, cache_dir, debug=False, max_age=7 * 24 * 60 * 60):
+        self.helper = helper
+        self.http = http
+        self.cache_dir = cache_dir
+        self.debug = debug
+        self.lock = threading.Lock()
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.prune(max_age)
+
+    def get(self, url, ttl, key=None, **kwargs):
+        """ Returns a CachedResponse for url, fetching it only if what's cached is older than ttl seconds. Errors are
+            raised like requests.get() unless there is something cached to fall back on. key is what the response is
+            stored under (the url by default), for urls that aren't known before a fetch. """
+        key = self.get_key(key if key is not None else url)
+        entry = self.load(key)
+        if entry is not None and time.time() - entry["stored"] < ttl:
+            return self.build_response(entry, True)
+
+        headers = dict(kwargs.pop("headers", {}))
+        if entry is not None:
+            if entry["etag"]:
+                headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        try:
+            r = self.http.get(url, headers=headers, **kwargs)
+        except requests.RequestException as e:
+            if entry is None:
+                raise
+            self.helper.log(self.debug, "Cache: couldn't revalidate {}, serving what's cached: {}".format(key, e))
+            return self.build_response(entry, True)
+
+        if r.status_code == 304 and entry is not None:
+            r.close()
+            entry["stored"] = time.time()
+            self.save(key, entry)
+            return self.build_response(entry, True)
+
+        if r.status_code == 200:
+            entry = {"stored": time.time(),
+                     "etag": r.headers.get("ETag", ""),
+                     "last_modified": r.headers.get("Last-Modified", ""),
+                     "content_type": r.headers.get("Content-Type", ""),
+                     "encoding": r.encoding,
+                     "content": r.content}
+            self.save(key, entry)
+            r.close()
+            return self.build_response(entry, False)
+
+        response = CachedResponse(r.status_code, r.content, dict(r.headers), r.encoding, False)
+        r.close()
+        return response
+
+    def get_cached(self, key):
+        """ Returns whatever is cached under key (a url or the key given to get()) no matter how old, or None """
+        entry = self.load(self.get_key(key))
+        return self.build_response(entry, True) if entry is not None else None
+
+    @staticmethod
+    def build_response(entry, from_cache):
+        return CachedResponse(200, entry["content"], {"Content-Type": entry["content_type"]}, entry["encoding"], from_cache)
+
+    @staticmethod
+    def get_key(key):
+        # Only a hash of the url is written to disk since some of them carry api keys
+        return hashlib.sha1(key.encode()).hexdigest()
+
+    def load(self, key):
+        try:
+            with open(os.path.join(self.cache_dir, key + ".json"), "r") as f:
+                entry = json.load(f)
+            with open(os.path.join(self.cache_dir, key + ".body"), "rb") as f:
+                entry["content"] = f.read()
+        except (OSError, ValueError):
+            return None
+        return entry
+
+    def save(self, key, entry):
+        meta = {i: entry[i] for i in entry if i != "content"}
+        # Write to temp files and move them into place so a reader never sees half an entry
+        with self.lock:
+            try:
+                tmp_file = os.path.join(self.cache_dir, key + ".body.tmp")
+                with open(tmp_file, "wb") as f:
+                    f.write(entry["content"])
+                os.replace(tmp_file, os.path.join(self.cache_dir, key + ".body"))
+
+                tmp_file = os.path.join(self.cache_dir, key + ".json.tmp")
+                with open(tmp_file, "w") as f:
+                    json.dump(meta, f)
+                os.replace(tmp_file, os.path.join(self.cache_dir, key + ".json"))
+            except OSError as e:
+                self.helper.log(self.debug, "Cache: couldn't save {}: {}".format(key, e))
+
+    def prune(self, max_age):
+        """ Deletes anything that hasn't been stored or revalidated for max_age seconds """
+        now = time.time()
+        for file in os.listdir(self.cache_dir):
+            full_path = os.path.join(self.cache_dir, file)
+            try:
+                if now - os.path.getmtime(full_path) > max_age:
+                    os.remove(full_path)
+            except OSError:
+                pass
@@ -0,0 +1,145 @@
+""" A shared HTTP client so plugins reuse keep-alive connections instead of opening a new one for every request """
+import base64
+import hashlib
+import json
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+
+class HttpClient:
+    """ Wraps one requests.Session with per-host connection pools and a default timeout, and keeps simple per-host
+        metrics (requests, errors, seconds spent and bytes downloaded) """
+    def __init__(self, helper, timeout=10, pool_connections=8, pool_maxsize=4, user_agent="pidisplay/1.0", debug=False):
+        self.helper = helper
+        self.debug = debug
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = user_agent
+        # pool_connections is the number of hosts to keep pools for and pool_maxsize the connections kept per host
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        # Anything else handed this session (spotipy, yfinance) gets counted too
+        self.session.hooks["response"].append(self.response_hook)
+
+        self.lock = threading.Lock()
+        self.stats = {}
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def request(self, method, url, **kwargs):
+        """ Same as requests.request(), but pooled and with the default timeout unless one is given """
+        if "timeout" not in kwargs or kwargs["timeout"] is None:
+            kwargs["timeout"] = self.timeout
+
+        start_time = time.time()
+        try:
+            return self.session.request(method, url, **kwargs)
+        except requests.RequestException:
+            self.record(urlsplit(url).netloc, time.time() - start_time, 0, True)
+            raise
+
+    def response_hook(self, r, *args, **kwargs):
+        self.record(urlsplit(r.url).netloc, r.elapsed.total_seconds(), len(r.content), r.status_code >= 400)
+
+    def record(self, host, seconds, num_bytes, error):
+        with self.lock:
+            if host not in self.stats:
+                self.stats[host] = {"requests": 0, "errors": 0, "seconds": 0.0, "bytes": 0}
+            stats = self.stats[host]
+            stats["requests"] += 1
+            stats["seconds"] += seconds
+            stats["bytes"] += num_bytes
+            if error:
+                stats["errors"] += 1
+
+    def get_stats(self):
+        """ Returns a copy of the per-host metrics """
+        with self.lock:
+            return {host: dict(self.stats[host]) for host in self.stats}
+
+    def log_stats(self):
+        for host, stats in sorted(self.get_stats().items()):
+            average = stats["seconds"] / stats["requests"] * 1000 if stats["requests"] > 0 else 0
+            self.helper.log(self.debug, "HTTP: {}: {} requests, {} errors, {:.0f}ms average, {} bytes".format(
+                host, stats["requests"], stats["errors"], average, stats["bytes"]))
+
+    def use_fixtures(self, fixture_dir, record=False):
+        """ Serves every request from the fixtures in fixture_dir instead of the network (see FixtureAdapter) """
+        adapter = FixtureAdapter(fixture_dir, record)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def close(self):
+        self.session.close()
+
+
+class FixtureAdapter(BaseAdapter):
+    """ Answers requests with responses recorded earlier, so benchmarks are repeatable and don't need the network.
+        With record on, the requests really go out and their responses are saved as fixtures on the way back. A request
+        without a fixture fails like an unreachable host would. """
+    # The content is stored decoded, so these no longer describe it
+    SKIPPED_HEADERS = ["content-encoding", "content-length", "transfer-encoding"]
+
+    def __init__(self, fixture_dir, record=False):
+        super(FixtureAdapter, self).__init__()
+        self.fixture_dir = fixture_dir
+        self.record = record
+        self.adapter = HTTPAdapter() if record else None
+        os.makedirs(self.fixture_dir, exist_ok=True)
+
+    def get_fixture_file(self, request):
+        # Named after a hash since some of the urls carry api keys
+        key = "{} {}".format(request.method, request.url)
+        return os.path.join(self.fixture_dir, hashlib.sha1(key.encode()).hexdigest() + ".json")
+
+    def send(self, request, **kwargs):
+        fixture_file = self.get_fixture_file(request)
+        if self.record:
+            r = self.adapter.send(request, **kwargs)
+            self.save(fixture_file, r)
+            return r
+
+        try:
+            with open(fixture_file, "r") as f:
+                fixture = json.load(f)
+        except (OSError, ValueError):
+            raise requests.ConnectionError("No fixture for {} {}".format(request.method, urlsplit(request.url).path),
+                                           request=request)
+
+        r = requests.Response()
+        r.status_code = fixture["status_code"]
+        r.reason = fixture["reason"]
+        r.headers = CaseInsensitiveDict(fixture["headers"])
+        r.encoding = fixture["encoding"]
+        r._content = base64.b64decode(fixture["content"])
+        r.url = request.url
+        r.request = request
+        r.connection = self
+        return r
+
+    def save(self, fixture_file, r):
+        # The query string is left out of what's readable, the file name is enough to find the fixture again
+        fixture = {"url": r.url.split("?")[0],
+                   "status_code": r.status_code,
+                   "reason": r.reason,
+                   "headers": {i: r.headers[i] for i in r.headers if i.lower() not in FixtureAdapter.SKIPPED_HEADERS},
+                   "encoding": r.encoding,
+                   "content": base64.b64encode(r.content).decode()}
+        with open(fixture_file, "w") as f:
+            json.dump(fixture, f, indent=1)
+
+    def close(self):
+        if self.adapter is not None:
+            self.adapter.close()
@@ -0,0 +1,62 @@
+""" Spreads heavy redraws over several frames so they don't hold up everything else on screen """
+import collections
+import time
+import traceback
+
+
+class IncrementalRenderer:
+    """ Runs render generators (see Plugin.render_incrementally()) a slice at a time. Each pass of the main loop gives
+        them up to budget seconds between them, taking turns. A generator yields whenever it has done a bit of its work
+        and should draw on a surface of its own: when it's done, its on_done() swaps that in and its plugin is woken up
+        (with wake(plugin)) to show it. A generator that raises is dropped, logged (debug or not) and its on_error()
+        called, and its plugin is woken up too. """
+    def __init__(self, helper, budget, wake=None, debug=False):
+        self.helper = helper
+        self.budget = budget
+        self.wake = wake
+        self.debug = debug
+        self.renders = collections.OrderedDict()
+
+    def submit(self, plugin, generator, on_done, on_error=None):
+        """ Starts rendering for plugin, replacing whatever it was still rendering """
+        self.renders.pop(plugin, None)
+        self.renders[plugin] = {"generator": generator, "on_done": on_done, "on_error": on_error,
+                                "started": time.perf_counter(), "slices": 0}
+
+    def cancel(self, plugin):
+        if self.renders.pop(plugin, None) is not None:
+            self.helper.log(self.debug, "Render: cancelled {}".format(type(plugin).__name__))
+
+    def is_busy(self, plugin=None):
+        if plugin is None:
+            return len(self.renders) > 0
+        return plugin in self.renders
+
+    def run(self):
+        """ Runs render slices until the budget for this pass is spent. Always runs at least one, so everything
+            finishes eventually however small the budget. """
+        deadline = time.perf_counter() + self.budget
+        while len(self.renders) > 0:
+            plugin = next(iter(self.renders))
+            render = self.renders[plugin]
+            try:
+                next(render["generator"])
+                render["slices"] += 1
+                self.renders.move_to_end(plugin)
+            except StopIteration:
+                del self.renders[plugin]
+                render["on_done"]()
+                self.helper.log(self.debug, "Render: {} done in {} slices over {:.0f}ms".format(
+                    type(plugin).__name__, render["slices"] + 1, (time.perf_counter() - render["started"]) * 1000))
+                if self.wake is not None:
+                    self.wake(plugin)
+            except Exception as e:
+                del self.renders[plugin]
+                self.helper.log(True, "Render: {} failed:\n{}".format(type(plugin).__name__, traceback.format_exc()))
+                if render["on_error"] is not None:
+                    render["on_error"](e)
+                if self.wake is not None:
+                    self.wake(plugin)
+
+            if time.perf_counter() >= deadline:
+                break
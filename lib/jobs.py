@@ -0,0 +1,140 @@
+""" A shared pool of background workers for plugin fetches, so a slow upstream can't pile up threads """
+import queue
+import random
+import threading
+import time
+
+from lib.clock import Clock
+
+
+class JobScheduler:
+    """ Runs plugin jobs on a fixed number of daemon worker threads. Each job has a key and only one job per key is ever
+        queued or running. Periodic jobs are polled from the plugin's update() with schedule(), get a little jitter on
+        their interval and back off exponentially while they keep failing. A job fails if it raises or returns False.
+        Deadlines aren't enforced: a job can't be stopped once it's running, so jobs have to bound their own network
+        calls (timeouts on requests, sockets and subprocesses). The deadline is only checked when a job is taken off the
+        queue (it's skipped if it waited longer) and after it finishes (it counts as failed if it took longer). Intervals
+        and backoff go by clock (the one plugins share), so a lib.clock.VirtualClock moves them along too. """
+    def __init__(self, helper, workers=2, default_deadline=60, debug=False, jitter=0.1, max_backoff=3600, clock=None):
+        self.helper = helper
+        self.clock = clock if clock is not None else Clock()
+        self.debug = debug
+        self.default_deadline = default_deadline
+        self.jitter = jitter
+        self.max_backoff = max_backoff
+
+        self.lock = threading.Lock()
+        self.jobs = {}
+        self.queue = queue.Queue(maxsize=workers * 8)
+
+        for i in range(workers):
+            thread = threading.Thread(target=self.worker_thread, args=([]), name="jobs-{}".format(i))
+            thread.daemon = True
+            thread.start()
+
+    def get_job(self, key):
+        if key not in self.jobs:
+            self.jobs[key] = {"in_flight": False, "next_run": 0, "failures": 0, "started": 0, "last_success": 0}
+        return self.jobs[key]
+
+    def schedule(self, key, func, interval, deadline=None):
+        """ Queues func if the job's interval has passed (or it has never run) and it isn't already in flight.
+            Returns True if it was queued. """
+        with self.lock:
+            job = self.get_job(key)
+            if job["in_flight"] or self.clock.time() < job["next_run"]:
+                return False
+            job["interval"] = interval
+        return self.submit(key, func, deadline)
+
+    def submit(self, key, func, deadline=None):
+        """ Queues a one-off run of func. Returns False if a job with the same key is already queued or running. """
+        with self.lock:
+            job = self.get_job(key)
+            if job["in_flight"]:
+                return False
+            job["in_flight"] = True
+            job["queued"] = self.clock.time()
+            job["deadline"] = deadline if deadline is not None else self.default_deadline
+
+        try:
+            self.queue.put_nowait((key, func))
+        except queue.Full:
+            self.helper.log(self.debug, "Jobs: queue is full, dropping {}".format(key))
+            self.finish(key, False)
+            return False
+        return True
+
+    def run(self, key, func, interval=None):
+        """ Runs func on the calling thread unless the same job is already in flight (e.g. when pre-warming).
+            Passing the job's interval pushes its next scheduled run back. Returns True if it ran. """
+        with self.lock:
+            job = self.get_job(key)
+            if job["in_flight"]:
+                return False
+            job["in_flight"] = True
+            if interval is not None:
+                job["interval"] = interval
+            job["deadline"] = self.default_deadline
+
+        self.finish(key, self.run_job(key, func))
+        return True
+
+    def is_running(self, key):
+        with self.lock:
+            return key in self.jobs and self.jobs[key]["in_flight"]
+
+    def wait_idle(self, timeout):
+        """ Waits up to timeout seconds for every queued and running job to finish. Returns True if they all did. """
+        end_time = time.time() + timeout
+        while time.time() < end_time:
+            with self.lock:
+                if not any(self.jobs[i]["in_flight"] for i in self.jobs):
+                    return True
+            time.sleep(0.05)
+        return False
+
+    def worker_thread(self):
+        while True:
+            key, func = self.queue.get()
+            job = self.jobs[key]
+            waited = self.clock.time() - job["queued"]
+            if waited > job["deadline"]:
+                self.helper.log(self.debug, "Jobs: {} waited {:.1f}s, past its deadline. Skipping it.".format(key, waited))
+                self.finish(key, False)
+            else:
+                self.finish(key, self.run_job(key, func))
+            self.queue.task_done()
+
+    def run_job(self, key, func):
+        """ Runs a job and returns True if it succeeded. A job that ran past its deadline counts as failed, though it's
+            only found out once it returns. """
+        job = self.jobs[key]
+        job["started"] = self.clock.time()
+        try:
+            success = func() is not False
+        except Exception as e:
+            self.helper.log(self.debug, "Jobs: {} failed: {}".format(key, e))
+            success = False
+
+        elapsed = self.clock.time() - job["started"]
+        if elapsed > job["deadline"]:
+            self.helper.log(self.debug, "Jobs: {} took {:.1f}s, past its {}s deadline".format(key, elapsed, job["deadline"]))
+            success = False
+        return success
+
+    def finish(self, key, success):
+        with self.lock:
+            job = self.jobs[key]
+            job["in_flight"] = False
+            interval = job.get("interval", 0)
+            if success:
+                job["failures"] = 0
+                job["last_success"] = self.clock.time()
+                delay = interval
+            else:
+                job["failures"] += 1
+                delay = min(interval * 2 ** job["failures"], max(interval, self.max_backoff))
+                self.helper.log(self.debug, "Jobs: {} has failed {} time(s), retrying in {:.0f}s".format(key, job["failures"], delay))
+
+            job["next_run"] = self.clock.time() + delay * random.uniform(1 - self.jitter, 1 + self.jitter)
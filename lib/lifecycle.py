@@ -0,0 +1,61 @@
+""" Keeps the full screen plugins that aren't on screen within a memory budget """
+import collections
+import threading
+
+
+class PluginLifecycle:
+    """ Full screen plugins are singletons, so every one that has been shown stays alive with its backing surfaces.
+        Once they add up to more than budget bytes, the ones that have been off screen the longest are suspended (see
+        FullScreenPlugin.suspend()) until they're needed again. A budget of 0 never suspends anything. """
+    def __init__(self, helper, budget, debug=False):
+        self.helper = helper
+        self.budget = budget
+        self.debug = debug
+        # Least recently shown first. The value is whether the plugin is suspended.
+        self.plugins = collections.OrderedDict()
+        self.lock = threading.RLock()
+
+    def resume(self, plugin):
+        """ Gets a plugin ready to be pre-warmed or shown, resuming it if it was suspended """
+        with self.lock:
+            if self.plugins.get(plugin, False):
+                plugin.resume()
+                self.helper.log(self.debug, "Lifecycle: resumed {}".format(type(plugin).__name__))
+            self.plugins[plugin] = False
+
+    def activate(self, plugin):
+        """ Call when plugin is switched to. Suspends whatever it takes for the others to fit in the budget. """
+        with self.lock:
+            self.resume(plugin)
+            self.plugins.move_to_end(plugin)
+            self.enforce(plugin)
+
+    def forget(self, plugin):
+        """ Stops keeping track of a plugin that has been replaced (e.g. after its settings changed) """
+        with self.lock:
+            self.plugins.pop(plugin, None)
+
+    def enforce(self, visible_plugin):
+        if self.budget <= 0:
+            return
+
+        with self.lock:
+            sizes = {i: i.get_memory_size() for i in self.plugins if not self.plugins[i]}
+            total = sum(sizes.values())
+            for plugin in list(self.plugins):
+                if total <= self.budget:
+                    break
+                if plugin is visible_plugin or self.plugins[plugin] or sizes[plugin] == 0:
+                    continue
+
+                plugin.suspend()
+                self.plugins[plugin] = True
+                total -= sizes[plugin]
+                self.helper.log(self.debug, "Lifecycle: suspended {} (least recently shown) to free {}, {} of {} "
+                                            "now in use".format(type(plugin).__name__, self.helper.convert_size(sizes[plugin]),
+                                                                self.helper.convert_size(total),
+                                                                self.helper.convert_size(self.budget)))
+
+            if total > self.budget:
+                self.helper.log(self.debug, "Lifecycle: still {} over budget with {} on screen".format(
+                    self.helper.convert_size(total - self.budget), type(visible_plugin).__name__))
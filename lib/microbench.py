@@ -0,0 +1,172 @@
+""" Micro-benchmarks for the pure-Python hot paths, with a history so regressions stand out """
+import json
+import os
+import platform
+import random
+import statistics
+import time
+import timeit
+
+
+class MicroBenchmark:
+    """ Times small functions with timeit and compares them to the runs saved in a history file. A result is flagged as
+        a regression when it is more than threshold percent slower than the median of the last few saved runs. """
+    def __init__(self, helper, history_file=None, threshold=10, repeat=5, min_time=0.2, history_size=10, debug=False):
+        self.helper = helper
+        self.history_file = history_file
+        self.threshold = threshold
+        self.repeat = repeat
+        self.min_time = min_time
+        self.history_size = history_size
+        self.debug = debug
+        self.benchmarks = []
+        self.results = {}
+
+    def add(self, name, func):
+        self.benchmarks.append((name, func))
+
+    def run(self, names=None):
+        """ Runs every benchmark (or only those whose name contains one of names) and returns the results """
+        for name, func in self.benchmarks:
+            if names and not any(i in name for i in names):
+                continue
+
+            timer = timeit.Timer(func)
+            # Run enough loops for each repeat to take at least min_time
+            number = 1
+            while timer.timeit(number) < self.min_time:
+                number *= 2
+            times = [i / number * 1000000 for i in timer.repeat(self.repeat, number)]
+            # The best time is the least disturbed by everything else running on the box
+            self.results[name] = {"best_us": min(times), "median_us": statistics.median(times), "loops": number}
+            self.helper.log(self.debug, "Microbench: {}: {:.1f}us".format(name, self.results[name]["best_us"]))
+        return self.results
+
+    def load_history(self):
+        if not self.history_file:
+            return []
+        try:
+            with open(self.history_file, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return []
+
+    def compare(self, history):
+        """ Returns {name: (baseline_us, change in percent, is a regression)} for every result with a baseline """
+        comparison = {}
+        for name in self.results:
+            past = [run["results"][name]["best_us"] for run in history[-self.history_size:] if name in run["results"]]
+            if len(past) == 0:
+                continue
+            baseline = statistics.median(past)
+            change = (self.results[name]["best_us"] - baseline) / baseline * 100
+            comparison[name] = (baseline, change, change > self.threshold)
+        return comparison
+
+    def save(self, history):
+        history.append({"time": time.time(),
+                        "python": platform.python_version(),
+                        "machine": platform.machine(),
+                        "results": self.results})
+        os.makedirs(os.path.dirname(self.history_file), exist_ok=True)
+        with open(self.history_file, "w") as f:
+            json.dump(history, f, indent=1)
+
+    def report(self, save=True):
+        """ Prints the results next to their baselines. Returns the names of the benchmarks that regressed. """
+        history = self.load_history()
+        comparison = self.compare(history)
+        regressions = []
+        width = max([len(i) for i in self.results] + [10])
+        print("{:<{width}}  {:>12}  {:>12}  {:>8}".format("benchmark", "best", "baseline", "change", width=width))
+        for name in self.results:
+            line = "{:<{width}}  {:>10.1f}us".format(name, self.results[name]["best_us"], width=width)
+            if name in comparison:
+                baseline, change, regressed = comparison[name]
+                line += "  {:>10.1f}us  {:>+7.1f}%".format(baseline, change)
+                if regressed:
+                    line += "  REGRESSION"
+                    regressions.append(name)
+            print(line)
+
+        if save and self.history_file:
+            self.save(history)
+        return regressions
+
+
+def make_life_world(width, height, population_chance=25, seed=1):
+    """ A random Game of Life world, the same every time for a given seed """
+    rng = random.Random(seed)
+    return [rng.randint(1, 100) <= population_chance for i in range(width * height)]
+
+
+def make_onecall_payload(hours=48, days=8, start=None):
+    """ A OpenWeatherMap onecall response with the fields the plugin reads (and a few it doesn't, like the real thing) """
+    start = int(start if start is not None else time.time()) // 3600 * 3600
+    rng = random.Random(2)
+    icons = ["01d", "02d", "03d", "04d", "09d", "10d", "11d", "13d", "50d", "01n", "02n", "10n"]
+    descriptions = ["clear sky", "few clouds", "scattered clouds", "broken clouds", "shower rain", "light rain",
+                    "thunderstorm", "snow", "mist"]
+
+    def weather():
+        i = rng.randrange(len(descriptions))
+        return [{"id": 800 + i, "main": descriptions[i].title(), "description": descriptions[i], "icon": icons[i]}]
+
+    payload = {"lat": 43.65, "lon": -79.38, "timezone": "America/Toronto", "timezone_offset": -14400,
+               "current": {"dt": start, "sunrise": start - 4 * 3600, "sunset": start + 8 * 3600, "temp": 21.4,
+                           "feels_like": 21.1, "pressure": 1016, "humidity": 58, "dew_point": 12.7, "uvi": 4.2,
+                           "clouds": 40, "visibility": 10000, "wind_speed": 4.6, "wind_deg": 220, "weather": weather()},
+               "hourly": [],
+               "daily": []}
+    for i in range(hours):
+        payload["hourly"].append({"dt": start + i * 3600, "temp": 15 + rng.random() * 10, "feels_like": 20.5,
+                                  "pressure": 1015, "humidity": 60, "dew_point": 12.1, "uvi": 1.5, "clouds": 75,
+                                  "visibility": 10000, "wind_speed": rng.random() * 8, "wind_deg": 200,
+                                  "wind_gust": 9.1, "weather": weather(), "pop": rng.random()})
+    for i in range(days):
+        payload["daily"].append({"dt": start + i * 86400, "sunrise": start + i * 86400 - 4 * 3600,
+                                 "sunset": start + i * 86400 + 8 * 3600, "moonrise": start + i * 86400,
+                                 "moonset": start + i * 86400 + 12 * 3600, "moon_phase": (0.1 + i * 0.03) % 1,
+                                 "temp": {"day": 22.1, "min": 12 + rng.random() * 4, "max": 20 + rng.random() * 8,
+                                          "night": 15.2, "eve": 19.8, "morn": 13.4},
+                                 "feels_like": {"day": 21.9, "night": 15.0, "eve": 19.5, "morn": 13.0},
+                                 "pressure": 1014, "humidity": 55, "dew_point": 11.8, "wind_speed": rng.random() * 8,
+                                 "wind_deg": 210, "wind_gust": 10.2, "weather": weather(), "clouds": 50,
+                                 "pop": rng.random(), "rain": rng.random() * 5, "uvi": 6.1})
+    return payload
+
+
+def make_ftl_output(queries=10000, start=None):
+    """ Output of the FTL telnet commands the Pi-hole plugin parses, with queries lines of getallqueries """
+    start = int(start if start is not None else time.time()) - queries * 5
+    rng = random.Random(3)
+    domains = ["example.com", "api.github.com", "ads.doubleclick.net", "www.google.com", "graph.facebook.com",
+               "telemetry.microsoft.com", "cdn.jsdelivr.net", "pool.ntp.org", "connectivity-check.ubuntu.com",
+               "tracking.example.org"]
+    clients = ["192.168.1.{}".format(i) for i in range(10, 30)]
+    types = ["A", "AAAA", "HTTPS", "PTR"]
+
+    output = {"cache_info": "cache-size: 10000\ncache-live-freed: 0\ncache-inserted: 12345\nipv4: 812\nipv6: 231\n"
+                            "srv: 2\ncname: 129\nds: 0\ndnskey: 0\nother: 14\nexpired: 56\nimmortal: 3\n---EOM---\n",
+              "recent_blocked": "\n".join(domains[i] for i in range(0, 10, 2)) + "\n---EOM---\n",
+              "summary": "domains_being_blocked 142311\ndns_queries_today {}\nads_blocked_today 1432\n"
+                         "ads_percentage_today 14.32\nunique_domains 1020\nqueries_forwarded 6321\nqueries_cached 2247\n"
+                         "clients_ever_seen 20\nunique_clients 18\ndns_queries_all_types {}\nreply_NODATA 120\n"
+                         "reply_NXDOMAIN 32\nreply_CNAME 1843\nreply_IP 7201\nprivacy_level 0\nstatus enabled\n"
+                         "---EOM---\n".format(queries, queries),
+              "gravity_last_update": '{"file_exists":true,"absolute":1656500000,"relative":{"days":1,"hours":2,"minutes":3}}',
+              "top_ads": "".join("{} {} {}\n".format(i, 100 - i * 7, domains[i * 2]) for i in range(5)),
+              "top_queries": "".join("{} {} {}\n".format(i, 900 - i * 50, domains[i]) for i in range(5)),
+              "top_clients": "".join("{} {} {} {}\n".format(i, 2000 - i * 100, clients[i], "host-{}".format(i))
+                                     for i in range(5)),
+              "forward_destinations": "-2 8.12 blocklist blocklist\n-1 21.3 cache cache\n0 70.58 127.0.0.1#5335 unbound\n",
+              "overtime": "".join("{} {} {}\n".format(start + i * 600, 80 + i % 40, 10 + i % 7) for i in range(144))}
+
+    lines = []
+    for i in range(queries):
+        lines.append('{} {} {} {} {} 0 {} {} "" 127.0.0.1#5335 "{}"'.format(start + i * 5, rng.choice(types),
+                                                                           rng.choice(domains), rng.choice(clients),
+                                                                           rng.randint(1, 3), rng.randint(0, 4),
+                                                                           rng.randint(1, 400), i))
+    output["all_queries"] = "\n".join(lines) + "\n---EOM---\n"
+    return output
@@ -0,0 +1,110 @@
+""" The message popups (see helper.send_message()), drawn in a layer above the plugins """
+import collections
+
+import pygame
+
+
+class NotificationLayer:
+    """ Shows queued messages one after the other at the bottom of the screen. Each is rendered once when it comes up,
+        stays for fade_delay seconds and then fades out over fade_time seconds by changing its alpha only. Like the
+        profiler HUD, what is under the popup is saved and put back before the plugins update, so they never see it. """
+    def __init__(self, helper, canvas, font, clock, fps, fade_delay, fade_time, debug=False, max_queued=10):
+        self.helper = helper
+        self.canvas = canvas
+        self.font = font
+        self.clock = clock
+        self.fps = fps
+        self.fade_delay = fade_delay
+        self.fade_time = fade_time
+        self.debug = debug
+
+        self.queue = collections.deque(maxlen=max_queued)
+        self.surface = None
+        self.started = 0
+        self.opacity = 0
+        self.rect = None
+        self.saved_background = None
+        self.bottom_margin = 50
+
+    def add(self, text):
+        if len(self.queue) == self.queue.maxlen:
+            self.helper.log(self.debug, "Notifications: queue full, dropping \"{}\"".format(self.queue[0]))
+        self.queue.append(text)
+
+    @property
+    def visible(self):
+        return self.surface is not None or len(self.queue) > 0
+
+    def render(self, text):
+        surf_text = self.helper.render_text(self.font, text, True, (200, 200, 200))
+        surface = pygame.Surface((surf_text.get_width() + 40,  # margin
+                                  surf_text.get_height() + 40))
+        surface.fill((32, 32, 32))
+        surface.blit(surf_text, (int(surface.get_width()/2 - surf_text.get_width()/2),
+                                 int(surface.get_height()/2 - surf_text.get_height()/2)))
+        pygame.draw.rect(surface, (200, 200, 200), (0, 0, surface.get_width(), surface.get_height()), 3)
+        return surface
+
+    def get_opacity(self, elapsed):
+        """ The popup is fully opaque for fade_delay seconds, then fades out over fade_time seconds """
+        if elapsed < self.fade_delay:
+            return 255
+        if self.fade_time <= 0:
+            return 0
+        return max(0, int(255 * (1 - (elapsed - self.fade_delay) / self.fade_time)))
+
+    def get_next_deadline(self):
+        """ When the popup next has to be redrawn, or None if nothing is showing """
+        if self.surface is None:
+            return self.clock.time() if len(self.queue) > 0 else None
+        if self.opacity == 255:
+            return self.started + self.fade_delay
+        return self.clock.time() + 1.0 / self.fps
+
+    def restore_background(self):
+        """ Puts back what was under the popup. Call before the plugins update. """
+        if self.saved_background is not None:
+            self.canvas.blit(self.saved_background, self.rect)
+            self.saved_background = None
+
+    def invalidate(self):
+        """ Call when the whole screen is about to be redrawn (e.g. after a plugin switch), since what was saved from
+            under the popup is out of date """
+        self.saved_background = None
+        self.opacity = 0
+
+    def draw(self, compositor):
+        """ Draws the current popup over the plugins. Call after the plugins update and before presenting, with
+            restore_background() called before they updated. """
+        if self.surface is not None:
+            opacity = self.get_opacity(self.clock.time() - self.started)
+        else:
+            opacity = 0
+
+        if opacity <= 0 and len(self.queue) > 0:
+            if self.rect is not None:
+                compositor.add_dirty_rect(self.rect)
+            self.surface = self.render(self.queue.popleft())
+            self.started = self.clock.time()
+            self.rect = self.surface.get_rect(midbottom=(self.canvas.get_width() // 2,
+                                                         self.canvas.get_height() - self.bottom_margin))
+            self.rect = self.rect.clip(self.canvas.get_rect())
+            self.opacity = 0
+            opacity = 255
+        elif opacity <= 0:
+            if self.rect is not None:
+                # Faded out: what the plugins drew under it is what's on the canvas now
+                compositor.add_dirty_rect(self.rect)
+            self.surface = None
+            self.rect = None
+            return
+
+        # Only push the popup again if it changed or a plugin drew underneath it
+        changed = opacity != self.opacity or any(self.rect.colliderect(i) for i in compositor.dirty_rects)
+
+        self.saved_background = self.canvas.subsurface(self.rect).copy()
+        self.surface.set_alpha(opacity)
+        self.canvas.blit(self.surface, self.rect)
+        self.opacity = opacity
+        if changed:
+            compositor.add_dirty_rect(self.rect)
@@ -1,38 +1,125 @@
-import configparser
-import os
+import threading
+
+import pygame
+
+from lib.clock import Clock
+from lib.surfaces import SurfaceFactory
 
 
 class Plugin:
+    # Shared services, set up by the app before any plugins are built: the background job scheduler (lib/jobs.py), the
+    # pooled HTTP client (lib/http_client.py), the on-disk response cache (lib/http_cache.py) and the compiled plugin
+    # settings (lib/config.py)
+    jobs = None
+    http = None
+    http_cache = None
+    config_cache = None
+    # What plugins (and the main loop) tell the time with. Benchmarks swap in a lib.clock.VirtualClock.
+    clock = Clock()
+    # Spreads heavy redraws over several frames (lib/incremental.py). None renders them in one go.
+    renderer = None
+    # Makes the surfaces plugins draw on, at the configured color depth (lib/surfaces.py)
+    surfaces = SurfaceFactory()
+
     def __init__(self, helper, canvas, plugin_path, app_plugin_config):
         self.helper = helper
         self.canvas = canvas
+        # The app's config.ini section this plugin was built from. Handy for naming jobs.
+        self.config_section = app_plugin_config.name
         self.debug = app_plugin_config.getboolean("debug")
         self.plugin_config = Plugin.get_config(plugin_path, app_plugin_config, type(self).__name__)
         self.screen_width = self.canvas.get_width()
         self.screen_height = self.canvas.get_height()
 
+        # Plugins can ask for their own update rate with a frames_per_second key, otherwise they run at the app's rate
+        self.frames_per_second = None
+        if "frames_per_second" in self.plugin_config:
+            self.frames_per_second = self.plugin_config.getint("frames_per_second")
+
         self.READY_TO_SWITCH = False
 
         self.just_in = False
+        # Set when another plugin (a ScaledPlugin) runs this one and puts what it draws on screen. That's the one the
+        #    scheduler knows about.
+        self.hosted_by = None
+
+        # Plugins that set this to True report what they changed with mark_dirty(). Everyone else is assumed to have
+        # redrawn their whole canvas on every update.
+        self.reports_damage = False
+        self.dirty_rects = []
 
     def update(self, tick, fps):
         raise NotImplementedError("All plugins must override the update function!")
 
+    def next_wakeup(self, last_update):
+        """ Returns the time (as in clock.time()) the plugin next needs an update, given the time of its last one.
+            None means it just runs at its frames_per_second. """
+        return None
+
+    def render_incrementally(self, generator, on_done, on_error=None):
+        """ Runs generator, which yields every now and then while it draws on a surface of its own, a slice at a time
+            within the main loop's render budget. on_done() is called once it has finished (to swap the surface in) and
+            the plugin is then woken up. If it raises, on_error(error) (render_failed() by default) is called instead.
+            Without a renderer it all happens straight away, and errors are raised from here. """
+        if Plugin.renderer is None:
+            Plugin.render_now(generator)
+            on_done()
+        else:
+            Plugin.renderer.submit(self, generator, on_done, on_error if on_error is not None else self.render_failed)
+
+    def render_failed(self, error):
+        """ Called when a render started with render_incrementally() raised. What it drew is never swapped in, so the
+            last page is shown again, all of it. It's drawn again the next time the plugin has something new. """
+        self.mark_dirty()
+
+    def is_rendering(self):
+        return Plugin.renderer is not None and Plugin.renderer.is_busy(self)
+
+    def cancel_render(self):
+        if Plugin.renderer is not None:
+            Plugin.renderer.cancel(self)
+
+    @staticmethod
+    def render_now(generator):
+        """ Runs a render generator to the end """
+        for _ in generator:
+            pass
+
+    def mark_dirty(self, rect=None):
+        """ Reports an area of the canvas (or the whole canvas if rect is None) that changed during this update """
+        if rect is None:
+            rect = self.canvas.get_rect()
+        self.dirty_rects.append(pygame.Rect(rect))
+
+    def get_dirty_rects(self):
+        """ Returns and clears the areas of the canvas that changed since the last call """
+        if not self.reports_damage:
+            self.dirty_rects = []
+            return [self.canvas.get_rect()]
+
+        dirty_rects = self.dirty_rects
+        self.dirty_rects = []
+        return dirty_rects
+
     @staticmethod
     def get_config(plugin_path, app_plugin_config, plugin_config_section):
-        config = configparser.RawConfigParser()
-        config.read(os.path.abspath(os.path.join(plugin_path, "config.ini")))
-        for i in list(app_plugin_config):
-            config[plugin_config_section][i] = app_plugin_config[i]
-        return config[plugin_config_section]
+        return Plugin.config_cache.get_plugin_config(plugin_path, app_plugin_config, plugin_config_section)
 
 
 class Singleton(type):
     _instances = {}
+    # Plugins can be built on a pre-warm thread while the main thread switches, so only build each one once
+    _lock = threading.RLock()
 
     def __call__(cls, *args, **kwargs):
-        if cls not in cls._instances:
-            cls._instances[cls] = super(Singleton, cls).__call__(*args, **kwargs)
-        else:
-            cls._instances[cls].just_in = True
-        return cls._instances[cls]
+        with cls._lock:
+            if cls not in cls._instances:
+                cls._instances[cls] = super(Singleton, cls).__call__(*args, **kwargs)
+            else:
+                cls._instances[cls].just_in = True
+            return cls._instances[cls]
+
+    def discard_instance(cls):
+        """ Forgets the instance, so the next call builds a new one. Returns the old one (or None). """
+        with cls._lock:
+            return cls._instances.pop(cls, None)
@@ -0,0 +1,72 @@
+""" A cached class -> module index of the plugins folder, so only configured plugins need to be imported """
+import ast
+import json
+import os
+
+INDEX_VERSION = 1
+PLUGIN_BASE_CLASSES = ["Plugin", "FullScreenPlugin", "WidgetPlugin"]
+
+
+def get_plugin_index(helper, plugin_path, index_file, debug=False):
+    """ Returns {class name: module name} for every plugin class under plugin_path. Modules are parsed, not imported,
+        and the results are cached in index_file, keyed by each module's mtime. """
+    cached_files = {}
+    try:
+        with open(index_file, "r") as f:
+            cache = json.load(f)
+        if cache.get("version") == INDEX_VERSION:
+            cached_files = cache["files"]
+    except (OSError, ValueError, KeyError):
+        helper.log(debug, "No usable plugin index at {}, building it".format(index_file))
+
+    files = {}
+    changed = False
+    for folder in sorted(os.listdir(plugin_path)):
+        full_path = os.path.join(plugin_path, folder)
+        if not os.path.isdir(full_path):
+            continue
+
+        for file in sorted(os.listdir(full_path)):
+            if file[-3:] != ".py":
+                continue
+
+            module = "plugins.{}.{}".format(folder, file[:-3])
+            mtime = os.path.getmtime(os.path.join(full_path, file))
+            if module in cached_files and cached_files[module]["mtime"] == mtime:
+                files[module] = cached_files[module]
+            else:
+                helper.log(debug, "Indexing plugin module {}".format(module))
+                files[module] = {"mtime": mtime, "classes": find_plugin_classes(os.path.join(full_path, file))}
+                changed = True
+
+    if changed or len(files) != len(cached_files):
+        try:
+            with open(index_file, "w") as f:
+                json.dump({"version": INDEX_VERSION, "files": files}, f, indent=1)
+        except OSError as e:
+            helper.log(debug, "Couldn't save the plugin index to {}: {}".format(index_file, e))
+
+    index = {}
+    for module in files:
+        for class_name in files[module]["classes"]:
+            index[class_name] = module
+    return index
+
+
+def find_plugin_classes(filename):
+    """ Returns the names of the classes in a module that derive from one of the plugin base classes (or from another
+        plugin class in the same module) """
+    with open(filename, "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename)
+
+    plugin_classes = []
+    known_bases = list(PLUGIN_BASE_CLASSES)
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef):
+            for base in node.bases:
+                base_name = base.attr if isinstance(base, ast.Attribute) else getattr(base, "id", "")
+                if base_name in known_bases:
+                    plugin_classes.append(node.name)
+                    known_bases.append(node.name)
+                    break
+    return plugin_classes
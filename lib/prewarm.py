@@ -0,0 +1,71 @@
+""" Builds and warms up the next full screen plugin on a background thread before it's switched to """
+import threading
+import time
+
+
+class PluginPrewarmer:
+    """ Holds at most one plugin that is being (or has been) built ahead of time. Switching only ever waits for the
+        plugin to be built, never for its prewarm(), which can be fetching from a slow upstream. That carries on in the
+        background once the plugin is on screen (its jobs see to it that nothing is fetched twice). """
+    def __init__(self, helper, debug=False):
+        self.helper = helper
+        self.debug = debug
+        self.index = None
+        self.instance = None
+        self.thread = None
+        # Set once the plugin being pre-warmed has been built (or building it failed)
+        self.built = None
+        self.lock = threading.Lock()
+        self.build_time = 0
+
+    def is_started(self, index):
+        return self.index == index
+
+    def start(self, index, build_plugin):
+        """ Starts building the plugin at index with build_plugin(), then calls its prewarm() hook """
+        with self.lock:
+            self.index = index
+            self.instance = None
+            self.built = threading.Event()
+        self.thread = threading.Thread(target=self.prewarm_thread, args=([build_plugin, self.built]))
+        self.thread.daemon = True
+        self.thread.start()
+
+    def prewarm_thread(self, build_plugin, built):
+        start = time.time()
+        try:
+            instance = build_plugin()
+        except Exception as e:
+            self.helper.log(self.debug, "Building plugin {} ahead of time failed: {}".format(self.index, e))
+            built.set()
+            return
+
+        with self.lock:
+            # Unless it was taken (or given up on) while it was being built
+            if built is self.built:
+                self.instance = instance
+        built.set()
+
+        try:
+            instance.prewarm()
+        except Exception as e:
+            # The plugin itself is fine, it'll just have to fetch its data once it's on screen
+            self.helper.log(self.debug, "Pre-warming {} failed: {}".format(type(instance).__name__, e))
+
+        self.build_time = time.time() - start
+        self.helper.log(self.debug, "Pre-warmed {} in {:.0f}ms".format(type(instance).__name__, self.build_time * 1000))
+
+    def take(self, index):
+        """ Returns the plugin built for index (waiting for it if it's still being built, but not for its prewarm()), or
+            None if it wasn't built ahead of time. Either way, the prewarmer is free for the next one afterwards. """
+        built = self.built if self.index == index else None
+        if built is not None:
+            built.wait()
+
+        with self.lock:
+            instance = self.instance if built is not None else None
+            self.index = None
+            self.instance = None
+            self.built = None
+        self.thread = None
+        return instance
@@ -0,0 +1,311 @@
+""" Runs a plugin in a process of its own, drawing into shared memory that the main process shows """
+import configparser
+import importlib
+import multiprocessing
+import os
+import traceback
+from multiprocessing import shared_memory
+
+import pygame
+
+from lib.fullscreen_plugin import FullScreenPlugin
+from lib.plugin import Plugin
+
+PIXEL_FORMAT = "RGBX"
+# How often the host looks for the frame it asked for, in seconds
+FRAME_POLL_INTERVAL = 0.05
+
+
+class ProcessPlugin(FullScreenPlugin):
+    """ Stands in for a plugin that runs in a worker process, so it has a core (and a GIL) to itself and can't take the
+        display down with it. The worker's plugin draws straight into a shared memory buffer that both sides wrap as a
+        pygame Surface, and the parts it changed are copied from there onto the screen once, without being pickled. The
+        worker holds a lock while it draws, so half-drawn frames are never copied. Each update() of this one asks the
+        worker for a frame (one at a time, so a slow worker never falls behind) and shows whatever it finished since. The host runs at the hosted
+        plugin's frames_per_second and next_wakeup(), which the worker sends back with each frame. A worker that dies,
+        or doesn't finish a frame within update_timeout seconds, is started again after restart_delay seconds. Hosts are
+        kept per config section, like singletons. """
+    hosts = {}
+    # The app's setup_services(appconfig, debug), which workers call to get their own shared services. Set by the app.
+    setup_services = None
+
+    def __init__(self, helper, canvas, app_plugin_config, plugin_class, appconfig, restart_delay=5, update_timeout=30):
+        plugin_path = os.path.dirname(os.path.abspath(importlib.import_module(plugin_class.__module__).__file__))
+        FullScreenPlugin.__init__(self, helper, canvas, plugin_path, app_plugin_config)
+        # The settings (frames_per_second included) are the hosted plugin's, not ones of a ProcessPlugin section
+        self.plugin_config = Plugin.get_config(plugin_path, app_plugin_config, plugin_class.__name__)
+        if "frames_per_second" in self.plugin_config:
+            self.frames_per_second = self.plugin_config.getint("frames_per_second")
+        self.plugin_class = plugin_class
+        self.spec = {"module": plugin_class.__module__,
+                     "class_name": plugin_class.__name__,
+                     "section": app_plugin_config.name,
+                     "section_values": dict(app_plugin_config),
+                     "appconfig": dict(appconfig),
+                     "setup_services": ProcessPlugin.setup_services,
+                     "size": canvas.get_size(),
+                     "debug": self.debug}
+        self.restart_delay = restart_delay
+        self.update_timeout = update_timeout
+        self.reports_damage = True
+
+        self.context = multiprocessing.get_context("spawn")
+        self.shm = None
+        self.surface = None
+        self.lock = None
+        self.conn = None
+        self.process = None
+        self.waiting = False
+        # When the last frame was asked for, and how long after that the worker's plugin wants its next update
+        self.update_sent = None
+        self.wakeup_delay = None
+        self.fps = self.frames_per_second
+        # The tick the worker's plugin gets next. It only counts the updates that are sent on.
+        self.tick = 0
+        self.restart_time = None
+        self.full_redraw = True
+        self.start()
+
+    @staticmethod
+    def host(helper, canvas, app_plugin_config, plugin_class, appconfig):
+        """ Returns the host for a config section, starting one if there isn't one yet """
+        host = ProcessPlugin.hosts.get(app_plugin_config.name)
+        if host is None or host.canvas.get_size() != canvas.get_size():
+            if host is not None:
+                host.stop()
+            host = ProcessPlugin(helper, canvas, app_plugin_config, plugin_class, appconfig)
+            ProcessPlugin.hosts[app_plugin_config.name] = host
+        else:
+            host.canvas = canvas
+            host.just_in = True
+        return host
+
+    @staticmethod
+    def discard(section):
+        host = ProcessPlugin.hosts.pop(section, None)
+        if host is not None:
+            host.stop()
+        return host
+
+    @staticmethod
+    def stop_all():
+        for section in list(ProcessPlugin.hosts):
+            ProcessPlugin.discard(section)
+
+    def start(self):
+        width, height = self.spec["size"]
+        self.shm = shared_memory.SharedMemory(create=True, size=width * height * 4)
+        self.surface = pygame.image.frombuffer(self.shm.buf, (width, height), PIXEL_FORMAT)
+        self.lock = self.context.Lock()
+        self.conn, child_conn = self.context.Pipe()
+        self.process = self.context.Process(target=host_main, args=(self.spec, self.shm.name, self.lock, child_conn),
+                                            name="pidisplay-{}".format(self.spec["section"]), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.waiting = False
+        self.update_sent = None
+        self.wakeup_delay = None
+        self.tick = 0
+        self.restart_time = None
+        self.full_redraw = True
+        self.helper.log(self.debug, "ProcessPlugin: started {} ({}) in process {}".format(
+            self.spec["section"], self.spec["class_name"], self.process.pid))
+
+    def stop(self):
+        if self.process is None:
+            return
+        try:
+            self.conn.send(("stop",))
+        except (OSError, ValueError):
+            pass
+        self.process.join(2)
+        if self.process.is_alive():
+            # SDL turns SIGTERM into a quit event, which a stuck worker never gets to, so it's SIGKILL
+            self.process.kill()
+            self.process.join()
+        self.release()
+
+    def release(self):
+        self.conn.close()
+        self.process = None
+        self.conn = None
+        # The Surface holds on to the buffer, so it has to go before the shared memory can be closed
+        self.surface = None
+        self.shm.close()
+        self.shm.unlink()
+        self.shm = None
+
+    def poll(self):
+        """ Picks up what the worker has sent since the last update """
+        rects = []
+        try:
+            while self.conn.poll():
+                message = self.conn.recv()
+                if message[0] == "frame":
+                    rects.extend(message[1])
+                    self.wakeup_delay = message[2]
+                    self.waiting = False
+                elif message[0] == "switch":
+                    self.READY_TO_SWITCH = True
+                elif message[0] == "message":
+                    self.helper.send_message(message[1])
+        except (EOFError, OSError):
+            pass
+        return rects
+
+    def restart_later(self):
+        """ Lets go of a worker that died or hung, and has it started again restart_delay seconds from now """
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.release()
+        self.restart_time = self.clock.time() + self.restart_delay
+
+    def update(self, tick, fps):
+        self.fps = fps
+        if tick == 0:
+            self.tick = 0
+        if self.process is None:
+            # Suspended, or waiting to be started again
+            if self.restart_time is not None and self.clock.time() >= self.restart_time:
+                self.start()
+            return
+
+        rects = self.poll()
+        if not self.process.is_alive():
+            self.helper.log(self.debug, "ProcessPlugin: {} exited with code {}, restarting it in {}s".format(
+                self.spec["section"], self.process.exitcode, self.restart_delay))
+            self.restart_later()
+            return
+        if self.waiting and self.clock.time() - self.update_sent > self.update_timeout:
+            self.helper.log(self.debug, "ProcessPlugin: {} hasn't finished a frame in {}s, restarting it in {}s".format(
+                self.spec["section"], self.update_timeout, self.restart_delay))
+            self.restart_later()
+            return
+
+        if self.full_redraw or self.just_in:
+            rects = [self.canvas.get_rect()]
+            self.full_redraw = False
+        if len(rects) > 0:
+            # The worker only draws while asked for a frame (or on a click), so this hardly ever has to wait. When it
+            #    would, the copy is left for a full redraw on the next update, rather than holding up the main loop.
+            if self.lock.acquire(block=False):
+                try:
+                    for rect in rects:
+                        self.canvas.blit(self.surface, rect, rect)
+                finally:
+                    self.lock.release()
+                for rect in rects:
+                    self.mark_dirty(rect)
+            else:
+                self.full_redraw = True
+
+        # The next frame is asked for once the worker's plugin is due (or straight away when just switched to)
+        if not self.waiting and (tick == 0 or self.update_sent is None or self.clock.time() >= self.get_worker_due_time()):
+            try:
+                self.conn.send(("update", self.tick, fps))
+                self.waiting = True
+                self.update_sent = self.clock.time()
+                self.tick = 1 if self.tick == fps else self.tick + 1
+            except OSError:
+                # It has just died, which the next update will notice
+                pass
+
+    def next_wakeup(self, last_update):
+        if self.process is None:
+            return self.restart_time
+        if self.update_sent is None:
+            return None
+        if self.waiting:
+            # Back soon to show the frame once it's done
+            return last_update + FRAME_POLL_INTERVAL
+        return self.get_worker_due_time()
+
+    def get_worker_due_time(self):
+        if self.wakeup_delay is not None:
+            return self.update_sent + self.wakeup_delay
+        return self.update_sent + 1.0 / self.fps
+
+    def handle_click(self, pos):
+        if self.conn is not None:
+            try:
+                self.conn.send(("click", pos))
+            except OSError:
+                pass
+
+    def get_memory_size(self):
+        return self.shm.size if self.shm is not None else 0
+
+    def suspend(self):
+        # The worker's memory is what's worth getting back
+        self.stop()
+
+    def resume(self):
+        if self.process is None:
+            self.start()
+
+
+def host_main(spec, shm_name, lock, conn):
+    """ A worker process: builds the plugin and draws a frame each time it's asked to """
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    os.environ["SDL_AUDIODRIVER"] = "dummy"
+
+    from lib import helper
+
+    debug = spec["debug"]
+    shm = shared_memory.SharedMemory(name=shm_name)
+    surface = None
+    plugin = None
+    try:
+        pygame.init()
+        pygame.display.set_mode((1, 1))
+
+        config = configparser.RawConfigParser()
+        config.read_dict({"pidisplay": spec["appconfig"], spec["section"]: spec["section_values"]})
+        spec["setup_services"](config["pidisplay"], debug)
+
+        # The plugin's canvas is the shared memory itself, and what it makes is in the same format
+        surface = pygame.image.frombuffer(shm.buf, spec["size"], PIXEL_FORMAT)
+        Plugin.surfaces.set_canvas(surface)
+        plugin_class = getattr(importlib.import_module(spec["module"]), spec["class_name"])
+        plugin = plugin_class(helper, surface, config[spec["section"]])
+        if hasattr(plugin, "prewarm"):
+            plugin.prewarm()
+
+        while True:
+            message = conn.recv()
+            if message[0] == "stop":
+                break
+            elif message[0] == "click":
+                with lock:
+                    plugin.handle_click(message[1])
+            elif message[0] == "update":
+                started = Plugin.clock.time()
+                with lock:
+                    plugin.update(message[1], message[2])
+                rects = [tuple(i) for i in plugin.get_dirty_rects()]
+
+                for event in pygame.event.get(helper.EVENT_MESSAGE):
+                    conn.send(("message", event.message[0]))
+                if getattr(plugin, "READY_TO_SWITCH", False):
+                    plugin.READY_TO_SWITCH = False
+                    conn.send(("switch",))
+                # When it next wants an update, as a delay, since the two processes' clocks needn't agree
+                wakeup = plugin.next_wakeup(started)
+                conn.send(("frame", rects, wakeup - started if wakeup is not None else None))
+    except (EOFError, KeyboardInterrupt):
+        pass
+    except Exception:
+        helper.log(True, "ProcessPlugin: {} crashed:\n{}".format(spec["section"], traceback.format_exc()))
+        raise SystemExit(1)
+    finally:
+        # The Surfaces hold on to the buffer, so they have to go before the shared memory can be closed
+        surface = None
+        if plugin is not None and hasattr(type(plugin), "discard_instance"):
+            type(plugin).discard_instance()
+        plugin = None
+        try:
+            shm.close()
+        except BufferError:
+            # Something (a subsurface of the canvas, say) still holds on to it. It goes when the process exits.
+            pass
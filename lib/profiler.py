@@ -0,0 +1,176 @@
+""" Frame time profiling: an on-screen HUD and rolling per-plugin timing histograms """
+import collections
+import json
+import time
+
+import pygame
+
+
+class FrameProfiler:
+    """ Times each pass of the main loop and each plugin's update(). The HUD is drawn over the top left corner of the
+        screen. What was under it is saved and put back before the plugins update, so they never see it. """
+    # Upper bounds (in ms) of the histogram buckets. Anything slower goes in a last "more" bucket.
+    BUCKETS = [1, 2, 4, 8, 16, 33, 66, 133, 266]
+
+    def __init__(self, helper, canvas, font, fps, debug=False, visible=False, dump_file=None, window=300):
+        self.helper = helper
+        self.canvas = canvas
+        self.font = font
+        self.debug = debug
+        self.visible = visible
+        self.dump_file = dump_file
+        self.frame_budget = 1.0 / fps
+        self.window = window
+
+        self.stats = collections.OrderedDict()
+        self.update_times = collections.deque()
+        self.jank_count = 0
+        self.frame_start = 0
+
+        self.hud_surface = None
+        self.hud_rendered = 0
+        self.hud_rect = None
+        self.saved_background = None
+        self.margin = 4
+
+    @property
+    def enabled(self):
+        """ Timings are only collected while the HUD is up or if they'll be dumped on exit """
+        return self.visible or bool(self.dump_file)
+
+    def toggle(self, compositor):
+        self.visible = not self.visible
+        if not self.visible:
+            self.restore_background(compositor)
+        self.helper.log(self.debug, "Profiler HUD {}".format("on" if self.visible else "off"))
+
+    def start_frame(self):
+        self.frame_start = time.perf_counter()
+
+    def end_frame(self, updated):
+        """ Call once the frame has been presented. updated is whether any plugin drew anything this pass. """
+        if not self.enabled:
+            return
+
+        elapsed = time.perf_counter() - self.frame_start
+        self.record("frame", elapsed)
+        if elapsed > self.frame_budget:
+            self.jank_count += 1
+
+        if updated:
+            now = time.time()
+            self.update_times.append(now)
+            while self.update_times[0] < now - 1:
+                self.update_times.popleft()
+
+    def record(self, name, seconds):
+        if name not in self.stats:
+            self.stats[name] = {"samples": collections.deque(maxlen=self.window),
+                                "histogram": [0] * (len(FrameProfiler.BUCKETS) + 1),
+                                "count": 0,
+                                "max": 0.0}
+        stats = self.stats[name]
+        ms = seconds * 1000
+        stats["samples"].append(ms)
+        stats["count"] += 1
+        if ms > stats["max"]:
+            stats["max"] = ms
+
+        bucket = len(FrameProfiler.BUCKETS)
+        for i in range(len(FrameProfiler.BUCKETS)):
+            if ms <= FrameProfiler.BUCKETS[i]:
+                bucket = i
+                break
+        stats["histogram"][bucket] += 1
+
+    def time_update(self, name, func):
+        """ Calls func() and records how long it took under name if it returns True (i.e. the plugin updated) """
+        if not self.enabled:
+            return func()
+
+        start_time = time.perf_counter()
+        result = func()
+        if result:
+            self.record(name, time.perf_counter() - start_time)
+        return result
+
+    @staticmethod
+    def get_percentile(samples, percentile):
+        if len(samples) == 0:
+            return 0.0
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * percentile / 100))]
+
+    def restore_background(self, compositor):
+        """ Puts back what was under the HUD. Call before the plugins update. """
+        if self.saved_background is not None:
+            self.canvas.blit(self.saved_background, self.hud_rect)
+            compositor.add_dirty_rect(self.hud_rect)
+            self.saved_background = None
+
+    def draw(self, compositor, plugins):
+        """ Draws the HUD for the given (active) plugins. Call after the plugins update and before presenting, with
+            restore_background() called before they updated. """
+        if not self.visible:
+            return
+
+        # The numbers only need to be readable, so don't re-render them every frame
+        if self.hud_surface is None or time.time() - self.hud_rendered > 0.25:
+            self.hud_surface = self.render_hud(plugins)
+            self.hud_rendered = time.time()
+
+        self.hud_rect = pygame.Rect((self.margin, self.margin), self.hud_surface.get_size()).clip(self.canvas.get_rect())
+        self.saved_background = self.canvas.subsurface(self.hud_rect).copy()
+        self.canvas.blit(self.hud_surface, self.hud_rect)
+        compositor.add_dirty_rect(self.hud_rect)
+
+    def render_hud(self, plugins):
+        lines = []
+        if "frame" in self.stats:
+            samples = self.stats["frame"]["samples"]
+            lines.append("frame {:.1f}ms  p95 {:.1f}ms  fps {}  jank {}".format(samples[-1],
+                                                                               self.get_percentile(samples, 95),
+                                                                               len(self.update_times),
+                                                                               self.jank_count))
+        for plugin in plugins:
+            if plugin.config_section in self.stats:
+                samples = self.stats[plugin.config_section]["samples"]
+                lines.append("{} {:.1f}ms  p95 {:.1f}ms  max {:.1f}ms".format(plugin.config_section,
+                                                                               self.get_percentile(samples, 50),
+                                                                               self.get_percentile(samples, 95),
+                                                                               self.stats[plugin.config_section]["max"]))
+
+        surfs = [self.font.render(i, True, (255, 255, 0)) for i in lines]
+        width = max([i.get_width() for i in surfs] + [1])
+        surf = pygame.Surface((width + self.margin * 2, self.font.get_linesize() * len(surfs) + self.margin * 2))
+        surf.fill((0, 0, 0))
+        y = self.margin
+        for i in surfs:
+            surf.blit(i, (self.margin, y))
+            y += self.font.get_linesize()
+        return surf
+
+    def get_summary(self):
+        """ Returns the timings of everything that was profiled, in ms """
+        labels = ["<={}ms".format(i) for i in FrameProfiler.BUCKETS] + [">{}ms".format(FrameProfiler.BUCKETS[-1])]
+        summary = {"jank": self.jank_count, "frame_budget_ms": self.frame_budget * 1000, "timings": {}}
+        for name in self.stats:
+            stats = self.stats[name]
+            summary["timings"][name] = {"count": stats["count"],
+                                        "p50": self.get_percentile(stats["samples"], 50),
+                                        "p95": self.get_percentile(stats["samples"], 95),
+                                        "p99": self.get_percentile(stats["samples"], 99),
+                                        "max": stats["max"],
+                                        "histogram": dict(zip(labels, stats["histogram"]))}
+        return summary
+
+    def dump(self):
+        if not self.dump_file:
+            return
+
+        try:
+            with open(self.dump_file, "w") as f:
+                json.dump(self.get_summary(), f, indent=2)
+            self.helper.log(self.debug, "Saved profile to {}".format(self.dump_file))
+        except OSError as e:
+            self.helper.log(self.debug, "Couldn't save the profile to {}: {}".format(self.dump_file, e))
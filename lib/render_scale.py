@@ -0,0 +1,130 @@
+""" Runs a plugin at a lower resolution and scales what it draws up to its place on screen """
+import importlib
+import math
+import os
+
+import pygame
+
+from lib.fullscreen_plugin import FullScreenPlugin
+from lib.plugin import Plugin, Singleton
+
+
+class ScaledPlugin(FullScreenPlugin):
+    """ Stands in for a plugin with a render_scale below 1. The plugin draws on an off-screen canvas that many times the
+        size of its place on screen, and what it changed is scaled up into that place in one pygame.transform.scale().
+        Plugins that fill or redraw large areas every frame (Game of Life, Pong, the Now Playing background) then only
+        touch a fraction of the pixels, which is most of their cost on a 4K screen. Scaling is nearest neighbour, which
+        suits blocky plugins best and is the cheapest there is. Hosts are kept per config section, like singletons, but
+        the plugin itself is built as usual, so a singleton plugin can't be scaled in one section and used in another
+        (see check_sections()). """
+    hosts = {}
+
+    def __init__(self, helper, canvas, app_plugin_config, plugin_class, scale):
+        FullScreenPlugin.__init__(self, helper, canvas,
+                                  os.path.dirname(os.path.abspath(importlib.import_module(plugin_class.__module__).__file__)),
+                                  app_plugin_config)
+        self.scale = scale
+        self.image = Plugin.surfaces.new((max(1, int(canvas.get_width() * scale)),
+                                          max(1, int(canvas.get_height() * scale))))
+        # The canvas and the image line up every grid[0] canvas pixels (grid[1] image pixels) across and every grid[2]
+        #    (grid[3]) down. Scaling a block that starts and ends on those lines samples the same image pixels as
+        #    scaling the whole image does, so damage is rounded out to them and partial updates leave no seams.
+        columns = math.gcd(canvas.get_width(), self.image.get_width())
+        rows = math.gcd(canvas.get_height(), self.image.get_height())
+        self.grid = (canvas.get_width() // columns, self.image.get_width() // columns,
+                     canvas.get_height() // rows, self.image.get_height() // rows)
+        self.plugin = plugin_class(helper, self.image, app_plugin_config)
+        # The renderer and anything else that wakes the plugin up has to wake this up instead
+        self.plugin.hosted_by = self
+        self.frames_per_second = self.plugin.frames_per_second
+        self.reports_damage = True
+        self.helper.log(self.debug, "ScaledPlugin: {} draws at {}x{}, scaled up to {}x{}".format(
+            type(self.plugin).__name__, self.image.get_width(), self.image.get_height(),
+            canvas.get_width(), canvas.get_height()))
+
+    @staticmethod
+    def host(helper, canvas, app_plugin_config, plugin_class, scale):
+        """ Returns the host for a config section, building one if there isn't one for that canvas size yet """
+        host = ScaledPlugin.hosts.get(app_plugin_config.name)
+        if host is None or host.canvas.get_size() != canvas.get_size() or host.scale != scale:
+            host = ScaledPlugin(helper, canvas, app_plugin_config, plugin_class, scale)
+            ScaledPlugin.hosts[app_plugin_config.name] = host
+        else:
+            host.canvas = canvas
+            host.just_in = True
+        return host
+
+    @staticmethod
+    def check_sections(plugins):
+        """ Raises ValueError if a singleton plugin has a render_scale below 1 and is in more than one section (leaving
+            out those run in their own process). They'd all share the one instance, drawing on whichever canvas it was
+            built with. """
+        sections = {}
+        for plugin in plugins:
+            if isinstance(plugin["class"], Singleton) and not plugin["process"]:
+                sections.setdefault(plugin["class"], []).append(plugin)
+        for plugin_class, class_plugins in sections.items():
+            if len(class_plugins) > 1 and any(i["render_scale"] < 1 for i in class_plugins):
+                raise ValueError("{} is in sections {} and can only be in one of them with a render_scale below 1 (or "
+                                 "with process = yes)".format(plugin_class.__name__,
+                                                              ", ".join(i["internal_name"] for i in class_plugins)))
+
+    @staticmethod
+    def discard(section):
+        return ScaledPlugin.hosts.pop(section, None)
+
+    def update(self, tick, fps):
+        self.plugin.just_in = self.plugin.just_in or self.just_in
+        self.plugin.update(tick, fps)
+        self.plugin.just_in = False
+        if self.plugin.READY_TO_SWITCH:
+            self.plugin.READY_TO_SWITCH = False
+            self.READY_TO_SWITCH = True
+
+        rects = self.plugin.get_dirty_rects()
+        if self.just_in or sum(i.width * i.height for i in rects) * 2 >= self.image.get_width() * self.image.get_height():
+            # Mostly (or all) new, so it's scaled in one go
+            if self.image.get_bitsize() == self.canvas.get_bitsize():
+                pygame.transform.scale(self.image, self.canvas.get_size(), self.canvas)
+            else:
+                self.canvas.blit(pygame.transform.scale(self.image, self.canvas.get_size()), (0, 0))
+            self.mark_dirty()
+            return
+
+        canvas_columns, image_columns, canvas_rows, image_rows = self.grid
+        for rect in rects:
+            rect = pygame.Rect(rect).clip(self.image.get_rect())
+            if rect.width <= 0 or rect.height <= 0:
+                continue
+            # rect rounded out to the grid, in blocks
+            first_x, last_x = rect.left // image_columns, -(-rect.right // image_columns)
+            first_y, last_y = rect.top // image_rows, -(-rect.bottom // image_rows)
+            source = pygame.Rect(first_x * image_columns, first_y * image_rows,
+                                 (last_x - first_x) * image_columns, (last_y - first_y) * image_rows)
+            target = pygame.Rect(first_x * canvas_columns, first_y * canvas_rows,
+                                 (last_x - first_x) * canvas_columns, (last_y - first_y) * canvas_rows)
+            self.canvas.blit(pygame.transform.scale(self.image.subsurface(source), target.size), target)
+            self.mark_dirty(target)
+
+    def next_wakeup(self, last_update):
+        return self.plugin.next_wakeup(last_update)
+
+    def handle_click(self, pos):
+        if hasattr(self.plugin, "handle_click"):
+            self.plugin.handle_click((int(pos[0] * self.scale), int(pos[1] * self.scale)))
+
+    def prewarm(self):
+        if hasattr(self.plugin, "prewarm"):
+            self.plugin.prewarm()
+
+    def get_memory_size(self):
+        size = self.plugin.get_memory_size() if hasattr(self.plugin, "get_memory_size") else 0
+        return size + self.image.get_width() * self.image.get_height() * self.image.get_bytesize()
+
+    def suspend(self):
+        if hasattr(self.plugin, "suspend"):
+            self.plugin.suspend()
+
+    def resume(self):
+        if hasattr(self.plugin, "resume"):
+            self.plugin.resume()
@@ -0,0 +1,83 @@
+""" Per-plugin frame scheduling so each plugin is only updated as often as it needs to be """
+
+
+class FrameScheduler:
+    """ Keeps track of when each visible plugin is next due for an update """
+    def __init__(self, helper, default_fps, debug=False):
+        self.helper = helper
+        self.default_fps = default_fps
+        self.debug = debug
+        self.entries = {}
+        self.full_screen_plugin = None
+
+    def add(self, plugin):
+        """ Starts scheduling a plugin (again). Its first update is due straight away with tick 0 """
+        fps = plugin.frames_per_second if plugin.frames_per_second else self.default_fps
+        self.entries[plugin] = {"fps": fps, "tick": 0, "last_update": 0, "next_frame": 0, "woken": True}
+        self.helper.log(self.debug, "Scheduling {} at {} fps".format(type(plugin).__name__, fps))
+
+    def remove(self, plugin):
+        if plugin in self.entries:
+            del self.entries[plugin]
+
+    def set_full_screen_plugin(self, plugin):
+        """ Swaps the scheduled full screen plugin. Everything else is woken up since the whole screen is redrawn """
+        if self.full_screen_plugin is not None:
+            self.remove(self.full_screen_plugin)
+        self.full_screen_plugin = plugin
+        self.add(plugin)
+        self.wake_all()
+
+    def wake(self, plugin):
+        """ Makes the plugin due on the next pass, whatever its rate """
+        if plugin not in self.entries and plugin.hosted_by is not None:
+            plugin = plugin.hosted_by
+        if plugin in self.entries:
+            self.entries[plugin]["woken"] = True
+
+    def wake_all(self):
+        for plugin in self.entries:
+            self.entries[plugin]["woken"] = True
+
+    def get_due_time(self, plugin):
+        entry = self.entries[plugin]
+        if entry["woken"]:
+            return entry["last_update"]
+
+        wakeup = plugin.next_wakeup(entry["last_update"])
+        if wakeup is not None:
+            return wakeup
+        return entry["next_frame"]
+
+    def run_if_due(self, plugin, now):
+        """ Updates the plugin if it's due. Returns True if it was updated """
+        if self.get_due_time(plugin) > now:
+            return False
+
+        entry = self.entries[plugin]
+        plugin.update(entry["tick"], entry["fps"])
+
+        if entry["tick"] == entry["fps"]:
+            entry["tick"] = 1
+        else:
+            entry["tick"] += 1
+
+        entry["woken"] = False
+        entry["last_update"] = now
+        # Keep a steady cadence, but don't try to catch up on frames we were too slow for. Updates in between (wake ups
+        #    and next_wakeup()) don't move it on.
+        if entry["next_frame"] <= now:
+            entry["next_frame"] += 1.0 / entry["fps"]
+            if entry["next_frame"] <= now:
+                entry["next_frame"] = now + 1.0 / entry["fps"]
+        return True
+
+    def get_next_deadline(self, plugins):
+        """ Returns the earliest time any of the given plugins is due, or None if none of them are scheduled """
+        deadline = None
+        for plugin in plugins:
+            if plugin in self.entries:
+                due_time = self.get_due_time(plugin)
+                if deadline is None or due_time < deadline:
+                    deadline = due_time
+        return deadline
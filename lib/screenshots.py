@@ -0,0 +1,109 @@
+""" Saves screenshots on a background thread so encoding them doesn't hold up the display """
+import glob
+import os
+import queue
+import threading
+import time
+
+import pygame
+from PIL import Image
+
+EXTENSIONS = {"png": "png", "jpeg": "jpg", "webp": "webp"}
+
+
+class ScreenshotWriter:
+    """ Takes a copy of the frame on the main thread (a memcpy) and leaves the converting, encoding and writing to a
+        worker thread. PIL does the encoding, so image_format can be png (compressed at compression, 0 to 9), jpeg or
+        webp (at quality, 1 to 100). Only the newest keep screenshots are kept, and none older than max_age seconds (0
+        turns either off). With a thumbnail_width, a scaled down copy is saved next to each one. If the worker falls
+        behind, new screenshots are dropped rather than queued without limit. """
+    def __init__(self, helper, directory, image_format="png", compression=6, quality=85, keep=0, max_age=0,
+                 thumbnail_width=0, max_queued=2, debug=False):
+        if image_format not in EXTENSIONS:
+            raise ValueError("screenshot_format must be one of {}, not {}".format(", ".join(EXTENSIONS), image_format))
+        self.helper = helper
+        self.directory = directory
+        self.image_format = image_format
+        self.compression = compression
+        self.quality = quality
+        self.keep = keep
+        self.max_age = max_age
+        self.thumbnail_width = thumbnail_width
+        self.debug = debug
+
+        self.queue = queue.Queue(maxsize=max_queued)
+        self.thread = threading.Thread(target=self.worker_thread, name="screenshots")
+        self.thread.daemon = True
+        self.thread.start()
+
+    def save(self, surface, name):
+        """ Queues a copy of surface to be saved as name (without extension). Returns False if it had to be dropped. """
+        try:
+            self.queue.put_nowait((surface.copy(), name))
+        except queue.Full:
+            self.helper.log(self.debug, "Screenshots: still busy, dropping {}".format(name))
+            return False
+        return True
+
+    def close(self):
+        """ Waits for the queued screenshots to be written """
+        self.queue.put((None, None))
+        self.thread.join()
+
+    def worker_thread(self):
+        while True:
+            surface, name = self.queue.get()
+            if surface is None:
+                break
+            try:
+                self.write(surface, name)
+                self.prune()
+            except (OSError, ValueError) as e:
+                self.helper.log(self.debug, "Screenshots: couldn't save {}: {}".format(name, e))
+
+    def write(self, surface, name):
+        started = time.perf_counter()
+        os.makedirs(self.directory, exist_ok=True)
+        image = Image.frombytes("RGB", surface.get_size(), pygame.image.tostring(surface, "RGB"))
+        filename = self.get_filename(name)
+        self.encode(image, filename)
+
+        if self.thumbnail_width > 0 and image.width > self.thumbnail_width:
+            thumbnail = image.resize((self.thumbnail_width, max(1, image.height * self.thumbnail_width // image.width)),
+                                     Image.BILINEAR)
+            self.encode(thumbnail, self.get_filename(name + "_thumb"))
+        self.helper.log(self.debug, "Saved screenshot to {} in {:.0f}ms".format(
+            filename, (time.perf_counter() - started) * 1000))
+
+    def encode(self, image, filename):
+        # Written under a temporary name first, so anything watching the directory never picks up half a file
+        temp_filename = filename + ".tmp"
+        if self.image_format == "png":
+            image.save(temp_filename, "PNG", compress_level=self.compression)
+        else:
+            image.save(temp_filename, self.image_format.upper(), quality=self.quality)
+        os.replace(temp_filename, filename)
+
+    def get_filename(self, name):
+        return os.path.join(self.directory, "{}.{}".format(name, EXTENSIONS[self.image_format]))
+
+    def prune(self):
+        """ Deletes the screenshots (and thumbnails) that are past keep or max_age """
+        screenshots = {False: [], True: []}
+        for filename in glob.glob(os.path.join(self.directory, "screenshot_*")):
+            if filename.endswith(".tmp"):
+                continue
+            try:
+                screenshots["_thumb." in os.path.basename(filename)].append((os.path.getmtime(filename), filename))
+            except OSError:
+                pass
+
+        now = time.time()
+        for files in screenshots.values():
+            files.sort(reverse=True)
+            for i, (mtime, filename) in enumerate(files):
+                if (self.keep > 0 and i >= self.keep) or (self.max_age > 0 and now - mtime > self.max_age):
+                    try:
+                        os.remove(filename)
+                    except OSError:
+                        pass
@@ -0,0 +1,53 @@
+""" Makes every surface plugins draw on in the one pixel format, so they can be drawn at a lower color depth """
+import pygame
+
+
+class SurfaceFactory:
+    """ Makes the surfaces plugins draw on (and converts the images they load) at depth bits per pixel, or at the
+        display's depth if that's 0. Blits between surfaces of the same format are straight copies, and at 16 bits each
+        one moves half the memory it would at 32, which is what counts on a Pi driving a 16 bit SPI panel. Surfaces with
+        per-pixel alpha stay at 32 bits, as there's no room for alpha in 16. """
+    def __init__(self, depth=0):
+        self.depth = depth
+        # A 1x1 surface in the format everything is made in
+        self.format = None
+
+    def set_canvas(self, canvas):
+        """ Uses the canvas' format when it's at the right depth, so blits to it don't have to convert anything """
+        if self.depth == 0 or canvas.get_bitsize() == self.depth:
+            self.format = pygame.Surface((1, 1), 0, canvas)
+        else:
+            self.format = pygame.Surface((1, 1), 0, self.depth)
+
+    def get_format(self):
+        if self.format is None:
+            if pygame.display.get_surface() is not None:
+                self.set_canvas(pygame.display.get_surface())
+            elif self.depth > 0:
+                self.format = pygame.Surface((1, 1), 0, self.depth)
+        return self.format
+
+    def get_depth(self):
+        surface_format = self.get_format()
+        return surface_format.get_bitsize() if surface_format is not None else 32
+
+    def new(self, size, flags=0):
+        """ A new surface, like pygame.Surface(size, flags) """
+        surface_format = self.get_format()
+        if flags & pygame.SRCALPHA or surface_format is None:
+            return pygame.Surface(size, flags)
+        return pygame.Surface(size, flags, surface_format)
+
+    def copy(self, surface):
+        """ A copy of surface (e.g. of a plugin's canvas) in the factory's format """
+        surface_format = self.get_format()
+        if surface_format is None:
+            return surface.copy()
+        return surface.convert(surface_format)
+
+    def convert(self, surface):
+        """ Converts an opaque image (e.g. one that was just loaded) to the factory's format """
+        surface_format = self.get_format()
+        if surface_format is None:
+            return surface.convert()
+        return surface.convert(surface_format)
@@ -3,19 +3,45 @@ PI Display
 (c) Steven Babineau - babineau@gmail.com
 2022
 """
-import inspect
 import sys
 import os
 import time
 import importlib
-import datetime
+import functools
+import argparse
+import json
+import shutil
+import tempfile
 import pygame
 import pygame.ftfont
 from enum import Enum
 
+from lib import fonts
 from lib import helper
+from lib.bench import PluginBenchmark
+from lib.clock import VirtualClock
+from lib import microbench
+from lib.compositor import Compositor
+from lib.config import ConfigCache
+from lib.config_watcher import ConfigWatcher
+from lib.frame_server import FrameServer
+from lib.framebuffer import FramebufferOutput
 from lib.fullscreen_plugin import FullScreenPlugin
+from lib.http_cache import HttpCache
+from lib.http_client import HttpClient
+from lib.incremental import IncrementalRenderer
+from lib.jobs import JobScheduler
+from lib.lifecycle import PluginLifecycle
+from lib.notifications import NotificationLayer
 from lib.plugin import Plugin, Singleton
+from lib.plugin_index import get_plugin_index
+from lib.prewarm import PluginPrewarmer
+from lib.process_host import ProcessPlugin
+from lib.render_scale import ScaledPlugin
+from lib.profiler import FrameProfiler
+from lib.scheduler import FrameScheduler
+from lib.screenshots import ScreenshotWriter
+from lib.surfaces import SurfaceFactory
 
 import configparser
 
@@ -29,6 +55,16 @@ class Direction(Enum):
 
 def main():
     """ Main is what Main is """
+    config = load_config()
+
+    appconfig = config["pidisplay"]
+    debug = appconfig.getboolean("debug")
+
+    # With the fbdev output SDL only draws in memory, and the display is written straight to the framebuffer device
+    output = appconfig["output"] if "output" in appconfig else "sdl"
+    if output == "fbdev":
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+
     pygame.init()
     if not pygame.ftfont.get_init():
         pygame.ftfont.init()
@@ -36,13 +72,6 @@ def main():
     pygame.display.set_caption('PiDisplay')
     pygame.event.set_allowed([pygame.QUIT, pygame.KEYDOWN])
 
-    clock = pygame.time.Clock()
-    config = configparser.RawConfigParser()
-    config.read(os.path.abspath(os.path.join(os.path.dirname(__file__), "config.ini")))
-
-    appconfig = config["pidisplay"]
-    debug = appconfig.getboolean("debug")
-
     if pygame.version.vernum[0] == 2:
         helper.log(debug, "Running with pygame 2.X options.")
         flags = 0
@@ -59,17 +88,524 @@ def main():
             screen_width = 0
             screen_height = 0
 
-    if pygame.version.vernum[0] == 2:
-        pygame.display.set_mode([screen_width, screen_height], flags, vsync=1)
+    color_depth = appconfig.getint("color_depth") if "color_depth" in appconfig else 0
+
+    framebuffer = None
+    if output == "fbdev":
+        framebuffer = FramebufferOutput(helper,
+                                        appconfig["framebuffer_device"] if "framebuffer_device" in appconfig else "/dev/fb0",
+                                        (appconfig.getint("screen_width"), appconfig.getint("screen_height")),
+                                        debug=debug)
+        screen_width, screen_height = framebuffer.size
+        pygame.display.set_mode([screen_width, screen_height])
+    elif pygame.version.vernum[0] == 2:
+        pygame.display.set_mode([screen_width, screen_height], flags, color_depth, vsync=1)
     else:
-        pygame.display.set_mode([screen_width, screen_height], flags)
+        pygame.display.set_mode([screen_width, screen_height], flags, color_depth)
 
     canvas = pygame.display.get_surface()
+    if framebuffer is not None and color_depth > 0:
+        # SDL's display is only in memory here, so it's drawn on a canvas of our own at the right depth instead (in the
+        #    framebuffer's own format if it's at that depth, so writing to it is a straight copy)
+        canvas = pygame.Surface(canvas.get_size(), 0,
+                                framebuffer.staging if framebuffer.bits_per_pixel == color_depth else color_depth)
+    helper.log(debug, "Drawing at {} bits per pixel".format(canvas.get_bitsize()))
+    compositor = Compositor(helper, canvas, debug, output=framebuffer)
+
+    setup_services(appconfig, debug)
+    Plugin.surfaces.set_canvas(canvas)
 
     pygame.mouse.set_pos((int(canvas.get_width()/2), int(canvas.get_height()/2)))
     pygame.mouse.set_visible(False)
 
-    plugin_modules = get_plugins(debug)
+    plugins = get_configured_plugins(config, debug)
+
+    running = True
+    update = True
+
+    fps = appconfig.getint("frames_per_second")
+    scheduler = FrameScheduler(helper, fps, debug)
+
+    top_widget_plugins, bottom_widget_plugins, full_screen_plugins, full_screen_canvas_small = \
+        build_layout(plugins, canvas, config, debug)
+    for widget in top_widget_plugins + bottom_widget_plugins:
+        scheduler.add(widget["instance"])
+
+    render_budget = appconfig.getint("render_budget") if "render_budget" in appconfig else 0
+    if render_budget > 0:
+        Plugin.renderer = IncrementalRenderer(helper, render_budget / 1000.0, scheduler.wake, debug)
+
+    doubleclick_timer = 0
+    current_plugin = -1
+
+    prewarm_time = appconfig.getint("prewarm_time") if "prewarm_time" in appconfig else 0
+    # Even with nothing due, look up at least this often (in seconds) so data fetched in the background gets shown
+    max_idle_time = 1.0
+
+    profile_file = appconfig["profile_file"] if "profile_file" in appconfig else ""
+    if profile_file:
+        profile_file = os.path.abspath(os.path.join(os.path.dirname(__file__), profile_file))
+    profiler = FrameProfiler(helper, canvas, fonts.get_font(appconfig["default_font_face"], 14), fps, debug,
+                             appconfig.getboolean("show_profiler") if "show_profiler" in appconfig else False,
+                             profile_file)
+    prewarmer = PluginPrewarmer(helper, debug)
+    lifecycle = PluginLifecycle(helper,
+                                (appconfig.getint("memory_budget") if "memory_budget" in appconfig else 0) * 1024 * 1024,
+                                debug)
+    clock = Plugin.clock
+    notifications = NotificationLayer(helper, canvas,
+                                      fonts.get_font(appconfig["default_font_face"], appconfig.getint("default_font_size")),
+                                      clock, fps, appconfig.getint("message_popup_fade_delay"),
+                                      appconfig.getint("message_popup_fade_time"), debug)
+    screenshots = None
+    if appconfig.getboolean("take_screenshots"):
+        screenshots = ScreenshotWriter(helper,
+                                       os.path.abspath(os.path.join(os.path.dirname(__file__), appconfig["screenshot_dir"])),
+                                       appconfig["screenshot_format"] if "screenshot_format" in appconfig else "png",
+                                       appconfig.getint("screenshot_compression") if "screenshot_compression" in appconfig else 6,
+                                       appconfig.getint("screenshot_quality") if "screenshot_quality" in appconfig else 85,
+                                       appconfig.getint("screenshot_keep") if "screenshot_keep" in appconfig else 0,
+                                       (appconfig.getfloat("screenshot_max_age") if "screenshot_max_age" in appconfig else 0) * 3600,
+                                       appconfig.getint("screenshot_thumbnail_width") if "screenshot_thumbnail_width" in appconfig else 0,
+                                       debug=debug)
+    frame_server = None
+    if "frame_server_port" in appconfig and appconfig.getint("frame_server_port") > 0:
+        frame_server = FrameServer(helper, appconfig.getint("frame_server_port"),
+                                   appconfig["frame_server_address"] if "frame_server_address" in appconfig else "127.0.0.1",
+                                   appconfig.getfloat("frame_server_fps") if "frame_server_fps" in appconfig else 2,
+                                   appconfig.getint("frame_server_quality") if "frame_server_quality" in appconfig else 75,
+                                   debug)
+    config_watcher = None
+    config_reload_interval = appconfig.getint("config_reload_interval") if "config_reload_interval" in appconfig else 0
+    if config_reload_interval > 0:
+        config_watcher = ConfigWatcher(helper, clock, config_reload_interval, debug)
+        config_watcher.watch(get_config_files(plugins))
+
+    if len(full_screen_plugins) > 0:
+        current_plugin, full_screen_plugin, start_time = switch_plugin(current_plugin,
+                                                                       full_screen_plugins,
+                                                                       canvas,
+                                                                       full_screen_canvas_small,
+                                                                       compositor,
+                                                                       scheduler,
+                                                                       prewarmer,
+                                                                       lifecycle,
+                                                                       Direction.FORWARD)
+        switch_started = None
+        events = []
+        while running:
+            profiler.start_frame()
+            switch_direction = None
+            updated = False
+
+            changed_files = config_watcher.check() if config_watcher is not None else []
+            if len(changed_files) > 0:
+                reloaded = reload_config(config, plugins, changed_files, canvas,
+                                         top_widget_plugins + bottom_widget_plugins, full_screen_canvas_small,
+                                         prewarmer, lifecycle, debug)
+                if reloaded is not None:
+                    old_widget_plugins = top_widget_plugins + bottom_widget_plugins
+                    current_section = full_screen_plugins[current_plugin]["internal_name"].name
+                    config, plugins, top_widget_plugins, bottom_widget_plugins, full_screen_plugins, \
+                        full_screen_canvas_small = reloaded
+                    for widget in old_widget_plugins:
+                        if widget not in top_widget_plugins + bottom_widget_plugins:
+                            scheduler.remove(widget["instance"])
+                    for widget in top_widget_plugins + bottom_widget_plugins:
+                        if widget not in old_widget_plugins:
+                            scheduler.add(widget["instance"])
+
+                    # Carry on showing the same section if it's still there, rebuilt if its settings changed
+                    current_plugin = -1
+                    for i in range(len(full_screen_plugins)):
+                        if full_screen_plugins[i]["internal_name"].name == current_section:
+                            current_plugin = i - 1
+                            break
+                    canvas.fill((0, 0, 0))
+                    current_plugin, full_screen_plugin, start_time = switch_plugin(current_plugin,
+                                                                                   full_screen_plugins,
+                                                                                   canvas,
+                                                                                   full_screen_canvas_small,
+                                                                                   compositor,
+                                                                                   scheduler,
+                                                                                   prewarmer,
+                                                                                   lifecycle,
+                                                                                   Direction.FORWARD)
+                    notifications.invalidate()
+                    helper.send_message("Config reloaded")
+                config_watcher.watch(get_config_files(plugins))
+
+            active_plugins = [full_screen_plugin]
+            if full_screen_plugins[current_plugin]["internal_name"].getboolean("show_widgets"):
+                for i in range(len(top_widget_plugins)):
+                    active_plugins.append(top_widget_plugins[i]["instance"])
+                for i in range(len(bottom_widget_plugins)):
+                    active_plugins.append(bottom_widget_plugins[i]["instance"])
+
+            if update:
+                # Put back what was under the profiler's HUD so the plugins draw on what they expect
+                profiler.restore_background(compositor)
+                notifications.restore_background()
+                now = clock.time()
+                for plugin in active_plugins:
+                    if profiler.time_update(plugin.config_section, functools.partial(scheduler.run_if_due, plugin, now)):
+                        plugin.just_in = False
+                        compositor.collect(plugin)
+                        updated = True
+                if Plugin.renderer is not None and Plugin.renderer.is_busy():
+                    Plugin.renderer.run()
+
+            for event in events + pygame.event.get():
+                if event.type == pygame.QUIT:
+                    running = False
+                elif event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_SPACE:
+                        update = not update
+                    elif event.key == pygame.K_ESCAPE or event.key == pygame.K_q:
+                        running = False
+                    elif event.key == pygame.K_RIGHT:
+                        switch_direction = Direction.FORWARD
+                    elif event.key == pygame.K_LEFT:
+                        switch_direction = Direction.BACKWARDS
+                    elif event.key == pygame.K_p:
+                        profiler.toggle(compositor)
+                elif event.type == pygame.MOUSEBUTTONDOWN:
+                    timer_set = False
+                    if doubleclick_timer == 0:
+                        pygame.time.set_timer(helper.EVENT_DOUBLECLICK, appconfig.getint("doubleclick_delay"))
+                        timer_set = True
+                    elif doubleclick_timer == 1:
+                        pygame.time.set_timer(helper.EVENT_DOUBLECLICK, 0)
+                        # Switch plugins
+                        switch_direction = Direction.FORWARD
+                        timer_set = False
+                    if timer_set:
+                        doubleclick_timer = 1
+                    else:
+                        doubleclick_timer = 0
+                elif event.type == helper.EVENT_DOUBLECLICK:
+                    # timer timed out
+                    full_screen_plugin.handle_click(pygame.mouse.get_pos())
+                    pygame.time.set_timer(helper.EVENT_DOUBLECLICK, 0)
+                    doubleclick_timer = 0
+                elif event.type == helper.EVENT_MESSAGE:
+                    notifications.add(event.message[0])
+
+            if update:
+                notifications.draw(compositor)
+                profiler.draw(compositor, active_plugins)
+                presented = compositor.present()
+                if presented and switch_started is not None:
+                    helper.log(debug, "Switched to {} in {:.0f}ms".format(type(full_screen_plugin).__name__,
+                                                                        (clock.time() - switch_started) * 1000))
+                    switch_started = None
+                if frame_server is not None:
+                    frame_server.offer(canvas, presented, clock.time())
+            profiler.end_frame(updated)
+
+            if clock.time() - start_time > full_screen_plugins[current_plugin]["autoswitch_timer"] or full_screen_plugin.READY_TO_SWITCH:
+                full_screen_plugin.READY_TO_SWITCH = False
+                # Switch plugins
+                if screenshots is not None:
+                    screenshots.save(canvas, "screenshot_{}".format(clock.time()))
+
+                switch_direction = Direction.FORWARD
+
+            if switch_direction is not None:
+                switch_started = clock.time()
+                current_plugin, full_screen_plugin, start_time = switch_plugin(current_plugin,
+                                                                               full_screen_plugins,
+                                                                               canvas,
+                                                                               full_screen_canvas_small,
+                                                                               compositor,
+                                                                               scheduler,
+                                                                               prewarmer,
+                                                                               lifecycle,
+                                                                               switch_direction)
+                notifications.invalidate()
+            elif prewarm_time > 0 and len(full_screen_plugins) > 1 and \
+                    clock.time() - start_time > full_screen_plugins[current_plugin]["autoswitch_timer"] - prewarm_time:
+                # Get the next plugin ready before the autoswitch timer runs out
+                next_plugin = get_next_plugin_index(current_plugin, full_screen_plugins, Direction.FORWARD)
+                # Sections sharing a class share the instance that is on screen right now, so there's nothing to warm up
+                if not prewarmer.is_started(next_plugin) and full_screen_plugins[next_plugin]["class"] != type(full_screen_plugin):
+                    prewarmer.start(next_plugin, functools.partial(build_plugin, full_screen_plugins[next_plugin],
+                                                                   canvas, full_screen_canvas_small, lifecycle))
+
+            # Block until there's input or something is due: the next plugin update, the autoswitch (or pre-warm) or the
+            # next step of a message fade. A static or paused screen then costs next to nothing.
+            wake_time = clock.time() + max_idle_time
+            if switch_direction is not None:
+                # The plugin switched to draws straight away
+                wake_time = clock.time()
+            elif update:
+                deadline = scheduler.get_next_deadline(active_plugins)
+                if deadline is not None:
+                    wake_time = min(wake_time, deadline)
+            autoswitch_time = start_time + full_screen_plugins[current_plugin]["autoswitch_timer"]
+            wake_time = min(wake_time, autoswitch_time)
+            if prewarm_time > 0 and autoswitch_time - prewarm_time > clock.time():
+                wake_time = min(wake_time, autoswitch_time - prewarm_time)
+            if notifications.visible:
+                wake_time = min(wake_time, notifications.get_next_deadline())
+            if config_watcher is not None:
+                wake_time = min(wake_time, config_watcher.get_next_deadline())
+            if update and frame_server is not None and frame_server.get_next_deadline() is not None:
+                wake_time = min(wake_time, frame_server.get_next_deadline())
+            if update and Plugin.renderer is not None and Plugin.renderer.is_busy():
+                # Carry on with the redraws next frame
+                wake_time = min(wake_time, clock.time() + 1.0 / fps)
+            events = wait_for_events(wake_time - clock.time())
+        profiler.dump()
+        ProcessPlugin.stop_all()
+        if framebuffer is not None:
+            framebuffer.close()
+        if screenshots is not None:
+            screenshots.close()
+        if frame_server is not None:
+            frame_server.close()
+    else:
+        print("Enable a plugin first (make sure to specify the class key in config.ini)!")
+
+    helper.log(debug, "Text cache: {}".format(helper.get_text_cache_stats()))
+    Plugin.http.log_stats()
+    Plugin.http.close()
+
+    pygame.quit()
+    sys.exit()
+
+
+def bench(argv):
+    """ Runs each configured plugin headless for a number of frames and reports how long its updates take as JSON """
+    parser = argparse.ArgumentParser(prog="pidisplay.py bench",
+                                     description="Runs each configured plugin headless and reports its frame times, "
+                                                 "memory use and allocations as JSON.")
+    parser.add_argument("--frames", type=int, default=300, help="frames to time per plugin (default: 300)")
+    parser.add_argument("--alloc-frames", type=int, default=50,
+                        help="frames to count allocations over, in a separate pass (default: 50, 0 to skip)")
+    parser.add_argument("--plugins", nargs="+", metavar="SECTION", help="only run these config.ini sections")
+    parser.add_argument("--fixtures", default="./bench/fixtures/",
+                        help="where recorded HTTP responses are kept (default: ./bench/fixtures/)")
+    parser.add_argument("--record", action="store_true",
+                        help="make real requests and save their responses as fixtures for later runs")
+    parser.add_argument("--clock-step", type=float,
+                        help="seconds the virtual clock moves on per frame (default: one frame at the plugin's rate)")
+    parser.add_argument("--output", help="file to write the results to (default: print them)")
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.init()
+    if not pygame.ftfont.get_init():
+        pygame.ftfont.init()
+
+    config = load_config()
+    appconfig = config["pidisplay"]
+    debug = appconfig.getboolean("debug")
+    fps = appconfig.getint("frames_per_second")
+
+    pygame.display.set_mode([appconfig.getint("screen_width"), appconfig.getint("screen_height")])
+    canvas = pygame.display.get_surface()
+
+    # Time only moves on between frames, by the same amount every run. Set before the services, which share it.
+    Plugin.clock = VirtualClock()
+    setup_services(appconfig, debug)
+    # Network plugins get the recorded responses, and a throwaway cache so neither side affects the other
+    Plugin.http.use_fixtures(os.path.abspath(os.path.join(os.path.dirname(__file__), args.fixtures)), args.record)
+    cache_dir = tempfile.mkdtemp(prefix="pidisplay-bench-")
+    Plugin.http_cache = HttpCache(helper, Plugin.http, cache_dir, debug)
+
+    plugins = get_configured_plugins(config, debug)
+    if args.plugins:
+        plugins = [i for i in plugins if i["internal_name"] in args.plugins]
+
+    benchmark = PluginBenchmark(helper, Plugin.jobs, Plugin.clock, args.frames, args.alloc_frames, fps, debug,
+                                clock_step=args.clock_step)
+    top_widget_plugins, bottom_widget_plugins, full_screen_plugins, full_screen_canvas_small = \
+        build_layout(plugins, canvas, config, debug)
+    for widget in top_widget_plugins + bottom_widget_plugins:
+        # Widgets are built with the layout, so only their warm up and updates are timed
+        benchmark.measure(widget["instance"].config_section, lambda: widget["instance"])
+    for full_screen_plugin in full_screen_plugins:
+        # Built the same way as when the display switches to them
+        benchmark.measure(full_screen_plugin["internal_name"].name,
+                          functools.partial(build_plugin, full_screen_plugin, canvas, full_screen_canvas_small))
+
+    results = {"frames": args.frames,
+               "frames_per_second": fps,
+               "screen": [canvas.get_width(), canvas.get_height()],
+               "python": sys.version.split()[0],
+               "pygame": pygame.version.ver,
+               "plugins": benchmark.results}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        helper.log(debug, "Saved benchmark results to {}".format(args.output))
+    else:
+        print(json.dumps(results, indent=2))
+
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    Plugin.http.close()
+    pygame.quit()
+
+
+def run_microbench(argv):
+    """ Times the pure-Python hot paths on realistic inputs and compares them to earlier runs """
+    parser = argparse.ArgumentParser(prog="pidisplay.py microbench",
+                                     description="Times the pure-Python hot paths and flags the ones that got slower "
+                                                 "than in earlier runs.")
+    parser.add_argument("names", nargs="*", help="only run the benchmarks whose name contains one of these")
+    parser.add_argument("--history", default="./bench/history.json",
+                        help="where past results are kept (default: ./bench/history.json)")
+    parser.add_argument("--threshold", type=float, default=10,
+                        help="percent slower than the recent median that counts as a regression (default: 10)")
+    parser.add_argument("--repeat", type=int, default=5, help="timing runs per benchmark, the best is kept (default: 5)")
+    parser.add_argument("--no-save", action="store_true", help="don't add this run to the history")
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.init()
+    if not pygame.ftfont.get_init():
+        pygame.ftfont.init()
+
+    config = load_config()
+    appconfig = config["pidisplay"]
+    debug = appconfig.getboolean("debug")
+    pygame.display.set_mode([appconfig.getint("screen_width"), appconfig.getint("screen_height")])
+    canvas = pygame.display.get_surface()
+
+    setup_services(appconfig, debug)
+    cache_dir = tempfile.mkdtemp(prefix="pidisplay-microbench-")
+    Plugin.http_cache = HttpCache(helper, Plugin.http, cache_dir, debug)
+
+    def build(class_name, plugin_canvas, **options):
+        # Plugins are built from their defaults, whether or not they're set up in config.ini
+        section = "microbench {}".format(class_name)
+        config[section] = {i: str(options[i]) for i in options}
+        return get_plugins(debug, [class_name])[0]["class"](helper, plugin_canvas, config[section])
+
+    benchmark = microbench.MicroBenchmark(helper, os.path.abspath(os.path.join(os.path.dirname(__file__), args.history)),
+                                          args.threshold, args.repeat, debug=debug)
+
+    font = fonts.get_font(appconfig["default_font_face"], 20)
+    text = ("The quick brown fox jumps over the lazy dog while the display keeps the headlines scrolling past. " * 6).strip()
+    benchmark.add("helper.wrap 600 chars", lambda: helper.wrap(text, font, 400))
+
+    # 1000x600 gives the 200 wide world a height of 120
+    life = build("GameOfLife", pygame.Surface((1000, 600)), world_width=200)
+    world = microbench.make_life_world(life.world_width, life.world_height)
+    get_neighbors = sys.modules[type(life).__module__].get_neighbors
+
+    def update_world():
+        life.world = list(world)
+        life.update_world()
+    benchmark.add("GameOfLife.update_world 200x120", update_world)
+    benchmark.add("get_neighbors 200x120", lambda: [get_neighbors(world, i, life.world_width) for i in range(len(world))])
+
+    weather = build("OpenWeatherMap", canvas)
+    payload = microbench.make_onecall_payload()
+    benchmark.add("OpenWeatherMap.parse_json_weather 48h", lambda: weather.parse_json_weather(payload))
+
+    pihole_class = get_plugins(debug, ["PiHole"])[0]["class"]
+    ftl_output = microbench.make_ftl_output(10000)
+    summary_keys = [i.split(" ")[0] for i in ftl_output["summary"].splitlines() if " " in i]
+    benchmark.add("PiHole.parse_ftl_output 10k queries", lambda: pihole_class.parse_ftl_output(**ftl_output))
+    benchmark.add("PiHole.find_key stats", lambda: [pihole_class.find_key(ftl_output["summary"], i, 0, " ") for i in summary_keys])
+
+    system_info = build("SystemInfo", canvas)
+    texts = ["eth0", "192.168.1.20", "fe80::1c2b:3dff:fe4e:5f60", "1.2 GB", "345.6 MB", "0", "12"] * 3
+    benchmark.add("SystemInfo.blit_column 21 rows", lambda: system_info.blit_column(system_info.image, "Interface", texts, 10, 10, 12))
+
+    ball = build("PongClock", canvas).game_ball
+    pong_canvas = canvas.copy()
+
+    def update_ball_projection():
+        # Forces the hit projection that normally only runs after a bounce
+        ball.firstrun = True
+        ball.update(pong_canvas)
+    benchmark.add("Ball.update", lambda: ball.update(pong_canvas))
+    benchmark.add("Ball.update with projection", update_ball_projection)
+
+    # What drawing and presenting a full screen costs at each color depth (see color_depth in config.ini)
+    framebuffer_dir = tempfile.mkdtemp(prefix="pidisplay-microbench-fb-")
+    framebuffers = []
+    for depth in (16, 24, 32):
+        target = pygame.Surface(canvas.get_size(), 0, depth)
+        frames = [pygame.Surface(canvas.get_size(), 0, target) for _ in range(2)]
+        frames[0].fill((20, 120, 220))
+        frames[1].fill((220, 120, 20))
+        benchmark.add("blit full screen at {} bits".format(depth), functools.partial(target.blit, frames[0], (0, 0)))
+
+        framebuffer_file = os.path.join(framebuffer_dir, "fb{}".format(depth))
+        open(framebuffer_file, "wb").close()
+        framebuffer = FramebufferOutput(helper, framebuffer_file, canvas.get_size(), depth, debug=debug)
+        framebuffers.append(framebuffer)
+
+        def present(framebuffer=framebuffer, frames=frames):
+            # Every tile changes each time
+            frames.reverse()
+            framebuffer.flip(frames[0])
+        benchmark.add("fbdev present full screen at {} bits".format(depth), present)
+        benchmark.add("fbdev present unchanged at {} bits".format(depth), functools.partial(framebuffer.flip, frames[0]))
+
+    benchmark.run(args.names)
+    regressions = benchmark.report(not args.no_save)
+
+    for framebuffer in framebuffers:
+        framebuffer.close()
+    shutil.rmtree(framebuffer_dir, ignore_errors=True)
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    Plugin.http.close()
+    pygame.quit()
+    sys.exit(1 if len(regressions) > 0 else 0)
+
+
+def wait_for_events(timeout):
+    """ Waits up to timeout seconds for an event. Returns it and anything queued behind it, or an empty list. """
+    if timeout * 1000 < 1:
+        return pygame.event.get()
+
+    if pygame.version.vernum[0] == 2:
+        event = pygame.event.wait(int(timeout * 1000))
+        if event.type == pygame.NOEVENT:
+            return []
+        return [event] + pygame.event.get()
+    else:
+        # pygame 1.X can't wait with a timeout
+        time.sleep(timeout)
+        return pygame.event.get()
+
+
+def load_config():
+    config = configparser.RawConfigParser()
+    config.read(os.path.abspath(os.path.join(os.path.dirname(__file__), "config.ini")))
+    return config
+
+
+def setup_services(appconfig, debug):
+    """ Sets up the services shared by all plugins """
+    Plugin.jobs = JobScheduler(helper,
+                               appconfig.getint("fetch_workers") if "fetch_workers" in appconfig else 2,
+                               appconfig.getint("fetch_deadline") if "fetch_deadline" in appconfig else 60,
+                               debug, clock=Plugin.clock)
+    if "text_cache_size" in appconfig:
+        helper.text_cache_budget = appconfig.getint("text_cache_size") * 1024 * 1024
+    Plugin.surfaces = SurfaceFactory(appconfig.getint("color_depth") if "color_depth" in appconfig else 0)
+    # Plugins run in worker processes (process = yes) set up their own services with this
+    ProcessPlugin.setup_services = setup_services
+    Plugin.config_cache = ConfigCache(helper,
+                                      os.path.abspath(os.path.join(os.path.dirname(__file__), "plugins", ".config.pickle")),
+                                      debug)
+    Plugin.http = HttpClient(helper, appconfig.getint("http_timeout") if "http_timeout" in appconfig else 10, debug=debug)
+    Plugin.http_cache = HttpCache(helper, Plugin.http,
+                                  os.path.abspath(os.path.join(os.path.dirname(__file__),
+                                                               appconfig["cache_dir"] if "cache_dir" in appconfig else "./cache/")),
+                                  debug)
+
+
+def get_configured_plugins(config, debug):
+    """ Returns the plugin classes (and their settings) for every section in config.ini """
+    plugin_class_names = [config[i]["class"] for i in config.sections() if i != "pidisplay" and "class" in config[i]]
+    plugin_modules = get_plugins(debug, plugin_class_names)
     plugins = []
     for i in config.sections():
         if i == "pidisplay":
@@ -85,21 +621,125 @@ def main():
         plugin_widget_location = config[i]["widget_location"] if "widget_location" in config[i] else ""
         plugin_autoswitch_timer = int(config[i]["autoswitch_timer"]) if "autoswitch_timer" in config[i] else sys.maxsize
         if plugin_class is not None:
+            # Parse the plugin's settings now so a bad value stops the app here rather than when the plugin comes up
+            Plugin.get_config(get_plugin_path(plugin_class), config[i], plugin_class_name)
             plugins.append({"internal_name": i,
                             "class": plugin_class,
                             "widget_location": plugin_widget_location,
                             "autoswitch_timer": plugin_autoswitch_timer,
-                            "widget_height": config[i].getint("widget_height")})
+                            "widget_height": config[i].getint("widget_height"),
+                            "process": config[i].getboolean("process") if "process" in config[i] else False,
+                            "render_scale": config[i].getfloat("render_scale") if "render_scale" in config[i] else 1})
         else:
             helper.log(debug, "Couldn't find class for {}".format(plugin_class_name))
 
+    ScaledPlugin.check_sections(plugins)
     helper.log(debug, "Total modules found: {}".format(len(plugins)))
+    return plugins
 
-    running = True
-    update = True
 
-    fps = appconfig.getint("frames_per_second")
+def get_plugin_path(plugin_class):
+    """ The folder a plugin class (and its config.ini) lives in """
+    return os.path.dirname(os.path.abspath(sys.modules[plugin_class.__module__].__file__))
+
 
+def get_config_files(plugins):
+    """ The files the settings come from: config.ini and the config.ini of every configured plugin """
+    files = [os.path.abspath(os.path.join(os.path.dirname(__file__), "config.ini"))]
+    for plugin in plugins:
+        filename = os.path.join(get_plugin_path(plugin["class"]), "config.ini")
+        if filename not in files:
+            files.append(filename)
+    return files
+
+
+def get_changed_sections(old_config, new_config, plugins, changed_files):
+    """ Returns the names of the plugin sections that were added, removed or changed, including those of plugins whose
+        own config.ini changed """
+    changed = set()
+    for section in set(old_config.sections()) | set(new_config.sections()):
+        if section == "pidisplay":
+            continue
+        if not old_config.has_section(section) or not new_config.has_section(section) or \
+                dict(old_config[section]) != dict(new_config[section]):
+            changed.add(section)
+
+    for plugin in plugins:
+        if os.path.join(get_plugin_path(plugin["class"]), "config.ini") in changed_files:
+            changed.add(plugin["internal_name"])
+    return changed
+
+
+def reload_config(config, plugins, changed_files, canvas, widget_plugins, canvas_small, prewarmer, lifecycle, debug):
+    """ Loads config.ini again after it (or a plugin's config.ini) changed. Widgets whose settings and place didn't
+        change are kept as they are, the others are built again. Full screen plugins whose settings changed are
+        dropped, to be built again when they're next shown. Returns the new config, plugins and layout (as
+        build_layout()), or None if nothing changed or the new settings can't be used, in which case the display
+        carries on as it was. """
+    try:
+        new_config = load_config()
+        new_plugins = get_configured_plugins(new_config, debug)
+        full_screen = [i for i in new_plugins if FullScreenPlugin in i["class"].__bases__]
+        if len(full_screen) == 0:
+            raise ValueError("no full screen plugins are enabled")
+    except (configparser.Error, ValueError, LookupError, ImportError) as e:
+        helper.log(debug, "Not reloading the config: {}".format(e))
+        helper.send_message("Config not reloaded: {}".format(e))
+        return None
+
+    if dict(config["pidisplay"]) != dict(new_config["pidisplay"]):
+        helper.log(debug, "[pidisplay] changed, restart to apply it")
+        helper.send_message("Restart to apply the [pidisplay] changes")
+
+    changed_sections = get_changed_sections(config, new_config, plugins + new_plugins, changed_files)
+    if len(changed_sections) == 0:
+        return None
+    helper.log(debug, "Reloading {}".format(", ".join(sorted(changed_sections))))
+
+    for section in changed_sections:
+        # Plugins running in their own process are stopped, to be started again with the new settings
+        host = ProcessPlugin.discard(section)
+        if host is not None:
+            lifecycle.forget(host)
+        host = ScaledPlugin.discard(section)
+        if host is not None:
+            lifecycle.forget(host)
+
+    # Widgets that are in the same place with the same settings keep running (and keep what they've fetched)
+    reuse = {}
+    for widget in widget_plugins:
+        if widget["internal_name"] not in changed_sections:
+            reuse[widget["internal_name"]] = widget
+    try:
+        layout = build_layout(new_plugins, canvas, new_config, debug, reuse)
+    except Exception as e:
+        helper.log(debug, "Not reloading the config, building the plugins failed: {}".format(e))
+        helper.send_message("Config not reloaded: {}".format(e))
+        return None
+    top_widget_plugins, bottom_widget_plugins, full_screen_plugins, full_screen_canvas_small = layout
+
+    # Full screen plugins are singletons, built on the canvas they were first shown on, so if the space left by the
+    #    widget bars changed, they all have to be built again
+    layout_changed = full_screen_canvas_small.get_abs_offset() != canvas_small.get_abs_offset() or \
+        full_screen_canvas_small.get_size() != canvas_small.get_size()
+    prewarmer.take(prewarmer.index)
+    for plugin in plugins + new_plugins:
+        if FullScreenPlugin in plugin["class"].__bases__ and isinstance(plugin["class"], Singleton) and \
+                (layout_changed or plugin["internal_name"] in changed_sections):
+            instance = plugin["class"].discard_instance()
+            if instance is not None:
+                lifecycle.forget(instance)
+                helper.log(debug, "Dropped {} to build it with its new settings".format(type(instance).__name__))
+
+    return new_config, new_plugins, top_widget_plugins, bottom_widget_plugins, full_screen_plugins, \
+        full_screen_canvas_small
+
+
+def build_layout(plugins, canvas, config, debug, reuse=None):
+    """ Builds the widgets into bars at the top and bottom of the screen. Returns them, the full screen plugin entries
+        and the canvas left over between the bars for full screen plugins that show widgets. reuse is
+        {section: widget} of already built widgets to use instead of building them again, as long as they end up in
+        the same place. """
     top_widget_plugins = []
     top_bar_canvases = []
     bottom_widget_plugins = []
@@ -114,160 +754,64 @@ def main():
         plugin = plugins[i]
         if WidgetPlugin in plugin["class"].__bases__:
             if plugin["widget_location"] == helper.WIDGET_LOCATION_TOP:
-                top_bar_canvas = canvas.subsurface(pygame.Rect(0, top_bar_y, canvas.get_width(), plugin["widget_height"]))
-
-                top_widget_plugins.append({"location": plugin["widget_location"],
-                                           "instance": plugin["class"](helper, top_bar_canvas, config[plugin["internal_name"]])})
+                top_bar_rect = pygame.Rect(0, top_bar_y, canvas.get_width(), plugin["widget_height"])
+                top_widget_plugins.append(build_widget(plugin, canvas, top_bar_rect, config, reuse))
                 top_bar_y += plugin["widget_height"]
-                top_bar_canvases.append(top_bar_canvas)
+                top_bar_canvases.append(top_widget_plugins[-1]["instance"].canvas)
 
             elif plugin["widget_location"] == helper.WIDGET_LOCATION_BOTTOM:
                 bottom_bar_y -= plugin["widget_height"]
 
-                bottom_bar_canvas = canvas.subsurface(pygame.Rect(0, bottom_bar_y, canvas.get_width(), plugin["widget_height"]))
-
-                bottom_widget_plugins.append({"location": plugin["widget_location"],
-                                              "instance": plugin["class"](helper, bottom_bar_canvas, config[plugin["internal_name"]])})
-                bottom_bar_canvases.append(bottom_bar_canvas)
+                bottom_bar_rect = pygame.Rect(0, bottom_bar_y, canvas.get_width(), plugin["widget_height"])
+                bottom_widget_plugins.append(build_widget(plugin, canvas, bottom_bar_rect, config, reuse))
+                bottom_bar_canvases.append(bottom_widget_plugins[-1]["instance"].canvas)
         elif FullScreenPlugin in plugin["class"].__bases__:
-            full_screen_plugins.append({"class": plugin["class"], "autoswitch_timer": plugin["autoswitch_timer"], "internal_name": config[plugin["internal_name"]]})
+            full_screen_plugins.append({"class": plugin["class"], "autoswitch_timer": plugin["autoswitch_timer"], "internal_name": config[plugin["internal_name"]],
+                                        "process": plugin["process"], "render_scale": plugin["render_scale"]})
 
     top_offset = top_bar_y
     bottom_offset = canvas.get_height() - bottom_bar_y
 
-    doubleclick_timer = 0
-    current_plugin = -1
-
-    message_font = pygame.font.SysFont(appconfig["default_font_face"], appconfig.getint("default_font_size"))
-    message_step = 255.0 / (fps * appconfig.getint("message_popup_fade_time"))
-
     full_screen_rect = pygame.Rect(0, top_offset, canvas.get_width(), canvas.get_height() - top_offset - bottom_offset)
     helper.log(debug, str(full_screen_rect))
     helper.log(debug, "WxH = {}x{}".format(canvas.get_width(), canvas.get_height()))
-    full_screen_canvas_small = canvas.subsurface(full_screen_rect)
-
-    if len(full_screen_plugins) > 0:
-        current_plugin, tick, full_screen_plugin, start_time = switch_plugin(current_plugin,
-                                                                             full_screen_plugins,
-                                                                             canvas,
-                                                                             full_screen_canvas_small,
-                                                                             Direction.FORWARD)
-        while running:
-            clock.tick(fps)
-
-            if update:
-                full_screen_plugin.update(tick, fps)
-                full_screen_plugin.just_in = False
+    return top_widget_plugins, bottom_widget_plugins, full_screen_plugins, canvas.subsurface(full_screen_rect)
 
-                if full_screen_plugins[current_plugin]["internal_name"].getboolean("show_widgets"):
-                    for i in range(len(top_widget_plugins)):
-                        top_widget_plugins[i]["instance"].update(tick, fps)
-                    for i in range(len(bottom_widget_plugins)):
-                        bottom_widget_plugins[i]["instance"].update(tick, fps)
 
-                if tick == fps:
-                    tick = 1
-                else:
-                    tick += 1
+def build_widget(plugin, canvas, rect, config, reuse=None):
+    if reuse is not None and plugin["internal_name"] in reuse and reuse[plugin["internal_name"]]["rect"] == rect:
+        return reuse[plugin["internal_name"]]
 
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    running = False
-                elif event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_SPACE:
-                        update = not update
-                    elif event.key == pygame.K_ESCAPE or event.key == pygame.K_q:
-                        running = False
-                    elif event.key == pygame.K_RIGHT:
-                        current_plugin, tick, full_screen_plugin, start_time = switch_plugin(current_plugin,
-                                                                                             full_screen_plugins,
-                                                                                             canvas,
-                                                                                             full_screen_canvas_small,
-                                                                                             Direction.FORWARD)
-                    elif event.key == pygame.K_LEFT:
-                        current_plugin, tick, full_screen_plugin, start_time = switch_plugin(current_plugin,
-                                                                                             full_screen_plugins,
-                                                                                             canvas,
-                                                                                             full_screen_canvas_small,
-                                                                                             Direction.BACKWARDS)
-                elif event.type == pygame.MOUSEBUTTONDOWN:
-                    timer_set = False
-                    if doubleclick_timer == 0:
-                        pygame.time.set_timer(helper.EVENT_DOUBLECLICK, appconfig.getint("doubleclick_delay"))
-                        timer_set = True
-                    elif doubleclick_timer == 1:
-                        pygame.time.set_timer(helper.EVENT_DOUBLECLICK, 0)
-                        # Switch plugins
-                        current_plugin, tick, full_screen_plugin, start_time = switch_plugin(current_plugin,
-                                                                                             full_screen_plugins,
-                                                                                             canvas,
-                                                                                             full_screen_canvas_small,
-                                                                                             Direction.FORWARD)
-                        timer_set = False
-                    if timer_set:
-                        doubleclick_timer = 1
-                    else:
-                        doubleclick_timer = 0
-                elif event.type == helper.EVENT_DOUBLECLICK:
-                    # timer timed out
-                    full_screen_plugin.handle_click(pygame.mouse.get_pos())
-                    pygame.time.set_timer(helper.EVENT_DOUBLECLICK, 0)
-                    doubleclick_timer = 0
-                elif event.type == helper.EVENT_MESSAGE:
-                    message = event.message[0]
-                    if len(event.message) == 1:
-                        opacity = 255 + (message_step * fps * appconfig.getint("message_popup_fade_delay"))
-                    else:
-                        opacity = event.message[1]
-
-                    if opacity > 0:
-                        opacity -= message_step
-
-                        surf_message_text = message_font.render(event.message[0], True, (200, 200, 200))
-                        surf_message = pygame.Surface((surf_message_text.get_width() + 40,  # margin
-                                                       surf_message_text.get_height() + 40))
-                        surf_message.fill((32, 32, 32))
-                        surf_message.blit(surf_message_text, (int(surf_message.get_width()/2 - surf_message_text.get_width()/2),
-                                                              int(surf_message.get_height()/2 - surf_message_text.get_height()/2)))
-                        pygame.draw.rect(surf_message, (200, 200, 200),
-                                         (0, 0, surf_message.get_width(), surf_message.get_height()), 3)
-
-                        if opacity > 255:
-                            surf_message.set_alpha(255)
-                        else:
-                            surf_message.set_alpha(opacity)
-
-                        canvas.blit(surf_message, (int(canvas.get_width()/2 - surf_message.get_width()/2), canvas.get_height() - surf_message.get_height() - 50))  # bottom margin
+    if plugin["process"]:
+        instance = ProcessPlugin.host(helper, canvas.subsurface(rect), config[plugin["internal_name"]], plugin["class"],
+                                      config["pidisplay"])
+    elif plugin["render_scale"] < 1:
+        instance = ScaledPlugin.host(helper, canvas.subsurface(rect), config[plugin["internal_name"]], plugin["class"],
+                                     plugin["render_scale"])
+    else:
+        instance = plugin["class"](helper, canvas.subsurface(rect), config[plugin["internal_name"]])
+    return {"location": plugin["widget_location"],
+            "internal_name": plugin["internal_name"],
+            "rect": rect,
+            "instance": instance}
 
-                        my_event = pygame.event.Event(helper.EVENT_MESSAGE, message=[message, opacity])
-                        pygame.event.post(my_event)
 
-            if update:
-                pygame.display.flip()
+def switch_plugin(current_plugin, full_screen_plugins, canvas, canvas_small, compositor, scheduler, prewarmer, lifecycle,
+                  direction):
+    current_plugin = get_next_plugin_index(current_plugin, full_screen_plugins, direction)
 
-            if time.time() - start_time > full_screen_plugins[current_plugin]["autoswitch_timer"] or full_screen_plugin.READY_TO_SWITCH:
-                full_screen_plugin.READY_TO_SWITCH = False
-                # Switch plugins
-                if appconfig.getboolean("take_screenshots"):
-                    screenshot_file = os.path.abspath(os.path.join(os.path.dirname(__file__),
-                                                      appconfig["screenshot_dir"],
-                                                      "screenshot_{}.png".format(datetime.datetime.now().timestamp())))
-                    pygame.image.save(canvas, screenshot_file)
-                    helper.log(debug, "Saved screenshot to {}".format(screenshot_file))
-
-                current_plugin, tick, full_screen_plugin, start_time = switch_plugin(current_plugin,
-                                                                                     full_screen_plugins,
-                                                                                     canvas,
-                                                                                     full_screen_canvas_small,
-                                                                                     Direction.FORWARD)
-    else:
-        print("Enable a plugin first (make sure to specify the class key in config.ini)!")
+    full_screen_plugin = prewarmer.take(current_plugin)
+    if full_screen_plugin is None:
+        full_screen_plugin = build_plugin(full_screen_plugins[current_plugin], canvas, canvas_small, lifecycle)
+    lifecycle.activate(full_screen_plugin)
 
-    pygame.quit()
-    sys.exit()
+    scheduler.set_full_screen_plugin(full_screen_plugin)
+    start_time = Plugin.clock.time()
+    compositor.invalidate()
+    return current_plugin, full_screen_plugin, start_time
 
 
-def switch_plugin(current_plugin, full_screen_plugins, canvas, canvas_small, direction):
+def get_next_plugin_index(current_plugin, full_screen_plugins, direction):
     if direction == Direction.FORWARD:
         current_plugin += 1
         if current_plugin == len(full_screen_plugins):
@@ -278,40 +822,54 @@ def switch_plugin(current_plugin, full_screen_plugins, canvas, canvas_small, dir
             current_plugin = len(full_screen_plugins) - 1
     else:
         raise ValueError("Incorrect direction specified while switching full screen plugins!")
+    return current_plugin
+
 
-    plugin_config_name = full_screen_plugins[current_plugin]["internal_name"]
+def build_plugin(full_screen_plugin, canvas, canvas_small, lifecycle=None):
+    """ Builds (or, for singletons, gets back) a full screen plugin. With a lifecycle, a plugin that was suspended to save
+        memory is resumed. """
+    plugin_config_name = full_screen_plugin["internal_name"]
     if plugin_config_name.getboolean("show_widgets"):
-        full_screen_plugin = full_screen_plugins[current_plugin]["class"](helper, canvas_small,
-                                                                          plugin_config_name)
+        canvas = canvas_small
+
+    if full_screen_plugin.get("process"):
+        plugin = ProcessPlugin.host(helper, canvas, plugin_config_name, full_screen_plugin["class"],
+                                    plugin_config_name.parser["pidisplay"])
+    elif full_screen_plugin.get("render_scale", 1) < 1:
+        plugin = ScaledPlugin.host(helper, canvas, plugin_config_name, full_screen_plugin["class"],
+                                   full_screen_plugin["render_scale"])
     else:
-        full_screen_plugin = full_screen_plugins[current_plugin]["class"](helper, canvas,
-                                                                          plugin_config_name)
+        plugin = full_screen_plugin["class"](helper, canvas, plugin_config_name)
 
-    tick = 0
-    start_time = time.time()
-    pygame.display.flip()
-    return current_plugin, tick, full_screen_plugin, start_time
+    if lifecycle is not None:
+        lifecycle.resume(plugin)
+    return plugin
 
 
-def get_plugins(debug):
+def get_plugins(debug, class_names):
+    """ Imports only the plugin modules that define one of the given classes, using the cached plugin index """
     plugins = []
     plugin_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "plugins"))
     helper.log(debug, "Plugin path: {}".format(plugin_path))
-    plugin_folders = os.listdir(plugin_path)
-    for folder in plugin_folders:
-        full_path = os.path.join(plugin_path, folder)
-        if os.path.isdir(full_path):
-            files = os.listdir(full_path)
-            for file in files:
-                if file[-3:] == ".py":
-                    module = importlib.import_module("." + file[:-3], "plugins.{}".format(folder))
-                    for name, obj in inspect.getmembers(module):
-                        if (type(obj) == type or type(obj) == Singleton) and issubclass(obj, Plugin) and obj.__module__[:8] == "plugins.":
-                            # Get the config
-                            helper.log(debug, "Found plugin {}".format(obj.__name__))
-                            plugins.append({"class_name": obj.__name__, "class": obj})
+    index = get_plugin_index(helper, plugin_path, os.path.join(plugin_path, ".index.json"), debug)
+    for class_name in sorted(set(class_names)):
+        if class_name not in index:
+            continue
+
+        start_time = time.time()
+        module = importlib.import_module(index[class_name])
+        obj = getattr(module, class_name, None)
+        if (type(obj) == type or type(obj) == Singleton) and issubclass(obj, Plugin):
+            helper.log(debug, "Found plugin {} (loaded {} in {}ms)".format(obj.__name__, index[class_name],
+                                                                          int((time.time() - start_time) * 1000)))
+            plugins.append({"class_name": obj.__name__, "class": obj})
     return plugins
 
 
 if __name__ == '__main__':
-    main()
+    if len(sys.argv) > 1 and sys.argv[1] == "bench":
+        bench(sys.argv[2:])
+    elif len(sys.argv) > 1 and sys.argv[1] == "microbench":
+        run_microbench(sys.argv[2:])
+    else:
+        main()
@@ -3,6 +3,7 @@ Clok
 (c) Steven Babineau - babineau@gmail.com
 2022
 """
+import math
 import os
 import pygame
 from datetime import datetime
@@ -17,11 +18,11 @@ class Clok(DirtySprite, WidgetPlugin):
         DirtySprite.__init__(self)
         WidgetPlugin.__init__(self, helper, canvas, os.path.abspath(os.path.dirname(__file__)), app_plugin_config)
 
-        self.image = canvas.copy()
+        self.image = self.surfaces.copy(canvas)
 
         self.marker_location = (0, 0)
 
-        self.marker_color = eval(self.plugin_config["needle_color"])
+        self.marker_color = self.plugin_config.getcolor("needle_color")
 
         self.helper.log(self.debug, "Clok: {} x {}".format(self.canvas.get_width(), self.screen_height))
 
@@ -31,7 +32,7 @@ class Clok(DirtySprite, WidgetPlugin):
             if param[:8] == "location":
                 if "location{}_start".format(i) in self.plugin_config:
                     start = self.plugin_config["location{}_start".format(i)]
-                    color = eval(self.plugin_config["location{}_color".format(i)])
+                    color = self.plugin_config.getcolor("location{}_color".format(i))
                     locations.append({"start": start, "color": color})
                     i += 1
 
@@ -46,16 +47,24 @@ class Clok(DirtySprite, WidgetPlugin):
         self.minute_ratio = (self.screen_width*1.0) / (24 * 60)
         self.helper.log(self.debug, "Width: {} Minute Ratio: {}".format(self.screen_width, self.minute_ratio))
 
+        self.reports_damage = True
+
+    def next_wakeup(self, last_update):
+        # The needle only moves once a minute
+        return math.floor(last_update / 60) * 60 + 60
+
     def update(self, tick, fps):
+        # Update the marker. next_wakeup() already keeps this to once a minute (and the first update is straight away).
+        now = self.clock.now()
+        loc = now.hour * 60 + now.minute
+        marker_location = (loc * self.minute_ratio, 0)
+        if marker_location != self.marker_location:
+            self.marker_location = marker_location
+            self.dirty = 1
+            self.mark_dirty()
+
         if self.image is not None:
             self.canvas.blit(self.image, (0, 0))
             pygame.draw.rect(self.canvas, self.marker_color,
                              (self.marker_location[0], self.marker_location[1],
                               self.plugin_config.getint("needle_width"), self.canvas.get_height()))
-
-        if tick == 1:
-            # Update the marker
-            now = datetime.now()
-            loc = now.hour * 60 + now.minute
-            self.marker_location = (loc * self.minute_ratio, 0)
-            self.dirty = 1
@@ -1,8 +1,9 @@
-import datetime
+import math
 import os
 
 import pygame
 
+from lib import fonts
 from lib.fullscreen_plugin import FullScreenPlugin
 from lib.plugin import Singleton
 
@@ -12,8 +13,8 @@ class DigitalClock(FullScreenPlugin, metaclass=Singleton):
         FullScreenPlugin.__init__(self, helper, canvas, os.path.abspath(os.path.dirname(__file__)), app_plugin_config)
 
         self.screen_margin = self.plugin_config.getint("screen_margin")
-        self.fg_color = eval(self.plugin_config["foreground_color"])
-        self.bg_color = eval(self.plugin_config["background_color"])
+        self.fg_color = self.plugin_config.getcolor("foreground_color")
+        self.bg_color = self.plugin_config.getcolor("background_color")
         self.show_seconds = self.plugin_config.getboolean("show_seconds")
         self.hour_type = self.plugin_config.getint("hour_type")
 
@@ -37,47 +38,33 @@ class DigitalClock(FullScreenPlugin, metaclass=Singleton):
                 self.date_format = "%I:%M %p"
                 self.date_format_template = "00:00 XX"
 
-        self.font_size = 10
-        font_str = self.plugin_config["font_face"]
-        if font_str:
-            if font_str[-4:].lower() == ".ttf" or font_str[-4:].lower() == ".otf":
-                filename = os.path.abspath(os.path.join(os.path.dirname(__file__), "fonts", font_str))
-
-                self.font = pygame.font.Font(filename, self.font_size)
-                size = self.font.size(self.date_format_template)
-                while size[0] < screen_width and size[1] < screen_height:
-                    self.font_size += 1
-                    self.font = pygame.font.Font(filename, self.font_size)
-                    size = self.font.size(self.date_format_template)
-
-                self.font_size -= 1
-                self.font = pygame.font.Font(filename, self.font_size)
-            else:
-                self.font = pygame.font.SysFont(font_str, self.font_size)
-                size = self.font.size(self.date_format_template)
-                while size[0] < screen_width and size[1] < screen_height:
-                    self.font_size += 1
-                    self.font = pygame.font.SysFont(font_str, self.font_size)
-                    size = self.font.size(self.date_format_template)
+        self.last_time_text = None
+        self.reports_damage = True
 
-                self.font_size -= 1
-                self.font = pygame.font.SysFont(font_str, self.font_size)
-        else:
-            self.font = pygame.font.SysFont(self.plugin_config["default_font_face"], self.font_size)
+        font_str = self.plugin_config["font_face"]
+        if not font_str:
+            font_str = self.plugin_config["default_font_face"]
+        elif fonts.is_font_file(font_str):
+            font_str = os.path.abspath(os.path.join(os.path.dirname(__file__), "fonts", font_str))
 
-            size = self.font.size(self.date_format_template)
-            while size[0] < screen_width and size[1] < screen_height:
-                self.font_size += 1
-                self.font = pygame.font.SysFont(self.plugin_config["default_font_face"], self.font_size)
-                size = self.font.size(self.date_format_template)
+        # The biggest font the time fits on the screen with
+        self.font_size = fonts.get_fitted_font_size(font_str, self.date_format_template, screen_width, screen_height)
+        self.font = fonts.get_font(font_str, self.font_size)
 
-            self.font_size -= 1
-            self.font = pygame.font.SysFont(self.plugin_config["default_font_face"], self.font_size)
+    def next_wakeup(self, last_update):
+        # Nothing changes until the next second (or minute) ticks over
+        if self.show_seconds:
+            return math.floor(last_update) + 1
+        return math.floor(last_update / 60) * 60 + 60
 
     def update(self, tick, fps):
-        now = datetime.datetime.now()
+        now = self.clock.now()
         self.canvas.fill(self.bg_color)
 
-        surf_text = self.font.render(now.strftime(self.date_format), True, self.fg_color)
+        time_text = now.strftime(self.date_format)
+        surf_text = self.helper.render_text(self.font, time_text, True, self.fg_color)
+        if time_text != self.last_time_text:
+            self.last_time_text = time_text
+            self.mark_dirty()
 
         self.canvas.blit(surf_text, (self.canvas.get_width() / 2 - surf_text.get_width() / 2, self.canvas.get_height() / 2 - surf_text.get_height() / 2))
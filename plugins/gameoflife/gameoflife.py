@@ -6,6 +6,7 @@ Conways Game of Life
 import os
 import random
 import pygame
+from lib import fonts
 from lib.plugin import Singleton
 from lib.fullscreen_plugin import FullScreenPlugin
 
@@ -30,14 +31,16 @@ class GameOfLife(FullScreenPlugin, metaclass=Singleton):
 
         self.lifetimes = 0
 
-        self.font = pygame.font.SysFont(self.plugin_config["default_font_face"], self.plugin_config.getint("generation_size"))
+        self.font = fonts.get_font(self.plugin_config["default_font_face"], self.plugin_config.getint("generation_size"))
 
         self.helper.log(self.debug, "Cell Size: {} {}".format(self.cell_width, self.cell_height))
 
-        self.foreground = eval(self.plugin_config["foreground"])
-        self.background = eval(self.plugin_config["background"])
-        self.foreground_old = eval(self.plugin_config["foreground_old"])
-        self.generation_color = eval(self.plugin_config["generation_color"])
+        self.foreground = self.plugin_config.getcolor("foreground")
+        self.background = self.plugin_config.getcolor("background")
+        self.foreground_old = self.plugin_config.getcolor("foreground_old")
+        self.generation_color = self.plugin_config.getcolor("generation_color")
+
+        self.reports_damage = True
 
         self.reset_world()
 
@@ -82,6 +85,7 @@ class GameOfLife(FullScreenPlugin, metaclass=Singleton):
 
             self.update_world()
             self.lifetimes += 1
+            self.mark_dirty()
 
     def update_world(self):
         my_world = list(self.world)
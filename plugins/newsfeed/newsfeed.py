@@ -12,6 +12,7 @@ import threading
 import feedparser
 import requests
 
+from lib import fonts
 from lib.fullscreen_plugin import FullScreenPlugin
 from lib.plugin import Singleton
 
@@ -24,29 +25,51 @@ class NewsFeed(FullScreenPlugin, metaclass=Singleton):
         self.news = None
         self.news_updated = False
         self.last_canvas = None
-        self.feed_title_font = pygame.font.SysFont(self.plugin_config["default_font_face"], self.plugin_config.getint("feed_title_font_size"))
-        self.item_title_font = pygame.font.SysFont(self.plugin_config["default_font_face"], self.plugin_config.getint("item_title_font_size"))
-        self.item_date_font = pygame.font.SysFont(self.plugin_config["default_font_face"], self.plugin_config.getint("item_date_font_size"))
-        self.item_desc_font = pygame.font.SysFont(self.plugin_config["default_font_face"], self.plugin_config.getint("item_desc_font_size"))
+        self.feed_title_font = fonts.get_font(self.plugin_config["default_font_face"], self.plugin_config.getint("feed_title_font_size"))
+        self.item_title_font = fonts.get_font(self.plugin_config["default_font_face"], self.plugin_config.getint("item_title_font_size"))
+        self.item_date_font = fonts.get_font(self.plugin_config["default_font_face"], self.plugin_config.getint("item_date_font_size"))
+        self.item_desc_font = fonts.get_font(self.plugin_config["default_font_face"], self.plugin_config.getint("item_desc_font_size"))
         self.icons_folder = os.path.abspath(os.path.join(os.path.dirname(__file__), self.plugin_config["icons_folder"]))
 
-        self.background = eval(self.plugin_config["background"])
-        self.foreground = eval(self.plugin_config["foreground"])
-        self.feed_title_foreground = eval(self.plugin_config["feed_title_foreground"])
-        self.item_title_foreground = eval(self.plugin_config["item_title_foreground"])
-        self.item_date_foreground = eval(self.plugin_config["item_date_foreground"])
-        self.item_desc_foreground = eval(self.plugin_config["item_desc_foreground"])
+        self.background = self.plugin_config.getcolor("background")
+        self.foreground = self.plugin_config.getcolor("foreground")
+        self.feed_title_foreground = self.plugin_config.getcolor("feed_title_foreground")
+        self.item_title_foreground = self.plugin_config.getcolor("item_title_foreground")
+        self.item_date_foreground = self.plugin_config.getcolor("item_date_foreground")
+        self.item_desc_foreground = self.plugin_config.getcolor("item_desc_foreground")
         self.screen_margin = self.plugin_config.getint("screen_margin")
         self.icon_size = self.plugin_config.getint("icon_size")
         self.update_interval = self.plugin_config.getint("update_interval")
+        self.request_timeout = self.plugin_config.getint("request_timeout")
+        self.cache_ttl = self.plugin_config.getint("cache_ttl")
         self.slack_webhook = self.plugin_config["slack_webhook"]
 
         self.item_boxes = []
 
+        self.reports_damage = True
+
+        # Show the last feeds we got (e.g. before a restart) until the first download is done
+        self.update_news_thread(cached_only=True)
+
+    def prewarm(self):
+        if int(self.clock.time() * 1000) - self.timer > self.update_interval * 1000 * 60:
+            if self.jobs.run("NewsFeed", self.update_news_thread, self.update_interval * 60):
+                self.timer = int(self.clock.time() * 1000)
+
+    def get_memory_size(self):
+        return self.helper.get_surface_size(self.last_canvas)
+
+    def suspend(self):
+        self.last_canvas = None
+
+    def resume(self):
+        # Redraw from the last news we got
+        if self.news is not None:
+            self.news_updated = True
+
     def update(self, tick, fps):
-        if int(time.time() * 1000) - self.timer > self.update_interval * 1000 * 60:
-            self.update_news()
-            self.timer = int(time.time() * 1000)
+        if self.update_news():
+            self.timer = int(self.clock.time() * 1000)
 
         if self.news_updated:
             # Create the news surfaces
@@ -67,18 +90,18 @@ class NewsFeed(FullScreenPlugin, metaclass=Singleton):
                     surf_item_title = self.item_title_font.render(i["title"], True, self.item_title_foreground)
                     surf_item_date = self.item_date_font.render(item_date, True, self.item_date_foreground)
 
-                    surf_item = pygame.Surface((self.canvas.get_width() - self.screen_margin * 2,
-                                                surf_item_title.get_height() + surf_item_date.get_height() +
-                                                _line_buffer))
+                    surf_item = self.surfaces.new((self.canvas.get_width() - self.screen_margin * 2,
+                                                   surf_item_title.get_height() + surf_item_date.get_height() +
+                                                   _line_buffer))
 
                     try:
-                        surf_icon = pygame.image.load(os.path.join(self.icons_folder, i["icon"])).convert()
+                        surf_icon = self.surfaces.convert(pygame.image.load(os.path.join(self.icons_folder, i["icon"])))
                         ratio = self.icon_size * 1.0 / surf_icon.get_width()
                         icon_height = int(surf_icon.get_height() * ratio)
                         surf_icon = pygame.transform.scale(surf_icon, (int((surf_icon.get_width() * 1.0) * ratio),
                                                                        icon_height))
                     except FileNotFoundError:
-                        surf_icon = pygame.Surface((self.icon_size, self.icon_size))
+                        surf_icon = self.surfaces.new((self.icon_size, self.icon_size))
                         surf_icon.fill(self.background)
 
                     surf_item.blit(surf_icon, (0, surf_item.get_height()/2 - surf_icon.get_height()/2))
@@ -109,7 +132,8 @@ class NewsFeed(FullScreenPlugin, metaclass=Singleton):
                     y += surf_item.get_height() + _entry_buffer
                     num_items += 1
 
-                self.last_canvas = self.canvas.copy()
+                self.last_canvas = self.surfaces.copy(self.canvas)
+                self.mark_dirty()
             self.news_updated = False
         else:
             if self.last_canvas is not None:
@@ -129,19 +153,20 @@ class NewsFeed(FullScreenPlugin, metaclass=Singleton):
                     headers = {'Content-type': 'application/json'}
                     data = {"text": i["link"]}
                     data = json.dumps(data)
-                    r = requests.post(self.slack_webhook, data=data, headers=headers)
+                    r = self.http.post(self.slack_webhook, data=data, headers=headers, timeout=self.request_timeout)
                     self.helper.log(self.debug, "Response was: {}".format(r))
                     self.helper.send_message("URL sent!")
                 break
         pass
 
     def update_news(self):
-        thread_timer = threading.Thread(target=self.update_news_thread, args=([]))
-        thread_timer.daemon = False
-        thread_timer.start()
+        """ Queues a refresh of the feeds if one is due. Returns True if it was queued. """
+        return self.jobs.schedule("NewsFeed", self.update_news_thread, self.update_interval * 60)
 
-    def update_news_thread(self):
+    def update_news_thread(self, cached_only=False):
+        """ Downloads the feeds. With cached_only, only what's in the cache (e.g. from before a restart) is used. """
         news = {}
+        feeds_downloaded = 0
         i = 1
         for param in list(self.plugin_config):
             if param[:4] == "feed":
@@ -149,7 +174,18 @@ class NewsFeed(FullScreenPlugin, metaclass=Singleton):
                     name = self.plugin_config["feed{}_name".format(i)]
                     url = self.plugin_config["feed{}_url".format(i)]
                     icon = self.plugin_config["feed{}_icon".format(i)]
-                    feed = feedparser.parse(url)
+                    # feedparser can't time out on its own, so download the feed first
+                    try:
+                        if cached_only:
+                            r = self.http_cache.get_cached(url)
+                        else:
+                            r = self.http_cache.get(url, self.cache_ttl * 60, timeout=self.request_timeout)
+                        feed = feedparser.parse(r.content if r is not None else "")
+                        if r is not None:
+                            feeds_downloaded += 1
+                    except requests.RequestException as e:
+                        self.helper.log(self.debug, "There was an error retrieving {}: {}".format(url, e))
+                        feed = feedparser.parse("")
 
                     for item in feed.entries:
                         desc = item.description if "description" in item else ""
@@ -163,6 +199,9 @@ class NewsFeed(FullScreenPlugin, metaclass=Singleton):
                                      }})
                     i += 1
 
+        if cached_only and feeds_downloaded == 0:
+            return False
+
         dates = sorted(news.keys(), reverse=True)
 
         result = []
@@ -177,3 +216,4 @@ class NewsFeed(FullScreenPlugin, metaclass=Singleton):
         self.helper.log(self.debug, "done getting feeds!")
 
         lock.release()
+        return feeds_downloaded > 0
@@ -8,15 +8,14 @@ import hashlib
 import io
 import os
 import threading
-import time
 import pygame
 import pygame.ftfont
-import requests
 from spotipy import SpotifyPKCE, Spotify, CacheFileHandler, oauth2
 from PIL import Image, ImageFilter, ImageEnhance
 
+from lib import fonts
 from lib.fullscreen_plugin import FullScreenPlugin
-from lib.plugin import Singleton
+from lib.plugin import Plugin, Singleton
 
 
 class NowPlaying(FullScreenPlugin, metaclass=Singleton):
@@ -38,10 +37,10 @@ class NowPlaying(FullScreenPlugin, metaclass=Singleton):
         self.last_track_id = ""
 
         self.timer = -1
-        self.image = pygame.Surface((self.screen_width, self.screen_height))
+        self.image = self.surfaces.new((self.screen_width, self.screen_height))
 
-        self.title_font = pygame.ftfont.SysFont(self.plugin_config["default_font_face"], self.plugin_config.getint("title_font_size"))
-        self.info_font = pygame.ftfont.SysFont(self.plugin_config["default_font_face"], self.plugin_config.getint("info_font_size"))
+        self.title_font = fonts.get_font(self.plugin_config["default_font_face"], self.plugin_config.getint("title_font_size"), module=pygame.ftfont)
+        self.info_font = fonts.get_font(self.plugin_config["default_font_face"], self.plugin_config.getint("info_font_size"), module=pygame.ftfont)
 
         self.background = None
 
@@ -62,10 +61,10 @@ class NowPlaying(FullScreenPlugin, metaclass=Singleton):
         self.progress_bar_height = self.plugin_config.getint("progress_bar_height")
         self.context_icon_width = self.plugin_config.getint("context_icon_width")
         self.screen_margin = self.plugin_config.getint("screen_margin")
-        self.background_color = eval(self.plugin_config["background"])
-        self.light_color = eval(self.plugin_config["light_color"])
-        self.dark_color = eval(self.plugin_config["dark_color"])
-        self.foreground_notplaying = eval(self.plugin_config["foreground_notplaying"])
+        self.background_color = self.plugin_config.getcolor("background")
+        self.light_color = self.plugin_config.getcolor("light_color")
+        self.dark_color = self.plugin_config.getcolor("dark_color")
+        self.foreground_notplaying = self.plugin_config.getcolor("foreground_notplaying")
 
         self.switch_next_plugin_when_nothing_is_playing = self.plugin_config.getboolean("switch_next_plugin_when_nothing_is_playing")
         
@@ -78,10 +77,33 @@ class NowPlaying(FullScreenPlugin, metaclass=Singleton):
     def handle_click(self, pos):
         pass
 
+    def prewarm(self):
+        if int(self.clock.time() * 1000) - self.timer > self.update_interval * 1000:
+            if self.jobs.run("NowPlaying", self.get_now_playing_info, self.update_interval):
+                self.timer = int(self.clock.time() * 1000)
+
+    def get_memory_size(self):
+        size = self.helper.get_surface_size(self.image)
+        track_info = self.track_info
+        if track_info is not None:
+            for surface in [track_info.background, track_info.album_img, track_info.album_img_paused, track_info.context_image]:
+                size += self.helper.get_surface_size(surface)
+        return size
+
+    def suspend(self):
+        # What's playing is kept, only its surfaces go. They're rebuilt from the art in the response cache on resume.
+        self.image = None
+        if self.track_info is not None:
+            self.track_info.drop_images()
+
+    def resume(self):
+        self.image = self.surfaces.new((self.screen_width, self.screen_height))
+        self.image.fill(self.background_color)
+        self.jobs.submit("NowPlaying", self.get_now_playing_info)
+
     def update(self, tick, fps):
-        if int(time.time() * 1000) - self.timer > self.update_interval * 1000:
-            self.download_now_playing_info()
-            self.timer = int(time.time() * 1000)
+        if self.download_now_playing_info():
+            self.timer = int(self.clock.time() * 1000)
 
         if self.now_playing_updated:
             self.update_now_playing_surface()
@@ -96,19 +118,21 @@ class NowPlaying(FullScreenPlugin, metaclass=Singleton):
 
         # blit the progress bar
         if self.track_info is not None and self.track_info.id != "":
-            surf_progress_bar = pygame.Surface((self.track_info.album_img.get_width() + self.margin_x + self.info_width, self.progress_bar_height))
-            surf_progress_bar.fill(self.track_info.background_color)
-            pygame.draw.rect(surf_progress_bar, self.track_info.foreground_color,
-                             (0, 0, surf_progress_bar.get_width(), surf_progress_bar.get_height()), 1)
-
-            if self.track_info.track_duration > 0:
-                width = (self.track_info.track_position / self.track_info.track_duration) * surf_progress_bar.get_width()
-                pygame.draw.rect(surf_progress_bar, self.track_info.foreground_color, (0, 0, width, surf_progress_bar.get_height()))
-
-            self.image.blit(surf_progress_bar, (self.starting_x, self.starting_y + self.track_info.album_img.get_height() + self.margin_y))
+            # After a resume there's no progress bar until the surfaces are rebuilt
+            if self.track_info.album_img is not None:
+                surf_progress_bar = self.surfaces.new((self.track_info.album_img.get_width() + self.margin_x + self.info_width, self.progress_bar_height))
+                surf_progress_bar.fill(self.track_info.background_color)
+                pygame.draw.rect(surf_progress_bar, self.track_info.foreground_color,
+                                 (0, 0, surf_progress_bar.get_width(), surf_progress_bar.get_height()), 1)
+
+                if self.track_info.track_duration > 0:
+                    width = (self.track_info.track_position / self.track_info.track_duration) * surf_progress_bar.get_width()
+                    pygame.draw.rect(surf_progress_bar, self.track_info.foreground_color, (0, 0, width, surf_progress_bar.get_height()))
+
+                self.image.blit(surf_progress_bar, (self.starting_x, self.starting_y + self.track_info.album_img.get_height() + self.margin_y))
         else:
             # Nothing is playing
-            surf_message = self.title_font.render("Nothing is playing!", True, self.light_color)
+            surf_message = self.helper.render_text(self.title_font, "Nothing is playing!", True, self.light_color)
             self.canvas.blit(surf_message, (self.canvas.get_width() / 2 - surf_message.get_width() / 2, self.canvas.get_height() / 2 - surf_message.get_height()/2))
 
         if self.spotify_error:
@@ -127,7 +151,7 @@ class NowPlaying(FullScreenPlugin, metaclass=Singleton):
         else:
             if self.track_info.id == "":
                 self.image.fill(self.background_color)
-                surf_error_text = self.title_font.render("Nothing is playing!", True, self.foreground_notplaying)
+                surf_error_text = self.helper.render_text(self.title_font, "Nothing is playing!", True, self.foreground_notplaying)
                 self.image.blit(surf_error_text, (self.image.get_width()/2 - surf_error_text.get_width()/2, self.image.get_height()/2 - surf_error_text.get_height()/2))
                 if self.switch_next_plugin_when_nothing_is_playing:
                     self.READY_TO_SWITCH = True
@@ -294,11 +318,16 @@ class NowPlaying(FullScreenPlugin, metaclass=Singleton):
                 self.last_track_id = self.track_info.id
 
     def download_now_playing_info(self):
-        thread_timer = threading.Thread(target=self.get_now_playing_info, args=([]))
-        thread_timer.daemon = False
-        thread_timer.start()
+        """ Queues a refresh of what's playing if one is due. Returns True if it was queued. """
+        return self.jobs.schedule("NowPlaying", self.get_now_playing_info, self.update_interval)
 
     def get_now_playing_info(self):
+        track_info = self.track_info
+        if track_info is not None and track_info.album_img is None:
+            # Resumed after a suspend
+            track_info.reload_images(self.screen_width, self.screen_height, self.album_img_height, self.plugin_config)
+            self.now_playing_updated = True
+
         state = hashlib.sha256()
         state.update(str.encode(str(datetime.datetime.now().timestamp() * 1000)))
         state = state.hexdigest()
@@ -311,7 +340,7 @@ class NowPlaying(FullScreenPlugin, metaclass=Singleton):
         handler = CacheFileHandler(cache_path=os.path.join(os.getcwd(), ".cache-{}".format(username)), username=username)
         credential_manager = SpotifyPKCE(scope=scope, open_browser=False, client_id=client_id,
                                          state=state, redirect_uri=redirect_uri, cache_handler=handler)
-        sp = Spotify(client_credentials_manager=credential_manager)
+        sp = Spotify(client_credentials_manager=credential_manager, requests_session=self.http.session)
 
         error = None
         results = None
@@ -322,7 +351,7 @@ class NowPlaying(FullScreenPlugin, metaclass=Singleton):
 
         if error:
             self.spotify_error = error
-            return
+            return False
 
         self.spotify_error = ""
 
@@ -378,6 +407,7 @@ class Item:
         self.id = ""
         self.context_type = ""
         self.context_image = None
+        self.context_image_url = None
 
         self.playlist_name = ""
 
@@ -387,6 +417,7 @@ class Item:
         self.album_name = ""
         self.album_img = None
         self.album_img_paused = None
+        self.album_img_url = None
 
         # "name", "img"
         self.artists = []
@@ -405,13 +436,47 @@ class Item:
         self.background = None
         self.background_average = 0.0
 
-        self.background_color = eval(plugin_config["background"])
-        self.foreground_color = eval(plugin_config["foreground_notplaying"])
+        self.background_color = plugin_config.getcolor("background")
+        self.foreground_color = plugin_config.getcolor("foreground_notplaying")
 
         self.blur = 28
+        self.request_timeout = plugin_config.getint("request_timeout")
+        self.art_cache_ttl = plugin_config.getint("art_cache_ttl") * 60 * 60
         self.helper = helper
         self.debug = debug
 
+    def load_image(self, url):
+        """ Returns the image at url (from the response cache if it's there), or None """
+        r = NowPlaying.http_cache.get(url, self.art_cache_ttl, timeout=self.request_timeout)
+        if r and r.status_code == 200:
+            return Plugin.surfaces.convert(pygame.image.load(io.BytesIO(r.content)))
+        return None
+
+    def load_album_image(self, url):
+        self.album_img_url = url
+        self.album_img = self.load_image(url)
+
+    def load_context_image(self, url, plugin_config):
+        self.context_image_url = url
+        self.context_image = self.load_image(url)
+        if self.context_image is not None:
+            height = self.context_image.get_height() / (self.context_image.get_width() / plugin_config.getint("context_icon_width"))
+            self.context_image = pygame.transform.scale(self.context_image, (plugin_config.getint("context_icon_width"), int(height)))
+
+    def drop_images(self):
+        """ Lets go of the surfaces, keeping what's needed to rebuild them with reload_images() """
+        self.context_image = None
+        self.album_img = None
+        self.album_img_paused = None
+        self.background = None
+
+    def reload_images(self, screen_width, screen_height, album_height, plugin_config):
+        if self.album_img_url is not None:
+            self.load_album_image(self.album_img_url)
+        if self.context_image_url is not None:
+            self.load_context_image(self.context_image_url, plugin_config)
+        self.fix_album_image_and_build_background(screen_width, screen_height, album_height, plugin_config)
+
     def is_same_track(self, new_id):
         if new_id == self.id:
             return True
@@ -435,12 +500,7 @@ class Item:
             playlist = sp.playlist(sp_object["context"]["uri"])
             self.playlist_name = playlist["name"] if "name" in playlist else ""
             if "images" in playlist and len(playlist["images"]) > 0 and "url" in playlist["images"][0]:
-                r = requests.get(playlist["images"][0]["url"])
-                if r and r.status_code == 200:
-                    img = io.BytesIO(r.content)
-                    self.context_image = pygame.image.load(img).convert()
-                    height = self.context_image.get_height() / (self.context_image.get_width() / plugin_config.getint("context_icon_width"))
-                    self.context_image = pygame.transform.scale(self.context_image, (plugin_config.getint("context_icon_width"), int(height)))
+                self.load_context_image(playlist["images"][0]["url"], plugin_config)
 
         elif self.context_type == "album":
             pass
@@ -470,7 +530,7 @@ class Item:
         enhancer = ImageEnhance.Brightness(img)
         im_output = enhancer.enhance(0.4)
 
-        out_img = pygame.image.fromstring(im_output.tobytes(), im_output.size, "RGB").convert()
+        out_img = Plugin.surfaces.convert(pygame.image.fromstring(im_output.tobytes(), im_output.size, "RGB"))
 
         # fifth_width = out_img.get_width()/5
         quarter_height = out_img.get_height()/4
@@ -484,9 +544,9 @@ class Item:
         return out_img
 
     def fix_album_image_and_build_background(self, screen_width, screen_height, album_height, plugin_config):
-        light_color = eval(plugin_config["light_color"])
-        dark_color = eval(plugin_config["dark_color"])
-        background = eval(plugin_config["light_color"])
+        light_color = plugin_config.getcolor("light_color")
+        dark_color = plugin_config.getcolor("dark_color")
+        background = plugin_config.getcolor("light_color")
         if self.album_img is not None:
             if screen_height - self.album_img.get_height() > screen_width - self.album_img.get_width():
                 # expand to height
@@ -527,9 +587,9 @@ class Item:
 
             blurred = Image.frombytes("RGB", bg.get_size(), pygame.image.tostring(bg, "RGB"))\
                 .filter(ImageFilter.GaussianBlur(radius=self.blur))
-            self.background = pygame.image.fromstring(blurred.tobytes(), blurred.size, "RGB").convert()
+            self.background = Plugin.surfaces.convert(pygame.image.fromstring(blurred.tobytes(), blurred.size, "RGB"))
         else:
-            self.background = pygame.Surface((screen_width, screen_height))
+            self.background = Plugin.surfaces.new((screen_width, screen_height))
             self.background.fill(background)
             self.background_average = background
             light_distance = pygame.Vector3(light_color).distance_to(self.background_average)
@@ -541,7 +601,7 @@ class Item:
                 self.foreground_color = dark_color
                 self.background_color = light_color
 
-            self.album_img = pygame.Surface((album_height, album_height))
+            self.album_img = Plugin.surfaces.new((album_height, album_height))
             self.album_img.fill(background)
             self.album_img_paused = self.make_paused_album_image(self.album_img)
             self.helper.log(self.debug, "Background is empty!")
@@ -563,15 +623,9 @@ class EpisodeItem(Item):
         self.track_release_date = sp_object["item"]["release_date"]
 
         if "images" in sp_object["item"] and len(sp_object["item"]["images"]) > 0 and "url" in sp_object["item"]["images"][0]:
-            r = requests.get(sp_object["item"]["images"][0]["url"])
-            if r and r.status_code == 200:
-                img = io.BytesIO(r.content)
-                self.album_img = pygame.image.load(img).convert()
+            self.load_album_image(sp_object["item"]["images"][0]["url"])
         elif "images" in sp_object["item"]["show"] and len(sp_object["item"]["show"]["images"]) > 0 and "url" in sp_object["item"]["show"]["images"][0]:
-            r = requests.get(sp_object["item"]["show"]["images"][0]["url"])
-            if r and r.status_code == 200:
-                img = io.BytesIO(r.content)
-                self.album_img = pygame.image.load(img).convert()
+            self.load_album_image(sp_object["item"]["show"]["images"][0]["url"])
 
         # self.fix_album_image_and_build_background(screen_width, screen_height, album_height, config)
         self.album_name = sp_object["item"]["show"]["name"]
@@ -594,10 +648,7 @@ class TrackItem(Item):
 
         if len(sp_object["item"]["album"]["images"]) > 0 and "url" in sp_object["item"]["album"]["images"][0]:
             # album
-            r = requests.get(sp_object["item"]["album"]["images"][0]["url"])
-            if r and r.status_code == 200:
-                img = io.BytesIO(r.content)
-                self.album_img = pygame.image.load(img).convert()
+            self.load_album_image(sp_object["item"]["album"]["images"][0]["url"])
 
         # self.fix_album_image_and_build_background(screen_width, screen_height, album_height, config)
         self.album_name = sp_object["item"]["album"]["name"]
@@ -612,12 +663,7 @@ class TrackItem(Item):
             if "artists" in artists:
                 for i in artists["artists"]:
                     if self.context_type == "artist" and self.context_image is None:
-                        r = requests.get(i["images"][0]["url"])
-                        if r and r.status_code == 200:
-                            img = io.BytesIO(r.content)
-                            self.context_image = pygame.image.load(img).convert()
-                            height = self.context_image.get_height() / (self.context_image.get_width() / plugin_config.getint("context_icon_width"))
-                            self.context_image = pygame.transform.scale(self.context_image, (plugin_config.getint("context_icon_width"), height))
+                        self.load_context_image(i["images"][0]["url"], plugin_config)
 
                     self.artists.append(i["name"])
 
@@ -6,7 +6,6 @@ Now Playing (Ticker)
 import datetime
 import hashlib
 import threading
-import time
 
 import pygame
 import pygame.ftfont
@@ -15,6 +14,7 @@ import os
 from pygame.sprite import DirtySprite
 from spotipy import SpotifyPKCE, Spotify, CacheFileHandler
 
+from lib import fonts
 from lib.widget_plugin import WidgetPlugin
 
 
@@ -30,23 +30,18 @@ class NowPlayingTicker(DirtySprite, WidgetPlugin):
 
         self.now_playing = {}
         self.now_playing_updated = False
-        self.timer = -1
         self.now_playing_surface = None
         self.pos_x = 0
         self.ticker_buffer = 40
         self.border_brighten_amount = 32
 
-        font_size = 1
         self.ticker_border_size = 1
         self.margin_y = 2
         self.margin_x = 6
-        self.font = pygame.ftfont.SysFont(self.plugin_config["default_font_face"], font_size)
-        while self.font.size("XXXX")[1] + (self.ticker_border_size+self.margin_y)*2 < self.screen_height:
-            font_size += 1
-            self.font = pygame.ftfont.SysFont(self.plugin_config["default_font_face"], font_size)
-
-        font_size -= 1
-        self.font = pygame.ftfont.SysFont(self.plugin_config["default_font_face"], font_size)
+        font_size = fonts.get_fitted_font_size(self.plugin_config["default_font_face"], "XXXX",
+                                               max_height=self.screen_height - (self.ticker_border_size+self.margin_y)*2,
+                                               module=pygame.ftfont)
+        self.font = fonts.get_font(self.plugin_config["default_font_face"], font_size, module=pygame.ftfont)
 
         self.helper.log(self.debug, "Found a font size of {}".format(font_size))
 
@@ -59,9 +54,9 @@ class NowPlayingTicker(DirtySprite, WidgetPlugin):
         self.speed = self.plugin_config.getint("speed")
         self.provider = self.plugin_config["provider"]
         self.icon_notplaying = self.plugin_config["icon_notplaying"]
-        self.background = eval(self.plugin_config["background"])
-        self.foreground = eval(self.plugin_config["foreground"])
-        self.foreground_notplaying = eval(self.plugin_config["foreground_notplaying"])
+        self.background = self.plugin_config.getcolor("background")
+        self.foreground = self.plugin_config.getcolor("foreground")
+        self.foreground_notplaying = self.plugin_config.getcolor("foreground_notplaying")
 
         self.surf_icon_playing = pygame.image.load(os.path.join(self.icons_folder, self.icon), ).convert_alpha()
         self.surf_icon_notplaying = pygame.image.load(os.path.join(self.icons_folder, self.icon_notplaying), ).convert_alpha()
@@ -70,9 +65,7 @@ class NowPlayingTicker(DirtySprite, WidgetPlugin):
         self.surf_icon_notplaying = pygame.transform.scale(self.surf_icon_notplaying, icon_size)
 
     def update(self, tick, fps):
-        if int(time.time() * 1000) - self.timer > self.update_interval * 1000:
-            self.download_now_playing_info()
-            self.timer = int(time.time() * 1000)
+        self.download_now_playing_info()
 
         if self.now_playing_updated:
             self.update_now_playing_surface()
@@ -145,8 +138,8 @@ class NowPlayingTicker(DirtySprite, WidgetPlugin):
         else:
             surf_icon = self.surf_icon_notplaying
 
-        self.now_playing_surface = pygame.Surface((self.ticker_buffer + surf_icon.get_width() + self.margin_x +
-                                                   now_playing_text_surface.get_width(), self.screen_height))
+        self.now_playing_surface = self.surfaces.new((self.ticker_buffer + surf_icon.get_width() + self.margin_x +
+                                                      now_playing_text_surface.get_width(), self.screen_height))
         bg_color = self.background
         self.now_playing_surface.fill(bg_color)
 
@@ -171,9 +164,8 @@ class NowPlayingTicker(DirtySprite, WidgetPlugin):
                                        self.now_playing_surface.get_height() / 2 - now_playing_text_surface.get_height() / 2))
 
     def download_now_playing_info(self):
-        thread_timer = threading.Thread(target=self.get_now_playing_info, args=([]))
-        thread_timer.daemon = False
-        thread_timer.start()
+        """ Queues a refresh of what's playing if one is due """
+        self.jobs.schedule(self.config_section, self.get_now_playing_info, self.update_interval)
 
     def get_now_playing_info(self):
         state = hashlib.sha256()
@@ -188,7 +180,7 @@ class NowPlayingTicker(DirtySprite, WidgetPlugin):
         handler = CacheFileHandler(cache_path=os.path.join(os.getcwd(), ".cache-{}".format(username)), username=username)
         credential_manager = SpotifyPKCE(scope=scope, open_browser=False, client_id=client_id,
                                          state=state, redirect_uri=redirect_uri, cache_handler=handler)
-        sp = Spotify(client_credentials_manager=credential_manager)
+        sp = Spotify(client_credentials_manager=credential_manager, requests_session=self.http.session)
 
         results = sp.current_playback(additional_types="track,episode")
         if results is None:
@@ -5,14 +5,15 @@ OpenWeatherMap Forecast
 2022
 """
 import datetime
+import functools
 import json
 import os
-import time
 import requests
 import pygame
 import geopy
 import threading
 
+from lib import fonts
 from lib.fullscreen_plugin import FullScreenPlugin
 from lib.plugin import Singleton
 
@@ -29,22 +30,25 @@ class OpenWeatherMap(FullScreenPlugin, metaclass=Singleton):
 
         self.last_weather = None
         self.last_canvas = None
+        self.last_canvas_changed = False
 
-        self.smaller_font = pygame.font.SysFont(self.plugin_config["default_font_face"], self.plugin_config.getint("smaller_font_size"))
-        self.small_font = pygame.font.SysFont(self.plugin_config["default_font_face"], self.plugin_config.getint("small_font_size"))
-        self.large_font = pygame.font.SysFont(self.plugin_config["default_font_face"], self.plugin_config.getint("large_font_size"))
+        self.smaller_font = fonts.get_font(self.plugin_config["default_font_face"], self.plugin_config.getint("smaller_font_size"))
+        self.small_font = fonts.get_font(self.plugin_config["default_font_face"], self.plugin_config.getint("small_font_size"))
+        self.large_font = fonts.get_font(self.plugin_config["default_font_face"], self.plugin_config.getint("large_font_size"))
 
         self.weather_updated = False
         self.weather = None
         
-        self.foreground = eval(self.plugin_config["foreground"])
-        self.background = eval(self.plugin_config["background"])
+        self.foreground = self.plugin_config.getcolor("foreground")
+        self.background = self.plugin_config.getcolor("background")
         self.apikey = self.plugin_config["apikey"]
         self.latitude = self.plugin_config["latitude"]
         self.longitude = self.plugin_config["longitude"]
         self.unit_type = self.plugin_config["unit_type"]
         self.language = self.plugin_config["language"]
         self.update_interval = self.plugin_config.getint("update_interval")
+        self.request_timeout = self.plugin_config.getint("request_timeout")
+        self.cache_ttl = self.plugin_config.getint("cache_ttl")
         self.label = self.plugin_config["label"]
         self.city = self.plugin_config["city"]
 
@@ -52,11 +56,27 @@ class OpenWeatherMap(FullScreenPlugin, metaclass=Singleton):
             self.label = self.city
 
         self.got_longlat_from_city = False
+        # The url isn't known until the city has been looked up, so the forecast is cached by location instead
+        self.cache_key = "OpenWeatherMap/{}/{}/{}/{}/{}".format(self.city, self.latitude, self.longitude, self.unit_type, self.language)
+
+        self.reports_damage = True
+
+        self.load_cached_weather()
+
+    def load_cached_weather(self):
+        """ Shows the last forecast we got (e.g. before a restart) until the first download is done """
+        if self.apikey == "":
+            return
+
+        r = self.http_cache.get_cached(self.cache_key)
+        if r is not None:
+            self.helper.log(self.debug, "Using the cached weather until it's refreshed")
+            self.weather = self.parse_json_weather(r.json())
+            self.weather_updated = True
 
     def download_weather(self):
-        thread_timer = threading.Thread(target=self.download_weather_thread, args=([]))
-        thread_timer.daemon = False
-        thread_timer.start()
+        """ Queues a refresh of the weather if one is due. Returns True if it was queued. """
+        return self.jobs.schedule("OpenWeatherMap", self.download_weather_thread, self.update_interval * 60)
 
     def download_weather_thread(self):
         # Update the weather
@@ -66,7 +86,7 @@ class OpenWeatherMap(FullScreenPlugin, metaclass=Singleton):
         # Only need to do this once
         if self.city and not self.got_longlat_from_city:
             geoloc = geopy.Nominatim(user_agent="PiDisplay")
-            loc = geoloc.geocode(self.city)
+            loc = geoloc.geocode(self.city, timeout=self.request_timeout)
             if loc:
                 self.longitude = str(loc.longitude)
                 self.latitude = str(loc.latitude)
@@ -80,7 +100,7 @@ class OpenWeatherMap(FullScreenPlugin, metaclass=Singleton):
 
         http_status = ""
         try:
-            r = requests.get(my_url)
+            r = self.http_cache.get(my_url, self.cache_ttl * 60, key=self.cache_key, timeout=self.request_timeout)
             response = r.text
             http_status = r.status_code
             r.close()
@@ -100,90 +120,125 @@ class OpenWeatherMap(FullScreenPlugin, metaclass=Singleton):
         self.weather_updated = True
         self.helper.log(self.debug, "done getting weather!")
         lock.release()
+        return http_status == 200
+
+    def prewarm(self):
+        if int(self.clock.time() * 1000) - self.timer > self.update_interval * 1000 * 60:
+            if self.jobs.run("OpenWeatherMap", self.download_weather_thread, self.update_interval * 60):
+                self.timer = int(self.clock.time() * 1000)
+
+    def get_memory_size(self):
+        return self.helper.get_surface_size(self.last_canvas)
+
+    def suspend(self):
+        self.cancel_render()
+        self.last_canvas = None
+
+    def resume(self):
+        # Redraw from the last forecast we got
+        if self.weather is not None:
+            self.weather_updated = True
 
     def update(self, tick, fps):
-        if int(time.time() * 1000) - self.timer > self.update_interval * 1000 * 60:
-            self.download_weather()
-            self.timer = int(time.time() * 1000)
+        if self.download_weather():
+            self.timer = int(self.clock.time() * 1000)
 
         if self.weather_updated:
-            if not self.weather:
-                surf_error = self.small_font.render("Oops! There was a problem retrieving the weather!", True, self.foreground)
-                surf_error1 = self.small_font.render("(check the city and/or longitude/latitude in the config)", True, self.foreground)
+            if self.weather and "current" in self.weather and len(self.weather["current"]) > 0:
+                # The forecast is drawn over the next few frames. The last one stays up until it's done.
+                image = self.surfaces.new(self.canvas.get_size())
+                self.render_incrementally(self.render_forecast(image, self.weather),
+                                          functools.partial(self.show_forecast, image))
+            else:
+                if not self.weather:
+                    surf_error = self.small_font.render("Oops! There was a problem retrieving the weather!", True, self.foreground)
+                    surf_error1 = self.small_font.render("(check the city and/or longitude/latitude in the config)", True, self.foreground)
 
-                self.canvas.fill(self.background)
-                self.canvas.blit(surf_error, (self.canvas.get_width()/2 - surf_error.get_width()/2, self.canvas.get_height()/2 - surf_error.get_height()))
-                self.canvas.blit(surf_error1, (self.canvas.get_width()/2 - surf_error.get_width()/2, self.canvas.get_height()/2))
+                    self.canvas.fill(self.background)
+                    self.canvas.blit(surf_error, (self.canvas.get_width()/2 - surf_error.get_width()/2, self.canvas.get_height()/2 - surf_error.get_height()))
+                    self.canvas.blit(surf_error1, (self.canvas.get_width()/2 - surf_error.get_width()/2, self.canvas.get_height()/2))
 
-            elif "current" in self.weather and len(self.weather["current"]) > 0:
-                self.canvas.fill(self.background)
+                self.show_forecast(self.surfaces.copy(self.canvas))
 
-                _line_buffer = self.canvas.get_height()/10
-                _line_color = pygame.Vector3(self.foreground)
-                _line_color = _line_color.lerp(self.background, .4)
-                _line_width = 2
+            self.weather_updated = False
 
-                # TODAY'S DATE ------------
-                day = '{} {dt.day} {dt.year}'.format(self.weather["current"]["date"].strftime("%A, %b"), dt=self.weather["current"]["date"])
+        if self.last_canvas is not None:
+            self.canvas.blit(self.last_canvas, (0, 0))
+            if self.last_canvas_changed:
+                self.last_canvas_changed = False
+                self.mark_dirty()
+        else:
+            if self.apikey == "":
+                surf_error = self.small_font.render("Add your API key first!", True, self.foreground)
+            else:
+                surf_error = self.small_font.render("Retrieving weather...", True, self.foreground)
 
-                surf_todays_date = self.small_font.render(day, True, self.foreground)
+            self.canvas.fill(self.background)
+            self.canvas.blit(surf_error, (self.canvas.get_width()/2 - surf_error.get_width()/2, self.canvas.get_height()/2 - surf_error.get_height()/2))
 
-                surf_label_height = 0
-                surf_label = None
-                if self.label:
-                    surf_label = self.smaller_font.render(self.label, True, self.foreground)
-                    surf_label_height = surf_label.get_height()
+    def render_forecast(self, image, weather):
+        """ Draws the forecast on image. It's a generator that yields after each part, see
+            Plugin.render_incrementally(). """
+        image.fill(self.background)
 
-                current_weather_surface = self.get_current_weather_surface(self.weather)
+        _line_buffer = image.get_height()/10
+        _line_color = pygame.Vector3(self.foreground)
+        _line_color = _line_color.lerp(self.background, .4)
+        _line_width = 2
 
-                y = self.canvas.get_height()/2 - (surf_todays_date.get_height() + surf_label_height + current_weather_surface.get_height())/2
-                self.canvas.blit(surf_todays_date, (self.screen_width/4 - surf_todays_date.get_width()/2, y))
+        # TODAY'S DATE ------------
+        day = '{} {dt.day} {dt.year}'.format(weather["current"]["date"].strftime("%A, %b"), dt=weather["current"]["date"])
 
-                y += surf_todays_date.get_height() + 5
-                if surf_label:
-                    self.canvas.blit(surf_label, (current_weather_surface.get_width() / 2 - surf_label.get_width() / 2, y))
-                    y += surf_label_height
+        surf_todays_date = self.small_font.render(day, True, self.foreground)
 
-                self.canvas.blit(current_weather_surface, (0, y))
+        surf_label_height = 0
+        surf_label = None
+        if self.label:
+            surf_label = self.smaller_font.render(self.label, True, self.foreground)
+            surf_label_height = surf_label.get_height()
 
-                # ALL THE REST -------------
-                future_hours_surface = self.get_future_hours_surface(self.weather)
-                future_days_surface = self.get_future_days_surface(self.weather)
+        current_weather_surface = self.get_current_weather_surface(weather)
+        yield
 
-                surface_size = _line_buffer + future_hours_surface.get_height() + future_days_surface.get_height()
-                y = self.canvas.get_height() - surface_size - ((self.canvas.get_height() - surface_size)/2)
+        y = image.get_height()/2 - (surf_todays_date.get_height() + surf_label_height + current_weather_surface.get_height())/2
+        image.blit(surf_todays_date, (self.screen_width/4 - surf_todays_date.get_width()/2, y))
 
-                self.canvas.blit(future_hours_surface, (self.screen_width/2, y))
+        y += surf_todays_date.get_height() + 5
+        if surf_label:
+            image.blit(surf_label, (current_weather_surface.get_width() / 2 - surf_label.get_width() / 2, y))
+            y += surf_label_height
 
-                y += future_hours_surface.get_height() + _line_buffer
-                self.canvas.blit(future_days_surface, (self.screen_width/2, y))
+        image.blit(current_weather_surface, (0, y))
 
-                # Center vertical divider
-                pygame.draw.line(self.canvas, _line_color,
-                                 (self.screen_width / 2 - 1, _line_buffer),
-                                 (self.screen_width / 2 - 1, self.screen_height - _line_buffer), _line_width)
-                # Right horizontal divider
-                pygame.draw.line(self.canvas, _line_color,
-                                 (self.screen_width / 2 + _line_buffer, self.screen_height / 2 - 1),
-                                 (self.screen_width - _line_buffer, self.screen_height / 2 - 1), _line_width)
+        # ALL THE REST -------------
+        future_hours_surface = self.get_future_hours_surface(weather)
+        yield
+        future_days_surface = self.get_future_days_surface(weather)
+        yield
 
-            self.last_canvas = self.canvas.copy()
+        surface_size = _line_buffer + future_hours_surface.get_height() + future_days_surface.get_height()
+        y = image.get_height() - surface_size - ((image.get_height() - surface_size)/2)
 
-            self.weather_updated = False
-        else:
-            if self.last_canvas is not None:
-                self.canvas.blit(self.last_canvas, (0, 0))
-            else:
-                if self.apikey == "":
-                    surf_error = self.small_font.render("Add your API key first!", True, self.foreground)
-                else:
-                    surf_error = self.small_font.render("Retrieving weather...", True, self.foreground)
+        image.blit(future_hours_surface, (self.screen_width/2, y))
+
+        y += future_hours_surface.get_height() + _line_buffer
+        image.blit(future_days_surface, (self.screen_width/2, y))
+
+        # Center vertical divider
+        pygame.draw.line(image, _line_color,
+                         (self.screen_width / 2 - 1, _line_buffer),
+                         (self.screen_width / 2 - 1, self.screen_height - _line_buffer), _line_width)
+        # Right horizontal divider
+        pygame.draw.line(image, _line_color,
+                         (self.screen_width / 2 + _line_buffer, self.screen_height / 2 - 1),
+                         (self.screen_width - _line_buffer, self.screen_height / 2 - 1), _line_width)
 
-                self.canvas.fill(self.background)
-                self.canvas.blit(surf_error, (self.canvas.get_width()/2 - surf_error.get_width()/2, self.canvas.get_height()/2 - surf_error.get_height()/2))
+    def show_forecast(self, image):
+        self.last_canvas = image
+        self.last_canvas_changed = True
 
     def get_future_hours_surface(self, weather):
-        now = datetime.datetime.now()
+        now = self.clock.now()
         hour1 = now + datetime.timedelta(hours=1)
         surf_hours1 = None
         for i in weather["hourly"]:
@@ -223,7 +278,7 @@ class OpenWeatherMap(FullScreenPlugin, metaclass=Singleton):
         if height3 > height:
             height = height3
 
-        future_hours_surface = pygame.Surface((self.screen_width/2, height))
+        future_hours_surface = self.surfaces.new((self.screen_width/2, height))
         future_hours_surface.fill(self.background)
 
         if surf_hours1 is not None:
@@ -237,7 +292,7 @@ class OpenWeatherMap(FullScreenPlugin, metaclass=Singleton):
 
     def get_future_days_surface(self, weather):
 
-        now = datetime.datetime.now()
+        now = self.clock.now()
         day1 = now + datetime.timedelta(days=1)
         surf_day1 = None
         for i in weather["daily"]:
@@ -277,7 +332,7 @@ class OpenWeatherMap(FullScreenPlugin, metaclass=Singleton):
         if height3 > height:
             height = height3
 
-        future_days_surface = pygame.Surface((self.screen_width / 2, height))
+        future_days_surface = self.surfaces.new((self.screen_width / 2, height))
         future_days_surface.fill(self.background)
 
         if surf_day1 is not None:
@@ -315,8 +370,8 @@ class OpenWeatherMap(FullScreenPlugin, metaclass=Singleton):
 
         highlow_width += surf_degree_sign.get_width()*3
 
-        surf_current_highlow = pygame.Surface((highlow_width,
-                                               surf_current_low.get_height() + surf_current_high.get_height() + 10))
+        surf_current_highlow = self.surfaces.new((highlow_width,
+                                                  surf_current_low.get_height() + surf_current_high.get_height() + 10))
         surf_current_highlow.fill(self.background)
 
         surf_current_highlow.blit(surf_current_high,
@@ -404,7 +459,7 @@ class OpenWeatherMap(FullScreenPlugin, metaclass=Singleton):
         row4_height = surf_moon_icon.get_height()
 
         surface_height = (_line_buffer * 3) + row1_height + row2_height + row3_height + row4_height
-        current_weather_surface = pygame.Surface((surface_width, surface_height))
+        current_weather_surface = self.surfaces.new((surface_width, surface_height))
         current_weather_surface.fill(self.background)
 
         y = 0
@@ -458,8 +513,8 @@ class OpenWeatherMap(FullScreenPlugin, metaclass=Singleton):
 
         surf_icon = pygame.transform.scale(surf_icon, (icon_width, _temp_text_height))
 
-        surf_icon_complete = pygame.Surface((surf_icon.get_width() + _buffer + surf_text.get_width(),
-                                             _temp_text_height))
+        surf_icon_complete = self.surfaces.new((surf_icon.get_width() + _buffer + surf_text.get_width(),
+                                                _temp_text_height))
         surf_icon_complete.fill(self.background)
         surf_icon_complete.blit(surf_icon, (0, 0))
         surf_icon_complete.blit(surf_text, (surf_icon.get_width() + _buffer, surf_icon_complete.get_height()/2 -
@@ -497,7 +552,7 @@ class OpenWeatherMap(FullScreenPlugin, metaclass=Singleton):
         _line_spacer = 10
         height = (_line_spacer * 4) + surf_day_text.get_height() + surf_temp_icon.get_height() + \
             surf_temp.get_height() + surf_rain.get_height() + surf_wind_speed.get_height()
-        surf_day = pygame.Surface((width, height))
+        surf_day = self.surfaces.new((width, height))
         surf_day.fill(self.background)
 
         y = 0
@@ -546,7 +601,7 @@ class OpenWeatherMap(FullScreenPlugin, metaclass=Singleton):
         _line_spacer = 10
         height = (_line_spacer*4) + surf_hour_text.get_height() + surf_temp_icon.get_height() + \
             surf_temp.get_height() + surf_rain.get_height() + surf_wind_speed.get_height()
-        surf_hour = pygame.Surface((width, height))
+        surf_hour = self.surfaces.new((width, height))
         surf_hour.fill(self.background)
 
         y = 0
@@ -628,7 +683,7 @@ class OpenWeatherMap(FullScreenPlugin, metaclass=Singleton):
                 else:
                     w_date = datetime.datetime.fromtimestamp(0)
 
-                today = datetime.datetime.today()
+                today = self.clock.now()
                 if today.day == w_date.day and today.month == w_date.month and today.year == w_date.year:
                     weather["current"].update({"high": int(i["temp"]["max"])
                                               if "temp" in i and "max" in i["temp"] else "0"})
@@ -686,7 +741,7 @@ class OpenWeatherMap(FullScreenPlugin, metaclass=Singleton):
             for i in json_weather["hourly"]:
                 hourly = {}
                 hourly.update({"date": datetime.datetime.fromtimestamp(i["dt"])
-                              if "dt" in i else datetime.datetime.now()})
+                              if "dt" in i else self.clock.now()})
 
                 icon_key = ""
                 if "weather" in i:
@@ -4,12 +4,12 @@ Picture Viewer
 2022
 """
 import os
-import time
 import random
 import pygame
 import glob
 from PIL import Image, ImageFilter
 
+from lib import fonts
 from lib.fullscreen_plugin import FullScreenPlugin
 from lib.plugin import Singleton
 
@@ -28,7 +28,7 @@ class PictureViewer(FullScreenPlugin, metaclass=Singleton):
         self.current_picture_y = 0
         self.blur = 40
 
-        self.timer_bar_color = eval(self.plugin_config["timer_bar_color"])
+        self.timer_bar_color = self.plugin_config.getcolor("timer_bar_color")
         self.timer_bar_height = self.plugin_config.getint("timer_bar_height")
         self.slideshow_delay = self.plugin_config.getint("slideshow_delay")
         if self.plugin_config["timer_bar_position"] == "top":
@@ -42,6 +42,8 @@ class PictureViewer(FullScreenPlugin, metaclass=Singleton):
         self.extensions = ['png', 'jpg', 'gif']
         self.update_pics()
 
+        self.reports_damage = True
+
         self.helper.log(self.debug, "Screen size: {}x{}".format(self.screen_width, self.screen_height))
 
     def update_pics(self):
@@ -70,66 +72,89 @@ class PictureViewer(FullScreenPlugin, metaclass=Singleton):
     def next_pic(self):
         self.timer = -1
 
-    def update(self, tick, fps):
-        if int(time.time() * 1000) - self.timer > self.slideshow_delay * 1000:
-            # Time for next pic
-            pic_num = self.current_picture_index
-            if len(self.pictures) > 1:
-                while pic_num == self.current_picture_index:
-                    pic_num = random.randint(0, len(self.pictures)-1)
-
-                self.helper.log(self.debug, "Updating pic to: {}".format(self.pictures[pic_num]))
-                surf_pic = pygame.image.load(self.pictures[pic_num]).convert()
-
-                pic_aspect_ratio = surf_pic.get_width()*1.0 / surf_pic.get_height()
-                if self.screen_aspect_ratio < pic_aspect_ratio:
-                    pic_width = self.screen_width
-                    pic_height = int(pic_width / pic_aspect_ratio)
-                    self.current_picture_x = 0
-                    self.current_picture_y = (self.screen_height - pic_height) / 2
-                elif self.screen_aspect_ratio > pic_aspect_ratio:
-                    pic_height = self.screen_height
-                    pic_width = int(pic_height * pic_aspect_ratio)
-                    self.current_picture_x = (self.screen_width - pic_width) / 2
-                    self.current_picture_y = 0
-                else:
-                    pic_height = self.screen_height
-                    pic_width = self.screen_width
-                    self.current_picture_x = 0
-                    self.current_picture_y = 0
-                surf_pic = pygame.transform.scale(surf_pic, (pic_width, pic_height))
-
-                self.current_picture_index = pic_num
-                self.timer = int(time.time() * 1000)
-
-                if self.screen_height - surf_pic.get_height() > self.screen_width - surf_pic.get_width():
-                    # expand to height
-                    bg_width = int(surf_pic.get_width() * (self.screen_height / surf_pic.get_height()))
-                    bg_height = self.screen_height
-                else:
-                    # expand to width
-                    bg_width = self.screen_width
-                    bg_height = int(surf_pic.get_height() * (self.screen_width / surf_pic.get_width()))
-
-                bg = pygame.transform.scale(surf_pic, (bg_width, bg_height))
-                bg = bg.subsurface((bg.get_width() / 2 - self.screen_width / 2,
-                                    bg.get_height() / 2 - self.screen_height / 2,
-                                    self.screen_width, self.screen_height)).copy()
-
-                blurred = Image.frombytes("RGB", bg.get_size(), pygame.image.tostring(bg, "RGB")) \
-                    .filter(ImageFilter.GaussianBlur(radius=self.blur))
-                self.current_picture_surface = pygame.image.fromstring(blurred.tobytes(), blurred.size, "RGB").convert()
-                self.current_picture_surface.blit(surf_pic, (self.current_picture_x, self.current_picture_y))
+    def picture_expired(self):
+        return int(self.clock.time() * 1000) - self.timer > self.slideshow_delay * 1000
+
+    def prewarm(self):
+        # Decoding, scaling and blurring the next picture is the slow part, so get it out of the way up front
+        if self.picture_expired():
+            self.load_next_pic()
+
+    def get_memory_size(self):
+        return self.helper.get_surface_size(self.current_picture_surface)
+
+    def suspend(self):
+        self.current_picture_surface = None
+
+    def resume(self):
+        # Move on to a new picture rather than decoding the old one again
+        self.next_pic()
 
+    def load_next_pic(self):
+        pic_num = self.current_picture_index
+        if len(self.pictures) > 1:
+            while pic_num == self.current_picture_index:
+                pic_num = random.randint(0, len(self.pictures)-1)
+
+            self.helper.log(self.debug, "Updating pic to: {}".format(self.pictures[pic_num]))
+            surf_pic = self.surfaces.convert(pygame.image.load(self.pictures[pic_num]))
+
+            pic_aspect_ratio = surf_pic.get_width()*1.0 / surf_pic.get_height()
+            if self.screen_aspect_ratio < pic_aspect_ratio:
+                pic_width = self.screen_width
+                pic_height = int(pic_width / pic_aspect_ratio)
+                self.current_picture_x = 0
+                self.current_picture_y = (self.screen_height - pic_height) / 2
+            elif self.screen_aspect_ratio > pic_aspect_ratio:
+                pic_height = self.screen_height
+                pic_width = int(pic_height * pic_aspect_ratio)
+                self.current_picture_x = (self.screen_width - pic_width) / 2
+                self.current_picture_y = 0
             else:
-                self.current_picture_surface = pygame.Surface((self.screen_width, self.screen_height))
-                font = pygame.font.SysFont(self.plugin_config["default_font_face"], self.plugin_config.getint("default_font_size"))
-                surf_error = font.render("No pictures found!", True, (200, 200, 200))
-                self.current_picture_surface.fill((0, 0, 0))
-                self.current_picture_surface.blit(surf_error, (self.current_picture_surface.get_width()/2 - surf_error.get_width()/2,
-                                                               self.current_picture_surface.get_height()/2 - surf_error.get_height()/2))
+                pic_height = self.screen_height
+                pic_width = self.screen_width
+                self.current_picture_x = 0
+                self.current_picture_y = 0
+            surf_pic = pygame.transform.scale(surf_pic, (pic_width, pic_height))
+
+            self.current_picture_index = pic_num
+            self.timer = int(self.clock.time() * 1000)
+
+            if self.screen_height - surf_pic.get_height() > self.screen_width - surf_pic.get_width():
+                # expand to height
+                bg_width = int(surf_pic.get_width() * (self.screen_height / surf_pic.get_height()))
+                bg_height = self.screen_height
+            else:
+                # expand to width
+                bg_width = self.screen_width
+                bg_height = int(surf_pic.get_height() * (self.screen_width / surf_pic.get_width()))
+
+            bg = pygame.transform.scale(surf_pic, (bg_width, bg_height))
+            bg = bg.subsurface((bg.get_width() / 2 - self.screen_width / 2,
+                                bg.get_height() / 2 - self.screen_height / 2,
+                                self.screen_width, self.screen_height)).copy()
+
+            blurred = Image.frombytes("RGB", bg.get_size(), pygame.image.tostring(bg, "RGB")) \
+                .filter(ImageFilter.GaussianBlur(radius=self.blur))
+            self.current_picture_surface = self.surfaces.convert(pygame.image.fromstring(blurred.tobytes(), blurred.size, "RGB"))
+            self.current_picture_surface.blit(surf_pic, (self.current_picture_x, self.current_picture_y))
+
+        else:
+            self.current_picture_surface = self.surfaces.new((self.screen_width, self.screen_height))
+            font = fonts.get_font(self.plugin_config["default_font_face"], self.plugin_config.getint("default_font_size"))
+            surf_error = self.helper.render_text(font, "No pictures found!", True, (200, 200, 200))
+            self.current_picture_surface.fill((0, 0, 0))
+            self.current_picture_surface.blit(surf_error, (self.current_picture_surface.get_width()/2 - surf_error.get_width()/2,
+                                                           self.current_picture_surface.get_height()/2 - surf_error.get_height()/2))
+        self.mark_dirty()
+
+    def update(self, tick, fps):
+        if self.picture_expired():
+            # Time for next pic
+            self.load_next_pic()
 
         self.canvas.blit(self.current_picture_surface, (0, 0))
 
-        self.timer_bar_width = ((self.slideshow_delay * 1000) - (int(time.time() * 1000) - self.timer)) * self.ratio
+        self.timer_bar_width = ((self.slideshow_delay * 1000) - (int(self.clock.time() * 1000) - self.timer)) * self.ratio
         pygame.draw.rect(self.canvas, self.timer_bar_color, (0, self.timer_bar_y, self.timer_bar_width, self.timer_bar_height))
+        self.mark_dirty((0, self.timer_bar_y, self.screen_width, self.timer_bar_height))
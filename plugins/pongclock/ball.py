@@ -2,6 +2,8 @@
 import math
 import pygame
 
+from lib.plugin import Plugin
+
 
 class Ball(pygame.sprite.DirtySprite):
     """ Ball object """
@@ -10,12 +12,12 @@ class Ball(pygame.sprite.DirtySprite):
 
         self.helper = helper
         self.ball_width = plugin_config.getint("ball_width")
-        self.foreground = eval(plugin_config["foreground"])
+        self.foreground = plugin_config.getcolor("foreground")
         self.screen_margin = plugin_config.getint("screen_margin")
         self.digit_height = plugin_config.getint("digit_height")
         self.paddle_width = plugin_config.getint("paddle_width")
         self.debug = debug
-        self.image = pygame.Surface([self.ball_width, self.ball_width])
+        self.image = Plugin.surfaces.new([self.ball_width, self.ball_width])
         self.image.fill(self.foreground)
 
         self.screen_width = screen_width
@@ -3,6 +3,8 @@ import math
 import random
 import pygame
 
+from lib.plugin import Plugin
+
 
 class Paddle(pygame.sprite.DirtySprite):
     """ Paddle object """
@@ -15,12 +17,12 @@ class Paddle(pygame.sprite.DirtySprite):
         self.debug = debug
         self.paddle_width = plugin_config.getint("paddle_width")
         self.paddle_height = plugin_config.getint("paddle_height")
-        self.foreground = eval(plugin_config["foreground"])
+        self.foreground = plugin_config.getcolor("foreground")
         self.screen_margin = plugin_config.getint("screen_margin")
         self.digit_height = plugin_config.getint("digit_height")
         self.paddle_speed_factor = plugin_config.getint("paddle_speed_factor")
 
-        self.image = self.paddle_image = pygame.Surface([self.paddle_width, self.paddle_height])
+        self.image = self.paddle_image = Plugin.surfaces.new([self.paddle_width, self.paddle_height])
         self.paddle_image.fill(self.foreground)
         self.rect = self.paddle_image.get_rect()
 
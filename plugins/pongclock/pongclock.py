@@ -3,7 +3,6 @@ PongClock
 (c) Steven Babineau - babineau@gmail.com
 2022
 """
-import datetime
 import os
 import random
 import pygame
@@ -23,9 +22,9 @@ class PongClock(FullScreenPlugin, metaclass=Singleton):
 
         self.helper_vars = {"red": (255, 0, 0), "green": (0, 255, 0), "right": "RIGHT", "left": "LEFT"}
 
-        self.canvas_with_divider = self.canvas.copy()
-        self.background = eval(self.plugin_config["background"])
-        self.foreground = eval(self.plugin_config["foreground"])
+        self.canvas_with_divider = self.surfaces.copy(self.canvas)
+        self.background = self.plugin_config.getcolor("background")
+        self.foreground = self.plugin_config.getcolor("foreground")
         self.sprites = None
         self.old_minutes = 0
         self.old_hours = 0
@@ -39,6 +38,9 @@ class PongClock(FullScreenPlugin, metaclass=Singleton):
         self.mins1 = None
         self.mins2 = None
 
+        self.hity_rect = None
+        self.reports_damage = True
+
         self.setup_board()
 
     def setup_board(self):
@@ -69,7 +71,7 @@ class PongClock(FullScreenPlugin, metaclass=Singleton):
         self.right_paddle = Paddle(self.debug, self.plugin_config, self.helper, self.helper.RIGHT, self.game_ball,
                                    self.canvas.get_width(), self.canvas.get_height())
 
-        now = datetime.datetime.now()
+        now = self.clock.now()
         fixed_hours = now.hour
         if self.plugin_config.getint("hour_type") == 12 and fixed_hours > 12:
             fixed_hours -= 12
@@ -103,14 +105,14 @@ class PongClock(FullScreenPlugin, metaclass=Singleton):
         self.old_minutes = now.minute
         self.old_hours = now.hour
 
-        pygame.display.flip()
+        self.mark_dirty()
 
     def update(self, tick, fps):
         if self.just_in:
             self.setup_board()
 
         if tick == 1:
-            now = datetime.datetime.now()
+            now = self.clock.now()
             if now.hour != self.old_hours:
                 self.old_hours = now.hour
                 self.old_minutes = now.minute
@@ -126,8 +128,8 @@ class PongClock(FullScreenPlugin, metaclass=Singleton):
         self.sprites.update(self.canvas)
 
         dirty_rects = self.sprites.draw(self.canvas)
-
-        pygame.display.update(dirty_rects)
+        for rect in dirty_rects:
+            self.mark_dirty(rect)
 
         if self.game_ball.bounced:
             # this will be opposite since it just bounced
@@ -137,18 +139,21 @@ class PongClock(FullScreenPlugin, metaclass=Singleton):
                 self.right_paddle.hit()
 
         if self.debug:
+            if self.hity_rect is not None:
+                self.mark_dirty(self.hity_rect)
             if self.game_ball.direction == self.helper.RIGHT:
-                pygame.draw.rect(self.canvas, self.helper.RED,
-                                 pygame.Rect(self.canvas.get_width() - 30, self.game_ball.hity, 30,
-                                             2))
+                self.hity_rect = pygame.draw.rect(self.canvas, self.helper.RED,
+                                                  pygame.Rect(self.canvas.get_width() - 30, self.game_ball.hity, 30,
+                                                              2))
             else:
-                pygame.draw.rect(self.canvas, self.helper.RED,
-                                 pygame.Rect(0, self.game_ball.hity, 30, 2))
+                self.hity_rect = pygame.draw.rect(self.canvas, self.helper.RED,
+                                                  pygame.Rect(0, self.game_ball.hity, 30, 2))
+            self.mark_dirty(self.hity_rect)
 
         if self.game_ball.just_lost:
             self.helper.log(self.debug, "ball just lost... resetting.")
 
-            now = datetime.datetime.now()
+            now = self.clock.now()
             hours = str(now.hour).zfill(2)
             minutes = str(now.minute).zfill(2)
 
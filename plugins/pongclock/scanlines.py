@@ -28,7 +28,7 @@ def create_scanline_surface(plugin_config, surface):
     """ Add all the lines to the surface """
     i = step = 5
     while i < surface.get_height():
-        alpha0 = eval(plugin_config["scanline_color"])
+        alpha0 = plugin_config.getcolor("scanline_color")
         alpha1 = (alpha0[0], alpha0[1], alpha0[2], alpha0[3]/2)
         # alpha2 = (alpha0[0], alpha0[1], alpha0[2], alpha0[3]/4)
 
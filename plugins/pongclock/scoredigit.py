@@ -1,6 +1,8 @@
 """ Programmatically creates the digits for the score/time """
 import pygame.sprite
 
+from lib.plugin import Plugin
+
 DIGIT_SEGMENTS = {'0': '1111110', '1': '0110000', '2': '1101101', '3': '1111001', '4': '0110011',
                   '5': '1011011', '6': '1011111', '7': '1110000', '8': '1111111', '9': '1111011'}
 
@@ -17,9 +19,9 @@ class ScoreDigit(pygame.sprite.DirtySprite):
         self.digit_width = plugin_config.getint("digit_width")
         self.digit_height = plugin_config.getint("digit_height")
         self.digit_line_width = plugin_config.getint("digit_line_width")
-        self.foreground = eval(plugin_config["foreground"])
+        self.foreground = plugin_config.getcolor("foreground")
 
-        self.image = pygame.Surface([self.digit_width, self.digit_height])
+        self.image = Plugin.surfaces.new([self.digit_width, self.digit_height])
         self.original_image = self.image.copy()
         self.rect = self.image.get_rect()
         self.rect.top = top
@@ -1,4 +1,3 @@
-import threading
 from datetime import datetime
 import os
 import platform
@@ -10,11 +9,14 @@ import time
 import psutil
 
 import pygame
-import requests
 
+from lib import fonts
 from lib.plugin import Singleton
 from lib.fullscreen_plugin import FullScreenPlugin
 
+# The commands run on the fetch workers, so one that hangs (e.g. a ping that gets no answer) is killed after this long
+COMMAND_TIMEOUT = 5
+
 
 class SystemInfo(FullScreenPlugin, metaclass=Singleton):
     """ System Info """
@@ -25,26 +27,26 @@ class SystemInfo(FullScreenPlugin, metaclass=Singleton):
         font_str = self.plugin_config["font_face"]
         if font_str[-4:].lower() == ".ttf" or font_str[-4:].lower() == ".otf":
             filename = os.path.abspath(os.path.join(os.path.dirname(__file__), "fonts", font_str))
-            self.default_font = pygame.font.Font(filename, self.plugin_config.getint("font_size"))
+            self.default_font = fonts.get_font(filename, self.plugin_config.getint("font_size"))
             self.helper.log(self.debug, "FONT: regular font loading {}".format(filename))
         else:
-            self.default_font = pygame.font.SysFont(font_str, self.plugin_config.getint("font_size"))
+            self.default_font = fonts.get_font(font_str, self.plugin_config.getint("font_size"))
             self.helper.log(self.debug, "FONT: loading default font {}".format(font_str))
 
         bold_font_str = self.plugin_config["font_face_bold"]
         if bold_font_str[-4:].lower() == ".ttf":
             filename = os.path.abspath(os.path.join(os.path.dirname(__file__), "fonts", bold_font_str))
-            self.header_font = pygame.font.Font(filename, self.plugin_config.getint("font_size"))
+            self.header_font = fonts.get_font(filename, self.plugin_config.getint("font_size"))
             self.helper.log(self.debug, "FONT: bold font loading {}".format(filename))
         else:
-            self.header_font = pygame.font.SysFont(bold_font_str, self.plugin_config.getint("font_size"), bold=True)
+            self.header_font = fonts.get_font(bold_font_str, self.plugin_config.getint("font_size"), bold=True)
             self.helper.log(self.debug, "FONT: loading default font {}".format(bold_font_str))
 
-        self.fg_color = eval(self.plugin_config["foreground"])
-        self.bargraph_color = eval(self.plugin_config["bargraph_color"])
-        self.bargraph_text_color = eval(self.plugin_config["bargraph_text_color"])
-        self.bargraph_border_color = eval(self.plugin_config["bargraph_border_color"])
-        self.bg_color = eval(self.plugin_config["background"])
+        self.fg_color = self.plugin_config.getcolor("foreground")
+        self.bargraph_color = self.plugin_config.getcolor("bargraph_color")
+        self.bargraph_text_color = self.plugin_config.getcolor("bargraph_text_color")
+        self.bargraph_border_color = self.plugin_config.getcolor("bargraph_border_color")
+        self.bg_color = self.plugin_config.getcolor("background")
         self.unit_type = self.plugin_config["unit_type"]
         if self.unit_type != helper.FAHRENHEIT and self.unit_type != helper.CELSIUS:
             self.unit_type = helper.CELSIUS
@@ -53,6 +55,7 @@ class SystemInfo(FullScreenPlugin, metaclass=Singleton):
             self.ping_type = helper.CONNECT
 
         self.update_interval = self.plugin_config.getint("update_interval")
+        self.request_timeout = self.plugin_config.getint("request_timeout")
 
         self.internet_test_connectivity_host = self.plugin_config["internet_test_connectivity_host"]
         self.internet_test_connectivity_port = self.plugin_config.getint("internet_test_connectivity_port")
@@ -108,8 +111,12 @@ class SystemInfo(FullScreenPlugin, metaclass=Singleton):
         self.networking_connected_to_internet = False
         self.system_raspberry_pi_model = ""
 
-        self.timer = self.update_interval
-        self.image = pygame.Surface((self.screen_width, self.screen_height))
+        # When the info (everything, and just what changes by the second) was last collected, as in clock.time()
+        self.last_refresh = 0
+        self.last_light_refresh = 0
+        self.image = self.surfaces.new((self.screen_width, self.screen_height))
+        # The page is redrawn on this one (over a few frames) and then swapped with image
+        self.back_image = None
         self.upper_right_x = 0
         self.small_graph_width = 150
         self.small_graph_width_small = 100
@@ -123,8 +130,8 @@ class SystemInfo(FullScreenPlugin, metaclass=Singleton):
         self.info_updated_light = False
         self.cpus_graph_start_x = 0
         self.cpus_graph_start_y = 0
-        self.in_systeminfo_light_thread = False
-        self.in_systeminfo_thread = False
+        self.image_changed = False
+        self.reports_damage = True
 
         self.image.fill(self.bg_color)
 
@@ -164,7 +171,7 @@ class SystemInfo(FullScreenPlugin, metaclass=Singleton):
 
         lscpu = ""
         try:
-            lscpu = (subprocess.check_output("lscpu", stderr=subprocess.DEVNULL).strip()).decode()
+            lscpu = (subprocess.check_output("lscpu", stderr=subprocess.DEVNULL, timeout=COMMAND_TIMEOUT).strip()).decode()
         except:
             pass
 
@@ -215,7 +222,7 @@ class SystemInfo(FullScreenPlugin, metaclass=Singleton):
     @staticmethod
     def ping_time(hostname):
         try:
-            ping = subprocess.check_output(["ping", "-c", "1", "-n", "-4", hostname], stderr=subprocess.DEVNULL).decode()
+            ping = subprocess.check_output(["ping", "-c", "1", "-n", "-4", hostname], stderr=subprocess.DEVNULL, timeout=COMMAND_TIMEOUT).decode()
             matches = re.findall(r"min/avg/max/mdev = ([^/]+).*", ping, re.I)
             if len(matches) > 0:
                 return "{}ms".format(matches[0].split(".")[0])
@@ -228,7 +235,7 @@ class SystemInfo(FullScreenPlugin, metaclass=Singleton):
     def get_wifi_signal_level():
         signal_level = ""
         try:
-            iwconfig = subprocess.check_output(["iwconfig"], stderr=subprocess.DEVNULL).stdout.decode()
+            iwconfig = subprocess.check_output(["iwconfig"], stderr=subprocess.DEVNULL, timeout=COMMAND_TIMEOUT).stdout.decode()
             matches = re.findall('(wlan[0-9]+).*?Signal level=(-[0-9]+) dBm', iwconfig, re.DOTALL)
             if len(matches) > 1:
                 signal_level = matches[1]
@@ -239,7 +246,7 @@ class SystemInfo(FullScreenPlugin, metaclass=Singleton):
     @staticmethod
     def get_default_resolution():
         try:
-            fbset = subprocess.check_output(["fbset", "-s"], stderr=subprocess.DEVNULL).stdout.decode()
+            fbset = subprocess.check_output(["fbset", "-s"], stderr=subprocess.DEVNULL, timeout=COMMAND_TIMEOUT).stdout.decode()
             matches = re.findall(r".+geometry (\d+) (\d+).*", fbset, re.DOTALL)
             if len(matches) > 1:
                 return matches[0], matches[1]
@@ -270,8 +277,8 @@ class SystemInfo(FullScreenPlugin, metaclass=Singleton):
 
         # raspberry pi only
         try:
-            self.cpu_ram = subprocess.check_output(["vcgencmd", "get_mem", "arm"], stderr=subprocess.DEVNULL).stdout.decode()
-            self.gpu_ram = subprocess.check_output(["vcgencmd", "get_mem", "gpu"], stderr=subprocess.DEVNULL).stdout.decode()
+            self.cpu_ram = subprocess.check_output(["vcgencmd", "get_mem", "arm"], stderr=subprocess.DEVNULL, timeout=COMMAND_TIMEOUT).stdout.decode()
+            self.gpu_ram = subprocess.check_output(["vcgencmd", "get_mem", "gpu"], stderr=subprocess.DEVNULL, timeout=COMMAND_TIMEOUT).stdout.decode()
         except:
             pass
 
@@ -301,19 +308,19 @@ class SystemInfo(FullScreenPlugin, metaclass=Singleton):
         self.networking_nics = psutil.net_if_addrs()
         self.networking_nic_stats = psutil.net_io_counters(pernic=True)
         try:
-            self.networking_wifi_name = subprocess.check_output(["iwgetid", "-r"], stderr=subprocess.DEVNULL).stdout.decode()
+            self.networking_wifi_name = subprocess.check_output(["iwgetid", "-r"], stderr=subprocess.DEVNULL, timeout=COMMAND_TIMEOUT).stdout.decode()
         except:
             pass
         self.networking_wifi_signal_strength = SystemInfo.get_wifi_signal_level()
 
         # NETWORKING/IP
         try:
-            self.networking_public_ip_address = requests.get('https://api.ipify.org').text
+            self.networking_public_ip_address = self.http.get('https://api.ipify.org', timeout=self.request_timeout).text
         except:
             pass
 
         try:
-            default_gw = subprocess.check_output(["ip", "route", "list", "default"], stderr=subprocess.DEVNULL).decode()
+            default_gw = subprocess.check_output(["ip", "route", "list", "default"], stderr=subprocess.DEVNULL, timeout=COMMAND_TIMEOUT).decode()
             match = re.search(r"default via ([^\s]+).+", default_gw, re.I)
             if match is not None and len(match.groups()) > 0:
                 self.networking_default_gateway = match.group(1)
@@ -341,7 +348,7 @@ class SystemInfo(FullScreenPlugin, metaclass=Singleton):
 
         # RASPBERRY PI
         try:
-            self.system_raspberry_pi_model = subprocess.check_output(["cat", "/proc/device-tree/model"], stderr=subprocess.DEVNULL).stdout.decode()
+            self.system_raspberry_pi_model = subprocess.check_output(["cat", "/proc/device-tree/model"], stderr=subprocess.DEVNULL, timeout=COMMAND_TIMEOUT).stdout.decode()
         except:
             pass
 
@@ -349,26 +356,26 @@ class SystemInfo(FullScreenPlugin, metaclass=Singleton):
         self.cpu_current_load_total = psutil.cpu_percent(interval=None, percpu=False)
         self.cpu_stats = psutil.cpu_times_percent(interval=None, percpu=True)
 
-    def update_image_light(self):
+    def update_image_light(self, image):
         if self.upper_right_x > 0:
             # Current time
-            surf_current_time = self.default_font.render("Now: {}".format(datetime.now().strftime(self.date_format)), True, self.fg_color, self.bg_color)
-            self.image.blit(surf_current_time, (self.screen_width - self.upper_right_x - self.screen_margin, self.default_font.get_linesize() + self.line_buffer_small + self.screen_margin))
+            surf_current_time = self.default_font.render("Now: {}".format(self.clock.now().strftime(self.date_format)), True, self.fg_color, self.bg_color)
+            image.blit(surf_current_time, (self.screen_width - self.upper_right_x - self.screen_margin, self.default_font.get_linesize() + self.line_buffer_small + self.screen_margin))
 
             # CPU usage graph
-            surf_cpu_usage = pygame.Surface((self.surf_cpu_graph_width, self.small_graph_height))
+            surf_cpu_usage = self.surfaces.new((self.surf_cpu_graph_width, self.small_graph_height))
             surf_cpu_usage.fill(self.bg_color)
             cpu_usage_width = self.cpu_current_load_total/100 * self.surf_cpu_graph_width
             pygame.draw.rect(surf_cpu_usage, self.bargraph_color, (0, 0, cpu_usage_width, surf_cpu_usage.get_height()))
             surf_cpu_usage_text = self.default_font.render("{}%".format(self.cpu_current_load_total), True, self.bargraph_text_color)
             surf_cpu_usage.blit(surf_cpu_usage_text, (surf_cpu_usage.get_width()/2 - surf_cpu_usage_text.get_width()/2, surf_cpu_usage.get_height()/2 - surf_cpu_usage_text.get_height()/2))
             pygame.draw.rect(surf_cpu_usage, self.bargraph_border_color, (0, 0, surf_cpu_usage.get_width(), surf_cpu_usage.get_height()), 1)
-            self.image.blit(surf_cpu_usage, (self.surf_cpu_graph_start, self.surf_cpu_information_title_y + self.header_font.get_height()/2 - surf_cpu_usage.get_height()/2))
+            image.blit(surf_cpu_usage, (self.surf_cpu_graph_start, self.surf_cpu_information_title_y + self.header_font.get_height()/2 - surf_cpu_usage.get_height()/2))
 
             # CPUs usage graph
             y = self.cpus_graph_start_y
             for i in range(len(self.cpu_stats)):
-                surf = pygame.Surface((self.small_graph_width_small, self.small_graph_height))
+                surf = self.surfaces.new((self.small_graph_width_small, self.small_graph_height))
                 surf.fill(self.bg_color)
                 cpu_usage_width = self.cpu_stats[i].user / 100 * self.small_graph_width_small
 
@@ -376,13 +383,15 @@ class SystemInfo(FullScreenPlugin, metaclass=Singleton):
                 surf_cpu_usage_text = self.default_font.render("{}%".format(self.cpu_stats[i].user), True, self.bargraph_text_color)
                 surf.blit(surf_cpu_usage_text, (surf.get_width() / 2 - surf_cpu_usage_text.get_width() / 2, surf.get_height() / 2 - surf_cpu_usage_text.get_height() / 2))
                 pygame.draw.rect(surf, self.bargraph_border_color, (0, 0, surf.get_width(), surf.get_height()), 1)
-                self.image.blit(surf, (self.cpus_graph_start_x, y+1))
+                image.blit(surf, (self.cpus_graph_start_x, y+1))
                 y += self.small_graph_height + self.line_buffer_small
 
-    def update_image(self):
+    def update_image(self, image):
+        """ Draws the whole page on image. It's a generator that yields after each section, see
+            Plugin.render_incrementally(). """
 
         surf_system_hostname = self.header_font.render(self.system_hostname, True, self.fg_color, self.bg_color)
-        self.image.blit(surf_system_hostname, (self.screen_margin, self.screen_margin))
+        image.blit(surf_system_hostname, (self.screen_margin, self.screen_margin))
 
         indent = surf_system_hostname.get_width() / 2
         column_spacer = 20
@@ -404,24 +413,24 @@ class SystemInfo(FullScreenPlugin, metaclass=Singleton):
 
         del longest_date_surf
 
-        self.image.blit(surf_system_uptime, (self.screen_width - self.upper_right_x - self.screen_margin, self.screen_margin))
+        image.blit(surf_system_uptime, (self.screen_width - self.upper_right_x - self.screen_margin, self.screen_margin))
 
         if surf_wifi_info is not None:
-            self.image.blit(surf_wifi_info, (self.screen_width - self.upper_right_x - self.screen_margin, self.default_font.get_linesize() * 2 + self.screen_margin))
+            image.blit(surf_wifi_info, (self.screen_width - self.upper_right_x - self.screen_margin, self.default_font.get_linesize() * 2 + self.screen_margin))
 
         surf_os_info = self.default_font.render(
             "A {} system running on {} since {}".format(self.system_os_version, self.cpu_architecture,
                                                         self.system_boot_time), True, self.fg_color, self.bg_color)
         x = (self.screen_width - surf_system_hostname.get_width() - self.upper_right_x) / 2 - surf_os_info.get_width() / 2 + surf_system_hostname.get_width() + self.screen_margin
-        self.image.blit(surf_os_info, (x, self.screen_margin))
+        image.blit(surf_os_info, (x, self.screen_margin))
 
         current_y = self.default_font.get_linesize() + self.line_buffer_small + self.screen_margin
         if self.system_raspberry_pi_model != "":
             surf_pi_version = self.default_font.render("Pi ver: {}".format(self.system_raspberry_pi_model), True, self.fg_color, self.bg_color)
-            self.image.blit(surf_pi_version, (indent + self.screen_margin, self.default_font.get_linesize() + self.screen_margin))
+            image.blit(surf_pi_version, (indent + self.screen_margin, self.default_font.get_linesize() + self.screen_margin))
 
         surf_display_info = self.default_font.render("Display: {} (native) {} (current)".format(self.display_native_resolution, self.display_resolution), True, self.fg_color, self.bg_color)
-        self.image.blit(surf_display_info, (self.screen_width - self.upper_right_x - surf_display_info.get_width() - 100 - self.screen_margin, current_y))  # right-padding
+        image.blit(surf_display_info, (self.screen_width - self.upper_right_x - surf_display_info.get_width() - 100 - self.screen_margin, current_y))  # right-padding
 
         current_y += self.default_font.get_linesize() + self.line_buffer
 
@@ -438,10 +447,10 @@ class SystemInfo(FullScreenPlugin, metaclass=Singleton):
                     break
 
         surf_ip_info = self.default_font.render("IP: {}/{} ({}, {})".format(local_ip, subnet_mask, self.networking_public_ip_address, self.networking_ping_internet), True, self.fg_color, self.bg_color)
-        self.image.blit(surf_ip_info, (indent + self.screen_margin, current_y))
+        image.blit(surf_ip_info, (indent + self.screen_margin, current_y))
 
         surf_default_gw = self.default_font.render("GW: {} ({})".format(self.networking_default_gateway, self.networking_ping_default_gateway), True, self.fg_color, self.bg_color)
-        self.image.blit(surf_default_gw, (indent + surf_ip_info.get_width() + 50 + self.screen_margin, current_y))  # left-padding
+        image.blit(surf_default_gw, (indent + surf_ip_info.get_width() + 50 + self.screen_margin, current_y))  # left-padding
 
         current_y += self.default_font.get_linesize()
 
@@ -451,12 +460,12 @@ class SystemInfo(FullScreenPlugin, metaclass=Singleton):
         surf_network_information_title = self.header_font.render("Network", True, self.fg_color, self.bg_color)
 
         current_y += self.line_buffer
-        self.image.blit(surf_cpu_information_title, (self.screen_margin, current_y))
+        image.blit(surf_cpu_information_title, (self.screen_margin, current_y))
         self.surf_cpu_information_title_y = current_y
         self.surf_cpu_graph_start = surf_cpu_information_title.get_width() + column_spacer + self.screen_margin
 
         surf_cpu_info_text = self.default_font.render("{}x {} {} CPUs".format(self.cpu_sockets, self.cpu_vendor, self.cpu_model), True, self.fg_color, self.bg_color)
-        self.image.blit(surf_cpu_info_text, (self.screen_width - surf_cpu_info_text.get_width() - self.screen_margin, current_y))
+        image.blit(surf_cpu_info_text, (self.screen_width - surf_cpu_info_text.get_width() - self.screen_margin, current_y))
         self.surf_cpu_graph_width = self.screen_width - surf_cpu_info_text.get_width() - surf_cpu_information_title.get_width() - column_spacer*2 - self.screen_margin*2
 
         if len(self.cpu_average_load) > 0:
@@ -466,7 +475,7 @@ class SystemInfo(FullScreenPlugin, metaclass=Singleton):
 
         temp_y = current_y + self.small_graph_height + self.line_buffer_small
         current_y += self.small_graph_height + self.line_buffer_small
-        self.image.blit(surf_avg_cpu, (self.surf_cpu_graph_start, current_y))
+        image.blit(surf_avg_cpu, (self.surf_cpu_graph_start, current_y))
 
         temp = -1
         if len(self.cpu_temp) > 0:
@@ -477,7 +486,7 @@ class SystemInfo(FullScreenPlugin, metaclass=Singleton):
 
         surf_cpu_temp = self.default_font.render("Temp: {}".format(temp), True, self.fg_color, self.bg_color)
 
-        self.image.blit(surf_cpu_temp, (self.surf_cpu_graph_start + self.surf_cpu_graph_width - surf_cpu_temp.get_width(), temp_y))
+        image.blit(surf_cpu_temp, (self.surf_cpu_graph_start + self.surf_cpu_graph_width - surf_cpu_temp.get_width(), temp_y))
 
         current_y += self.default_font.get_linesize() + self.line_buffer
 
@@ -486,7 +495,7 @@ class SystemInfo(FullScreenPlugin, metaclass=Singleton):
 
         texts = []
         for i in range(len(self.cpu_stats)): texts.append("CPU {}".format(i))
-        max_width = self.blit_column("", texts, x, current_y, all_headers=True, align="left", max_chars=5)
+        max_width = self.blit_column(image, "", texts, x, current_y, all_headers=True, align="left", max_chars=5)
 
         # Leave room for the graphs
         self.cpus_graph_start_x = max_width + column_spacer + self.screen_margin
@@ -497,54 +506,56 @@ class SystemInfo(FullScreenPlugin, metaclass=Singleton):
         texts = []
         for i in range(len(self.cpu_stats)): texts.append("{:.1f}%".format(self.cpu_stats[i].nice))
         # %s here can be max 5 chars ... ##.#% . So whichever is longer between the header and 5, set max_chars to that
-        max_width = self.blit_column("nice", texts, x, current_y, align="center", max_chars=5)
+        max_width = self.blit_column(image, "nice", texts, x, current_y, align="center", max_chars=5)
         x += x_step
 
         texts = []
         for i in range(len(self.cpu_stats)): texts.append("{:.1f}%".format(self.cpu_stats[i].system))
-        max_width = self.blit_column("system", texts, x, current_y, align="center", max_chars=6)
+        max_width = self.blit_column(image, "system", texts, x, current_y, align="center", max_chars=6)
         x += x_step
 
         texts = []
         for i in range(len(self.cpu_stats)): texts.append("{:.1f}%".format(self.cpu_stats[i].idle))
-        max_width = self.blit_column("idle", texts, x, current_y, align="center", max_chars=5)
+        max_width = self.blit_column(image, "idle", texts, x, current_y, align="center", max_chars=5)
         x += x_step
 
         texts = []
         for i in range(len(self.cpu_stats)): texts.append("{:.1f}%".format(self.cpu_stats[i].iowait))
-        max_width = self.blit_column("iowait", texts, x, current_y, align="center", max_chars=6)
+        max_width = self.blit_column(image, "iowait", texts, x, current_y, align="center", max_chars=6)
         x += x_step
 
         texts = []
         for i in range(len(self.cpu_stats)): texts.append("{:.1f}%".format(self.cpu_stats[i].irq))
-        max_width = self.blit_column("irq", texts, x, current_y, align="center", max_chars=5)
+        max_width = self.blit_column(image, "irq", texts, x, current_y, align="center", max_chars=5)
         x += x_step
 
         texts = []
         for i in range(len(self.cpu_stats)): texts.append("{:.1f}%".format(self.cpu_stats[i].softirq))
-        max_width = self.blit_column("softirq", texts, x, current_y, align="center", max_chars=7)
+        max_width = self.blit_column(image, "softirq", texts, x, current_y, align="center", max_chars=7)
         x += x_step
 
         texts = []
         for i in range(len(self.cpu_stats)): texts.append("{:.1f}%".format(self.cpu_stats[i].steal))
-        max_width = self.blit_column("steal", texts, x, current_y, align="center", max_chars=5)
+        max_width = self.blit_column(image, "steal", texts, x, current_y, align="center", max_chars=5)
         x += x_step
 
         texts = []
         for i in range(len(self.cpu_stats)): texts.append("{}%".format(self.cpu_stats[i].guest))
-        max_width = self.blit_column("guest", texts, x, current_y, align="center", max_chars=5)
+        max_width = self.blit_column(image, "guest", texts, x, current_y, align="center", max_chars=5)
         x += x_step
 
         texts = []
         for i in range(len(self.cpu_stats)): texts.append("{}%".format(self.cpu_stats[i].guest_nice))
-        max_width = self.blit_column("guest nice", texts, x, current_y, align="center", max_chars=10)
+        max_width = self.blit_column(image, "guest nice", texts, x, current_y, align="center", max_chars=10)
+
+        yield
 
         # MEMORY
         current_y += len(self.cpu_stats) * self.header_font.get_linesize() + self.line_buffer + 30
-        self.image.blit(surf_memory_information_title, (self.screen_margin, current_y))
+        image.blit(surf_memory_information_title, (self.screen_margin, current_y))
 
         # Memory usage graph
-        surf_memory_usage = pygame.Surface((self.screen_width/2 - surf_memory_information_title.get_width() - column_spacer*2 - self.screen_margin, self.small_graph_height))
+        surf_memory_usage = self.surfaces.new((self.screen_width/2 - surf_memory_information_title.get_width() - column_spacer*2 - self.screen_margin, self.small_graph_height))
         surf_memory_usage.fill(self.bg_color)
         memory_usage_width = self.memory_info.percent / 100 * self.small_graph_width
         pygame.draw.rect(surf_memory_usage, self.bargraph_color, (0, 0, memory_usage_width, surf_memory_usage.get_height()))
@@ -555,13 +566,13 @@ class SystemInfo(FullScreenPlugin, metaclass=Singleton):
         pygame.draw.rect(surf_memory_usage, self.bargraph_border_color,
                          (0, 0, surf_memory_usage.get_width(), surf_memory_usage.get_height()), 1)
         memory_usage_graph_x = surf_memory_information_title.get_width() + column_spacer + self.screen_margin
-        self.image.blit(surf_memory_usage, (memory_usage_graph_x, current_y + self.header_font.get_height() / 2 - surf_memory_usage.get_height() / 2))
+        image.blit(surf_memory_usage, (memory_usage_graph_x, current_y + self.header_font.get_height() / 2 - surf_memory_usage.get_height() / 2))
 
         surf_swap_information_title = self.header_font.render("Swap", True, self.fg_color, self.bg_color)
-        self.image.blit(surf_swap_information_title, (self.screen_width/2, current_y))
+        image.blit(surf_swap_information_title, (self.screen_width/2, current_y))
 
         # Swap usage graph
-        surf_swap_usage = pygame.Surface((self.screen_width/2 - surf_swap_information_title.get_width() - column_spacer*2 - self.screen_margin, self.small_graph_height))
+        surf_swap_usage = self.surfaces.new((self.screen_width/2 - surf_swap_information_title.get_width() - column_spacer*2 - self.screen_margin, self.small_graph_height))
         surf_swap_usage.fill(self.bg_color)
         swap_usage_width = self.memory_swap_info.percent / 100 * self.small_graph_width
         pygame.draw.rect(surf_swap_usage, self.bargraph_color,
@@ -574,7 +585,7 @@ class SystemInfo(FullScreenPlugin, metaclass=Singleton):
                          (0, 0, surf_swap_usage.get_width(), surf_swap_usage.get_height()), 1)
 
         swap_usage_graph_x = self.screen_width/2 + surf_swap_information_title.get_width() + column_spacer
-        self.image.blit(surf_swap_usage, (swap_usage_graph_x,
+        image.blit(surf_swap_usage, (swap_usage_graph_x,
                                           current_y + self.header_font.get_height() / 2 - surf_swap_usage.get_height() / 2))
 
         current_y += self.header_font.get_height() / 2 - surf_swap_usage.get_height() / 2 + surf_swap_usage.get_height() + self.line_buffer_small
@@ -585,37 +596,39 @@ class SystemInfo(FullScreenPlugin, metaclass=Singleton):
                     self.helper.convert_size(self.memory_info.available)
                 ), True, self.fg_color, self.bg_color)
 
-        self.image.blit(surf, (memory_usage_graph_x, current_y))
+        image.blit(surf, (memory_usage_graph_x, current_y))
 
         surf = self.default_font.render("{} used / {} total / {} avail".format(
             self.helper.convert_size(self.memory_swap_info.used),
             self.helper.convert_size(self.memory_swap_info.total),
             self.helper.convert_size(self.memory_swap_info.free)
         ), True, self.fg_color, self.bg_color)
-        self.image.blit(surf, (swap_usage_graph_x, current_y))
+        image.blit(surf, (swap_usage_graph_x, current_y))
 
         current_y += self.line_buffer + surf.get_height()
         x = self.screen_margin
         x_step = (self.screen_width/2) / 3
-        max_width = self.blit_column(None, ["active", "inactive"], x, current_y, align="left", max_chars=8)
-        max_width += self.blit_column(None, [self.helper.convert_size(self.memory_info.active), self.helper.convert_size(self.memory_info.inactive)], x + max_width + column_spacer, current_y, align="left", max_chars=8)
+        max_width = self.blit_column(image, None, ["active", "inactive"], x, current_y, align="left", max_chars=8)
+        max_width += self.blit_column(image, None, [self.helper.convert_size(self.memory_info.active), self.helper.convert_size(self.memory_info.inactive)], x + max_width + column_spacer, current_y, align="left", max_chars=8)
         x += x_step
-        max_width = self.blit_column(None, ["cached", "buffers"], x, current_y, align="left", max_chars=8)
-        max_width += self.blit_column(None, [self.helper.convert_size(self.memory_info.cached), self.helper.convert_size(self.memory_info.buffers)], x + max_width + column_spacer, current_y, align="left", max_chars=8)
+        max_width = self.blit_column(image, None, ["cached", "buffers"], x, current_y, align="left", max_chars=8)
+        max_width += self.blit_column(image, None, [self.helper.convert_size(self.memory_info.cached), self.helper.convert_size(self.memory_info.buffers)], x + max_width + column_spacer, current_y, align="left", max_chars=8)
         x += x_step
-        max_width = self.blit_column(None, ["shared", "slab"], x, current_y, align="left", max_chars=8)
-        max_width += self.blit_column(None, [self.helper.convert_size(self.memory_info.shared), self.helper.convert_size(self.memory_info.slab)], x + max_width + column_spacer, current_y, align="left", max_chars=8)
+        max_width = self.blit_column(image, None, ["shared", "slab"], x, current_y, align="left", max_chars=8)
+        max_width += self.blit_column(image, None, [self.helper.convert_size(self.memory_info.shared), self.helper.convert_size(self.memory_info.slab)], x + max_width + column_spacer, current_y, align="left", max_chars=8)
         x += x_step
 
         x = self.screen_width/2
-        max_width = self.blit_column(None, ["sin", "sout"], x, current_y, align="left", max_chars=8)
-        max_width += self.blit_column(None, [self.helper.convert_size(self.memory_swap_info.sin), self.helper.convert_size(self.memory_swap_info.sout)], x + max_width + column_spacer, current_y, align="left", max_chars=8)
+        max_width = self.blit_column(image, None, ["sin", "sout"], x, current_y, align="left", max_chars=8)
+        max_width += self.blit_column(image, None, [self.helper.convert_size(self.memory_swap_info.sin), self.helper.convert_size(self.memory_swap_info.sout)], x + max_width + column_spacer, current_y, align="left", max_chars=8)
 
         current_y += self.default_font.get_linesize()*2 + self.line_buffer_small + self.line_buffer
 
+        yield
+
         # DISKS
-        self.image.blit(surf_disk_information_title, (self.screen_margin, current_y))
-        pygame.draw.line(self.image, self.fg_color, (surf_disk_information_title.get_width() + column_spacer, current_y + surf_disk_information_title.get_height()/2),
+        image.blit(surf_disk_information_title, (self.screen_margin, current_y))
+        pygame.draw.line(image, self.fg_color, (surf_disk_information_title.get_width() + column_spacer, current_y + surf_disk_information_title.get_height()/2),
                          (self.screen_width - column_spacer, current_y + surf_disk_information_title.get_height()/2))
 
         current_y += surf_disk_information_title.get_height() + self.line_buffer
@@ -623,17 +636,17 @@ class SystemInfo(FullScreenPlugin, metaclass=Singleton):
         x = self.screen_margin
         texts = []
         for i in self.disk_mounts: texts.append(i.mountpoint)
-        max_width = self.blit_column("Mount Point", texts, x, current_y, align="left", max_chars=8)
+        max_width = self.blit_column(image, "Mount Point", texts, x, current_y, align="left", max_chars=8)
 
         x += max_width + column_spacer
         texts = []
         for i in self.disk_mounts: texts.append(i.device)
-        max_width = self.blit_column("Device", texts, x, current_y, align="left", max_chars=8)
+        max_width = self.blit_column(image, "Device", texts, x, current_y, align="left", max_chars=8)
 
         x += max_width + column_spacer
         texts = []
         for i in self.disk_mounts: texts.append(i.fstype)
-        max_width = self.blit_column("Type", texts, x, current_y, align="left", max_chars=8)
+        max_width = self.blit_column(image, "Type", texts, x, current_y, align="left", max_chars=8)
 
         x += max_width + column_spacer
 
@@ -642,7 +655,7 @@ class SystemInfo(FullScreenPlugin, metaclass=Singleton):
         # self.disk_usage.append({"mountpoint": i.mountpoint, "usage": psutil.disk_usage(i.mountpoint)})
         # sdiskusage(total=31207583744, used=2092957696, free=27812663296, percent=7.0)
         for i in self.disk_mounts:
-            surf = pygame.Surface((self.small_graph_width_small, self.small_graph_height))
+            surf = self.surfaces.new((self.small_graph_width_small, self.small_graph_height))
             surf.fill(self.bg_color)
             du = None
             for j in self.disk_usage:
@@ -657,7 +670,7 @@ class SystemInfo(FullScreenPlugin, metaclass=Singleton):
                 surf.blit(surf_disk_usage_text, (surf.get_width() / 2 - surf_disk_usage_text.get_width() / 2,
                                                  surf.get_height() / 2 - surf_disk_usage_text.get_height() / 2))
                 pygame.draw.rect(surf, self.bargraph_border_color, (0, 0, surf.get_width(), surf.get_height()), 1)
-                self.image.blit(surf, (x, current_y + y + 1))
+                image.blit(surf, (x, current_y + y + 1))
                 y += self.line_buffer_small + surf.get_height()
 
         x += self.small_graph_width_small + column_spacer
@@ -667,12 +680,14 @@ class SystemInfo(FullScreenPlugin, metaclass=Singleton):
                 if j["mountpoint"] == i.mountpoint:
                     texts.append("{} used / {} total / {} avail".format(self.helper.convert_size(j["usage"].used), self.helper.convert_size(j["usage"].total), self.helper.convert_size(j["usage"].free)))
                     break
-        max_width = self.blit_column("", texts, x, current_y, align="left", max_chars=8)
+        max_width = self.blit_column(image, "", texts, x, current_y, align="left", max_chars=8)
 
         tmp_current_y = current_y + (self.default_font.get_linesize() + self.line_buffer_small) * len(self.disk_mounts) + self.line_buffer + self.header_font.get_height() + self.line_buffer_small
 
         current_y = tmp_current_y + self.header_font.get_height() + self.line_buffer_small
 
+        yield
+
         # DEVICES
         # disk_io_counters
         x = self.screen_margin
@@ -682,18 +697,18 @@ class SystemInfo(FullScreenPlugin, metaclass=Singleton):
             if i[:4] == "loop" or i[:3] == "ram":
                 continue
             texts.append(i)
-        max_width = self.blit_column("Device", texts, x, current_y, align="left", max_chars=8)
+        max_width = self.blit_column(image, "Device", texts, x, current_y, align="left", max_chars=8)
 
         header_section_width = self.screen_width - max_width - x_step
         header_x_step = header_section_width / 4
         surf = self.header_font.render("Bytes", True, self.fg_color, self.bg_color)
-        self.image.blit(surf, (max_width + header_x_step/2 - surf.get_width()/2, tmp_current_y))
+        image.blit(surf, (max_width + header_x_step/2 - surf.get_width()/2, tmp_current_y))
         surf = self.header_font.render("Count", True, self.fg_color, self.bg_color)
-        self.image.blit(surf, (max_width + header_x_step/2 - surf.get_width()/2 + header_x_step, tmp_current_y))
+        image.blit(surf, (max_width + header_x_step/2 - surf.get_width()/2 + header_x_step, tmp_current_y))
         surf = self.header_font.render("Merged Count", True, self.fg_color, self.bg_color)
-        self.image.blit(surf, (max_width + header_x_step/2 - surf.get_width()/2 + header_x_step*2, tmp_current_y))
+        image.blit(surf, (max_width + header_x_step/2 - surf.get_width()/2 + header_x_step*2, tmp_current_y))
         surf = self.header_font.render("Time", True, self.fg_color, self.bg_color)
-        self.image.blit(surf, (max_width + header_x_step/2 - surf.get_width()/2 + header_x_step*3, tmp_current_y))
+        image.blit(surf, (max_width + header_x_step/2 - surf.get_width()/2 + header_x_step*3, tmp_current_y))
 
         x += x_step
         texts = []
@@ -701,7 +716,7 @@ class SystemInfo(FullScreenPlugin, metaclass=Singleton):
             if i[:4] == "loop" or i[:3] == "ram":
                 continue
             texts.append(self.helper.convert_size(self.disk_io_counters[i].read_bytes))
-        max_width = self.blit_column("Read", texts, x, current_y, align="left", max_chars=8)
+        max_width = self.blit_column(image, "Read", texts, x, current_y, align="left", max_chars=8)
 
         x += x_step
         texts = []
@@ -709,7 +724,7 @@ class SystemInfo(FullScreenPlugin, metaclass=Singleton):
             if i[:4] == "loop" or i[:3] == "ram":
                 continue
             texts.append(self.helper.convert_size(self.disk_io_counters[i].write_bytes))
-        max_width = self.blit_column("Write", texts, x, current_y, align="left", max_chars=8)
+        max_width = self.blit_column(image, "Write", texts, x, current_y, align="left", max_chars=8)
 
         x += x_step
         texts = []
@@ -717,7 +732,7 @@ class SystemInfo(FullScreenPlugin, metaclass=Singleton):
             if i[:4] == "loop" or i[:3] == "ram":
                 continue
             texts.append(str(self.disk_io_counters[i].read_count))
-        max_width = self.blit_column("Read", texts, x, current_y, align="left", max_chars=8)
+        max_width = self.blit_column(image, "Read", texts, x, current_y, align="left", max_chars=8)
 
         x += x_step
         texts = []
@@ -725,7 +740,7 @@ class SystemInfo(FullScreenPlugin, metaclass=Singleton):
             if i[:4] == "loop" or i[:3] == "ram":
                 continue
             texts.append(str(self.disk_io_counters[i].write_count))
-        max_width = self.blit_column("Write", texts, x, current_y, align="left", max_chars=8)
+        max_width = self.blit_column(image, "Write", texts, x, current_y, align="left", max_chars=8)
 
         x += x_step
         texts = []
@@ -733,7 +748,7 @@ class SystemInfo(FullScreenPlugin, metaclass=Singleton):
             if i[:4] == "loop" or i[:3] == "ram":
                 continue
             texts.append(str(self.disk_io_counters[i].read_merged_count))
-        max_width = self.blit_column("Read", texts, x, current_y, align="left", max_chars=8)
+        max_width = self.blit_column(image, "Read", texts, x, current_y, align="left", max_chars=8)
 
         x += x_step
         texts = []
@@ -741,7 +756,7 @@ class SystemInfo(FullScreenPlugin, metaclass=Singleton):
             if i[:4] == "loop" or i[:3] == "ram":
                 continue
             texts.append(str(self.disk_io_counters[i].write_merged_count))
-        max_width = self.blit_column("Write", texts, x, current_y, align="left", max_chars=8)
+        max_width = self.blit_column(image, "Write", texts, x, current_y, align="left", max_chars=8)
 
         x += x_step
         texts = []
@@ -749,7 +764,7 @@ class SystemInfo(FullScreenPlugin, metaclass=Singleton):
             if i[:4] == "loop" or i[:3] == "ram":
                 continue
             texts.append(str(self.disk_io_counters[i].read_time))
-        max_width = self.blit_column("Read", texts, x, current_y, align="left", max_chars=8)
+        max_width = self.blit_column(image, "Read", texts, x, current_y, align="left", max_chars=8)
 
         x += x_step
         texts = []
@@ -757,7 +772,7 @@ class SystemInfo(FullScreenPlugin, metaclass=Singleton):
             if i[:4] == "loop" or i[:3] == "ram":
                 continue
             texts.append(str(self.disk_io_counters[i].write_time))
-        max_width = self.blit_column("Write", texts, x, current_y, align="left", max_chars=8)
+        max_width = self.blit_column(image, "Write", texts, x, current_y, align="left", max_chars=8)
 
         x += x_step
         texts = []
@@ -765,13 +780,15 @@ class SystemInfo(FullScreenPlugin, metaclass=Singleton):
             if i[:4] == "loop" or i[:3] == "ram":
                 continue
             texts.append(str(self.disk_io_counters[i].busy_time))
-        max_width = self.blit_column("Busy Time", texts, x, current_y, align="left", max_chars=8)
+        max_width = self.blit_column(image, "Busy Time", texts, x, current_y, align="left", max_chars=8)
 
         current_y += len(texts)*(self.line_buffer_small + self.default_font.get_height()) + self.line_buffer_small*2 + self.header_font.get_height()*2
 
+        yield
+
         # NETWORK
-        self.image.blit(surf_network_information_title, (self.screen_margin, current_y))
-        pygame.draw.line(self.image, self.fg_color, (surf_network_information_title.get_width() + column_spacer,
+        image.blit(surf_network_information_title, (self.screen_margin, current_y))
+        pygame.draw.line(image, self.fg_color, (surf_network_information_title.get_width() + column_spacer,
                                                      current_y + surf_network_information_title.get_height() / 2),
                          (self.screen_width - column_spacer, current_y + surf_network_information_title.get_height() / 2))
 
@@ -790,7 +807,7 @@ class SystemInfo(FullScreenPlugin, metaclass=Singleton):
                         texts.append("")
                         has_ipv6.update({i: True})
 
-        max_width = self.blit_column("Device", texts, x, current_y, align="left", max_chars=8)
+        max_width = self.blit_column(image, "Device", texts, x, current_y, align="left", max_chars=8)
 
         x += max_width + column_spacer
         texts = []
@@ -802,7 +819,7 @@ class SystemInfo(FullScreenPlugin, metaclass=Singleton):
                     texts.append(j.address)
             if i in has_ipv6:
                 texts.append("")
-        max_width = self.blit_column("MAC Address", texts, x, current_y, align="left", max_chars=8)
+        max_width = self.blit_column(image, "MAC Address", texts, x, current_y, align="left", max_chars=8)
 
         x += max_width + column_spacer
         ip_texts = []
@@ -824,7 +841,7 @@ class SystemInfo(FullScreenPlugin, metaclass=Singleton):
                 ip_texts.append("")
             if ipv6_address != "":
                 ip_texts.append("{}".format(ipv6_address))
-            max_width = self.blit_column("IP Address", ip_texts, x, current_y, align="left", max_chars=8)
+            max_width = self.blit_column(image, "IP Address", ip_texts, x, current_y, align="left", max_chars=8)
 
         x += max_width + column_spacer
         x_step = (self.screen_width - x - self.screen_margin) / 8
@@ -838,7 +855,7 @@ class SystemInfo(FullScreenPlugin, metaclass=Singleton):
                 if i in has_ipv6:
                     texts.append("")
 
-        max_width = self.blit_column("Sent", texts, x, current_y, align="left", max_chars=8)
+        max_width = self.blit_column(image, "Sent", texts, x, current_y, align="left", max_chars=8)
         x += x_step
         texts = []
         for i in self.networking_nics:
@@ -848,7 +865,7 @@ class SystemInfo(FullScreenPlugin, metaclass=Singleton):
                 texts.append(self.helper.convert_size(self.networking_nic_stats[i].bytes_recv))
                 if i in has_ipv6:
                     texts.append("")
-        max_width = self.blit_column("Recv", texts, x, current_y, align="left", max_chars=8)
+        max_width = self.blit_column(image, "Recv", texts, x, current_y, align="left", max_chars=8)
         x += x_step
         texts = []
         for i in self.networking_nics:
@@ -858,7 +875,7 @@ class SystemInfo(FullScreenPlugin, metaclass=Singleton):
                 texts.append(str(self.networking_nic_stats[i].packets_sent))
                 if i in has_ipv6:
                     texts.append("")
-        max_width = self.blit_column("Sent", texts, x, current_y, align="left", max_chars=8)
+        max_width = self.blit_column(image, "Sent", texts, x, current_y, align="left", max_chars=8)
         x += x_step
         texts = []
         for i in self.networking_nics:
@@ -868,7 +885,7 @@ class SystemInfo(FullScreenPlugin, metaclass=Singleton):
                 texts.append(str(self.networking_nic_stats[i].packets_recv))
                 if i in has_ipv6:
                     texts.append("")
-        max_width = self.blit_column("Recv", texts, x, current_y, align="left", max_chars=8)
+        max_width = self.blit_column(image, "Recv", texts, x, current_y, align="left", max_chars=8)
         x += x_step
         texts = []
         for i in self.networking_nics:
@@ -878,7 +895,7 @@ class SystemInfo(FullScreenPlugin, metaclass=Singleton):
                 texts.append(str(self.networking_nic_stats[i].errin))
                 if i in has_ipv6:
                     texts.append("")
-        max_width = self.blit_column("Err in", texts, x, current_y, align="left", max_chars=8)
+        max_width = self.blit_column(image, "Err in", texts, x, current_y, align="left", max_chars=8)
         x += x_step
         texts = []
         for i in self.networking_nics:
@@ -888,7 +905,7 @@ class SystemInfo(FullScreenPlugin, metaclass=Singleton):
                 texts.append(str(self.networking_nic_stats[i].errout))
                 if i in has_ipv6:
                     texts.append("")
-        max_width = self.blit_column("Err Out", texts, x, current_y, align="left", max_chars=8)
+        max_width = self.blit_column(image, "Err Out", texts, x, current_y, align="left", max_chars=8)
         x += x_step
         texts = []
         for i in self.networking_nics:
@@ -898,7 +915,7 @@ class SystemInfo(FullScreenPlugin, metaclass=Singleton):
                 texts.append(str(self.networking_nic_stats[i].dropin))
                 if i in has_ipv6:
                     texts.append("")
-        max_width = self.blit_column("Drop in", texts, x, current_y, align="left", max_chars=8)
+        max_width = self.blit_column(image, "Drop in", texts, x, current_y, align="left", max_chars=8)
         x += x_step
         texts = []
         for i in self.networking_nics:
@@ -908,29 +925,29 @@ class SystemInfo(FullScreenPlugin, metaclass=Singleton):
                 texts.append(str(self.networking_nic_stats[i].dropout))
                 if i in has_ipv6:
                     texts.append("")
-        max_width = self.blit_column("Drop Out", texts, x, current_y, align="left", max_chars=8)
+        max_width = self.blit_column(image, "Drop Out", texts, x, current_y, align="left", max_chars=8)
 
-    def blit_column(self, header_text, texts, start_x, start_y, max_chars, all_headers=False, align="left"):
+    def blit_column(self, image, header_text, texts, start_x, start_y, max_chars, all_headers=False, align="left"):
         max_width = 0
         y = 0
         align_txt = "{:^" + str(max_chars) + "}"
         header_surf = None
         if header_text is not None:
             if align == "center":
-                header_surf = self.header_font.render(align_txt.format(header_text), True, self.fg_color, self.bg_color)
+                header_surf = self.helper.render_text(self.header_font, align_txt.format(header_text), True, self.fg_color, self.bg_color)
             else:
-                header_surf = self.header_font.render(header_text, True, self.fg_color, self.bg_color)
+                header_surf = self.helper.render_text(self.header_font, header_text, True, self.fg_color, self.bg_color)
 
-            self.image.blit(header_surf, (start_x, start_y + y))
+            image.blit(header_surf, (start_x, start_y + y))
             y += self.header_font.get_linesize() + self.line_buffer_small
             if max_width < header_surf.get_width():
                 max_width = header_surf.get_width()
 
         for i in range(len(texts)):
             if all_headers:
-                surf = self.header_font.render(texts[i], True, self.fg_color, self.bg_color)
+                surf = self.helper.render_text(self.header_font, texts[i], True, self.fg_color, self.bg_color)
             else:
-                surf = self.default_font.render(texts[i], True, self.fg_color, self.bg_color)
+                surf = self.helper.render_text(self.default_font, texts[i], True, self.fg_color, self.bg_color)
 
             if max_width < surf.get_width():
                 max_width = surf.get_width()
@@ -941,7 +958,7 @@ class SystemInfo(FullScreenPlugin, metaclass=Singleton):
                 x = start_x
             else:
                 x = start_x
-            self.image.blit(surf, (x, start_y + y))
+            image.blit(surf, (x, start_y + y))
             if all_headers:
                 y += self.header_font.get_linesize() + self.line_buffer_small
             else:
@@ -949,46 +966,82 @@ class SystemInfo(FullScreenPlugin, metaclass=Singleton):
 
         return max_width
 
+    def render_image(self, image):
+        image.fill(self.bg_color)
+        yield from self.update_image(image)
+        self.update_image_light(image)
+
+    def swap_image(self):
+        self.image, self.back_image = self.back_image, self.image
+        self.image_changed = True
+
     def update(self, tick, fps):
         if self.info_updated:
-            self.image.fill(self.bg_color)
-            self.update_image()
-            self.update_image_light()
+            if self.back_image is None:
+                self.back_image = self.surfaces.new((self.screen_width, self.screen_height))
+            self.render_incrementally(self.render_image(self.back_image), self.swap_image)
             self.info_updated = False
             self.info_updated_light = False
-        elif self.info_updated_light:
-            self.update_image_light()
+        elif self.info_updated_light and not self.is_rendering():
+            # While the page is being redrawn, this waits for the new layout
+            self.update_image_light(self.image)
             self.info_updated_light = False
-
-        if tick == 1:
-            if self.timer == self.update_interval:
-                self.update_systeminfo()
-                self.timer = 0
+            self.image_changed = True
+
+        # Going by the clock, since wake ups (new info, a finished render) make for extra updates. Half a frame early
+        #    still counts, as updates don't land exactly on the second.
+        now = self.clock.time()
+        early = 0.5 / fps
+        if now - self.last_refresh >= self.update_interval - early:
+            self.update_systeminfo()
+            self.last_refresh = now
+        if now - self.last_light_refresh >= 1 - early:
             self.update_systeminfo_light()
-            self.timer += 1
-        else:
-            self.canvas.blit(self.image, (0, 0))
+            self.last_light_refresh = now
+
+        self.canvas.blit(self.image, (0, 0))
+        if self.image_changed:
+            self.image_changed = False
+            self.mark_dirty()
+
+    def prewarm(self):
+        # Collect everything up front so the first frame isn't an empty page
+        if self.jobs.run("SystemInfo", self.update_systeminfo_thread):
+            self.last_refresh = self.clock.time()
+        if self.jobs.run("SystemInfo.light", self.update_systeminfo_light_thread):
+            self.last_light_refresh = self.clock.time()
+
+    def get_memory_size(self):
+        return self.helper.get_surface_size(self.image) + self.helper.get_surface_size(self.back_image)
+
+    def suspend(self):
+        self.cancel_render()
+        self.image = None
+        self.back_image = None
+
+    def resume(self):
+        self.image = self.surfaces.new((self.screen_width, self.screen_height))
+        self.image.fill(self.bg_color)
+        # Redraw from the last info we collected
+        if self.system_hostname:
+            self.info_updated = True
+
+    def next_wakeup(self, last_update):
+        # Redraw as soon as one of the worker threads has published new info
+        if self.info_updated or (self.info_updated_light and not self.is_rendering()):
+            return last_update
+        return None
 
     def update_systeminfo(self):
-        if not self.in_systeminfo_thread:
-            thread_timer = threading.Thread(target=self.update_systeminfo_thread, args=([]))
-            thread_timer.daemon = False
-            thread_timer.start()
+        self.jobs.submit("SystemInfo", self.update_systeminfo_thread)
 
     def update_systeminfo_thread(self):
-        self.in_systeminfo_thread = True
         self.get_info()
         self.info_updated = True
-        self.in_systeminfo_thread = False
 
     def update_systeminfo_light(self):
-        if not self.in_systeminfo_light_thread:
-            thread_timer = threading.Thread(target=self.update_systeminfo_light_thread, args=([]))
-            thread_timer.daemon = False
-            thread_timer.start()
+        self.jobs.submit("SystemInfo.light", self.update_systeminfo_light_thread)
 
     def update_systeminfo_light_thread(self):
-        self.in_systeminfo_light_thread = True
         self.get_info_light()
         self.info_updated_light = True
-        self.in_systeminfo_light_thread = False
@@ -7,14 +7,13 @@ import os
 
 import pygame
 import yfinance
-import requests
-import time
-import threading
+import functools
 import locale
 import queue
 
 from pygame.sprite import DirtySprite
 
+from lib import fonts
 from lib.widget_plugin import WidgetPlugin
 
 
@@ -26,7 +25,6 @@ class Ticker(DirtySprite, WidgetPlugin):
 
         self.tickers_info = {}
         self.ticker_surfaces = []
-        self.timer = -1
         self.tickers_updated = False
 
         self.pos_x = 0
@@ -34,31 +32,26 @@ class Ticker(DirtySprite, WidgetPlugin):
 
         self.helper.log(self.debug, "Ticker: {} x {}".format(self.screen_width, self.screen_height))
 
-        font_size = 1
         self.ticker_border_size = 1
         margin = 2
-        self.font = pygame.font.SysFont(self.plugin_config["default_font_face"], font_size)
-        while self.font.size("XXXX")[1] + (self.ticker_border_size+margin)*2 < self.screen_height:
-            font_size += 1
-            self.font = pygame.font.SysFont(self.plugin_config["default_font_face"], font_size)
-
-        font_size -= 1
-        self.font = pygame.font.SysFont(self.plugin_config["default_font_face"], font_size)
+        font_size = fonts.get_fitted_font_size(self.plugin_config["default_font_face"], "XXXX",
+                                               max_height=self.screen_height - (self.ticker_border_size+margin)*2)
+        self.font = fonts.get_font(self.plugin_config["default_font_face"], font_size)
 
         self.helper.log(self.debug, "set font size to {}".format(font_size))
 
         self.helper.log(self.debug, "Found a font size of {}".format(font_size))
         self.border_brighten_amount = 32
 
-        self.background = eval(self.plugin_config["background"])
-        self.foreground = eval(self.plugin_config["foreground"])
-        self.down_background = eval(self.plugin_config["down_background"])
-        self.down_foreground = eval(self.plugin_config["down_foreground"])
-        self.up_background = eval(self.plugin_config["up_background"])
-        self.up_foreground = eval(self.plugin_config["up_foreground"])
+        self.background = self.plugin_config.getcolor("background")
+        self.foreground = self.plugin_config.getcolor("foreground")
+        self.down_background = self.plugin_config.getcolor("down_background")
+        self.down_foreground = self.plugin_config.getcolor("down_foreground")
+        self.up_background = self.plugin_config.getcolor("up_background")
+        self.up_foreground = self.plugin_config.getcolor("up_foreground")
         self.speed = self.plugin_config.getint("speed")
         self.update_interval = self.plugin_config.getint("update_interval")
-        self.tickers = eval(self.plugin_config["tickers"])
+        self.tickers = self.plugin_config.getlist("tickers")
 
         self.queue = queue.Queue()
 
@@ -102,7 +95,7 @@ class Ticker(DirtySprite, WidgetPlugin):
                     current_price = -1.0
 
                 surf_ticker_text = self.font.render("{} {:.2f}".format(self.tickers_info[i]["symbol"], float(current_price)), True, fg_color)
-                surf_ticker = pygame.Surface((self.ticker_buffer + surf_ticker_text.get_width(), self.screen_height))
+                surf_ticker = self.surfaces.new((self.ticker_buffer + surf_ticker_text.get_width(), self.screen_height))
     
                 surf_ticker.fill(bg_color)
 
@@ -126,9 +119,7 @@ class Ticker(DirtySprite, WidgetPlugin):
                 self.ticker_surfaces.append(surf_ticker)
 
     def update(self, tick, fps):
-        if int(time.time() * 1000) - self.timer > self.update_interval * 1000 * 60:
-            self.refresh_tickers()
-            self.timer = int(time.time() * 1000)
+        self.refresh_tickers()
 
         if self.tickers_updated:
             self.tickers_updated = False
@@ -163,13 +154,12 @@ class Ticker(DirtySprite, WidgetPlugin):
         self.pos_x -= self.speed
 
     def download_ticker(self, ticker):
-        thread_timer = threading.Thread(target=self.get_ticker_thread, args=([ticker]))
-        thread_timer.daemon = False
-        thread_timer.start()
+        """ Queues a refresh of one ticker if it's due """
+        self.jobs.schedule("{}.{}".format(self.config_section, ticker), functools.partial(self.get_ticker_thread, ticker),
+                           self.update_interval * 60)
 
     def get_ticker_thread(self, ticker):
-        session = requests.Session()
-        session.headers['User-agent'] = 'pidisplay/1.0'
+        session = self.http.session
 
         self.helper.log(self.debug, "getting ticker {}".format(ticker))
         results = yfinance.Ticker(ticker, session=session).info
@@ -1,10 +1,10 @@
-import datetime
 import math
 import os
 
 import pygame
 import pytz
 
+from lib import fonts
 from lib.fullscreen_plugin import FullScreenPlugin
 from lib.plugin import Singleton
 
@@ -16,26 +16,26 @@ class WorldClock(FullScreenPlugin, metaclass=Singleton):
 
     def __init__(self, helper, canvas, app_plugin_config):
         FullScreenPlugin.__init__(self, helper, canvas, os.path.abspath(os.path.dirname(__file__)), app_plugin_config)
-        self.image = canvas.copy()
-        self.bg_color = eval(self.plugin_config["background_color"])
+        self.image = self.surfaces.copy(canvas)
+        self.bg_color = self.plugin_config.getcolor("background_color")
         self.screen_margin = self.plugin_config.getint("screen_margin")
 
-        self.big_clock_bg_color = eval(self.plugin_config["big_clock_bg_color"])
-        self.big_clock_fg_color = eval(self.plugin_config["big_clock_fg_color"])
-        self.big_clock_border_color = eval(self.plugin_config["big_clock_border_color"])
-        self.big_clock_big_hand_color = eval(self.plugin_config["big_clock_big_hand_color"])
-        self.big_clock_small_hand_color = eval(self.plugin_config["big_clock_small_hand_color"])
-        self.big_clock_font = pygame.font.SysFont(self.plugin_config["default_font_face"], self.plugin_config.getint("big_clock_label_size"))
+        self.big_clock_bg_color = self.plugin_config.getcolor("big_clock_bg_color")
+        self.big_clock_fg_color = self.plugin_config.getcolor("big_clock_fg_color")
+        self.big_clock_border_color = self.plugin_config.getcolor("big_clock_border_color")
+        self.big_clock_big_hand_color = self.plugin_config.getcolor("big_clock_big_hand_color")
+        self.big_clock_small_hand_color = self.plugin_config.getcolor("big_clock_small_hand_color")
+        self.big_clock_font = fonts.get_font(self.plugin_config["default_font_face"], self.plugin_config.getint("big_clock_label_size"))
         self.big_clock_show_seconds = self.plugin_config.getboolean("big_clock_show_seconds")
         self.big_clock_hand_width = self.plugin_config.getint("big_clock_hand_width")
         self.big_clock_border_width = self.plugin_config.getint("big_clock_border_width")
 
-        self.small_clock_bg_color = eval(self.plugin_config["small_clock_bg_color"])
-        self.small_clock_fg_color = eval(self.plugin_config["small_clock_fg_color"])
-        self.small_clock_border_color = eval(self.plugin_config["small_clock_border_color"])
-        self.small_clock_big_hand_color = eval(self.plugin_config["small_clock_big_hand_color"])
-        self.small_clock_small_hand_color = eval(self.plugin_config["small_clock_small_hand_color"])
-        self.small_clock_font = pygame.font.SysFont(self.plugin_config["default_font_face"], self.plugin_config.getint("small_clock_label_size"))
+        self.small_clock_bg_color = self.plugin_config.getcolor("small_clock_bg_color")
+        self.small_clock_fg_color = self.plugin_config.getcolor("small_clock_fg_color")
+        self.small_clock_border_color = self.plugin_config.getcolor("small_clock_border_color")
+        self.small_clock_big_hand_color = self.plugin_config.getcolor("small_clock_big_hand_color")
+        self.small_clock_small_hand_color = self.plugin_config.getcolor("small_clock_small_hand_color")
+        self.small_clock_font = fonts.get_font(self.plugin_config["default_font_face"], self.plugin_config.getint("small_clock_label_size"))
         self.small_clock_show_seconds = self.plugin_config.getboolean("small_clock_show_seconds")
         self.small_clock_hand_width = self.plugin_config.getint("small_clock_hand_width")
         self.small_clock_border_width = self.plugin_config.getint("small_clock_border_width")
@@ -46,7 +46,7 @@ class WorldClock(FullScreenPlugin, metaclass=Singleton):
             if param[:5] == "clock":
                 if "clock{}_timezone".format(i) in self.plugin_config:
                     label = self.plugin_config["clock{}_label".format(i)]
-                    timezone = self.plugin_config["clock{}_timezone".format(i)]
+                    timezone = self.plugin_config.gettimezone("clock{}_timezone".format(i))
 
                     self.clocks.append({"label": label, "timezone": timezone})
 
@@ -128,7 +128,12 @@ class WorldClock(FullScreenPlugin, metaclass=Singleton):
                     clock_center_x = clock_cell_width * (i - 2) + (clock_cell_width / 2) + self.screen_margin
                     clock_center_y = self.screen_margin + clock_radius + self.screen_margin + self.small_clock_font.get_height()
 
-            self.clocks[i].update({"center_x": clock_center_x, "center_y": clock_center_y, "radius": clock_radius, "size": size})
+            self.clocks[i].update({"center_x": clock_center_x, "center_y": clock_center_y, "radius": clock_radius, "size": size,
+                                   "rect": pygame.Rect(clock_center_x - clock_radius, clock_center_y - clock_radius,
+                                                       clock_radius * 2, clock_radius * 2).inflate(2, 2)})
+
+        self.last_minute = None
+        self.reports_damage = True
 
         self.draw_clock_outlines()
 
@@ -152,7 +157,7 @@ class WorldClock(FullScreenPlugin, metaclass=Singleton):
         pygame.draw.circle(self.image, clock_bg_color, (int(clock["center_x"]), int(clock["center_y"])), int(clock["radius"]) - clock_border_width)
 
         number_font_size = clock["radius"] / 6
-        number_font = pygame.font.SysFont(self.plugin_config["default_font_face"], int(number_font_size))
+        number_font = fonts.get_font(self.plugin_config["default_font_face"], int(number_font_size))
 
         if colors_type == WorldClock.COLORS_BIG:
             for i in range(1, 61):
@@ -170,7 +175,7 @@ class WorldClock(FullScreenPlugin, metaclass=Singleton):
 
         for i in range(1, 13):
             # Draw the numbers
-            number_font_image = number_font.render(str(i), True, clock_fg_color)
+            number_font_image = self.helper.render_text(number_font, str(i), True, clock_fg_color)
 
             # add a little margin
             number_margin = number_font_image.get_width() / 10
@@ -184,11 +189,11 @@ class WorldClock(FullScreenPlugin, metaclass=Singleton):
         # Draw the label
         if colors_type == WorldClock.COLORS_BIG:
             # Label goes on the bottom
-            surf_label = self.big_clock_font.render(clock["label"], True, clock_fg_color)
+            surf_label = self.helper.render_text(self.big_clock_font, clock["label"], True, clock_fg_color)
             self.image.blit(surf_label, (clock["center_x"] - surf_label.get_width()/2, clock["center_y"] + clock["radius"] + self.screen_margin))
         elif colors_type == WorldClock.COLORS_SMALL:
             # label goes on the top
-            surf_label = self.small_clock_font.render(clock["label"], True, clock_fg_color)
+            surf_label = self.helper.render_text(self.small_clock_font, clock["label"], True, clock_fg_color)
             self.image.blit(surf_label, (clock["center_x"] - surf_label.get_width()/2, clock["center_y"] - clock["radius"] - self.screen_margin - surf_label.get_height()))
 
     def draw_clock_outlines(self):
@@ -213,7 +218,7 @@ class WorldClock(FullScreenPlugin, metaclass=Singleton):
         else:
             raise ValueError("Unknown size in clock object while trying to draw the clock hands. The size was: {}".format(clock["size"]))
 
-        now = pytz.timezone(clock["timezone"]).normalize(datetime.datetime.now(pytz.timezone('UTC')))
+        now = clock["timezone"].normalize(self.clock.now(pytz.utc))
 
         # Hour hand
         hour = now.hour
@@ -260,7 +265,31 @@ class WorldClock(FullScreenPlugin, metaclass=Singleton):
                 # draw the middle dial circles
                 pygame.draw.circle(self.canvas, small_hand_fg_color, (int(clock["center_x"]), int(clock["center_y"])), int(hand_width*1.3))
 
+    def get_memory_size(self):
+        return self.helper.get_surface_size(self.image)
+
+    def suspend(self):
+        self.image = None
+
+    def resume(self):
+        self.image = self.surfaces.copy(self.canvas)
+        self.draw_clock_outlines()
+        self.last_minute = None
+
+    def next_wakeup(self, last_update):
+        # Without a second hand the clocks only change once a minute
+        if self.big_clock_show_seconds or self.small_clock_show_seconds:
+            return None
+        return math.floor(last_update / 60) * 60 + 60
+
     def update(self, tick, fps):
         self.canvas.blit(self.image, (0, 0))
         for clock in self.clocks:
             self.draw_clock_hands(clock)
+
+        # Only the hands move, and without a second hand they only move once a minute
+        minute = self.clock.now().minute
+        if self.big_clock_show_seconds or self.small_clock_show_seconds or minute != self.last_minute:
+            self.last_minute = minute
+            for clock in self.clocks:
+                self.mark_dirty(clock["rect"])